@@ -0,0 +1,298 @@
+"""
+Table-driven attribute parser for product-details list-info text
+Each tool family has one rule table. A family's rules are compiled once
+into a single alternation regex, so a line is scanned in one pass and
+each match is dispatched to its rule by group index. Catalog lines
+differ mostly in their numbers, so the scan is done once per line shape
+(digits masked) and its plan replayed on every line of that shape. Lines
+no rule recognises are reported in raw_field_keys.
+"""
+
+import re
+
+from tool_schemas import (
+    BurrAttributes,
+    DrillAttributes,
+    DrillMillAttributes,
+    EndMillAttributes,
+    ReamerAttributes,
+    RougherAttributes,
+)
+
+
+# Decimals, fractions ("1/4") and mixed numbers ("1-1/4", "1 1/4")
+NUMBER = r"(?P<value>(?:\d+[\s-]+)?\d+/[1-9]\d*|\d+(?:\.\d+)?|\.\d+)"
+UNIT = r"\s*(?P<unit>mm|in\b|inch(?:es)?|\")?"
+SEP = r"\s*[:=]?\s*"
+MM_PER_INCH = 25.4
+
+# A line's shape: digits 1-9 read as "1", so lines that differ only in
+# their values share one, while the rules still see the same digit runs,
+# zeros and positions as in the line itself
+SHAPE_DIGITS = bytes.maketrans(b"123456789", b"111111111")
+
+
+# ===== Converters: (value, unit, line) -> parsed value =====
+
+
+def number(value):
+    """float() that also reads fractions and mixed numbers"""
+    if "/" not in value:
+        return float(value)
+    whole, _, fraction = value.replace("-", " ").rpartition(" ")
+    numerator, denominator = fraction.split("/")
+    return float(whole or 0) + int(numerator) / int(denominator)
+
+
+def to_float(value, unit, line):
+    return number(value)
+
+
+def to_mm(value, unit, line):
+    """Lengths are converted to mm; bare numbers are inches, like GARR's sizes"""
+    if unit == "mm":
+        return number(value)
+    return round(number(value) * MM_PER_INCH, 4)
+
+
+def to_inch(value, unit, line):
+    """Drill lengths are kept in the catalog's inch units, as are bare numbers"""
+    if unit == "mm":
+        return round(number(value) / MM_PER_INCH, 4)
+    return number(value)
+
+
+def flag(result):
+    return lambda value, unit, line: result
+
+
+def lowered(value, unit, line):
+    return value.lower()
+
+
+def upper(value, unit, line):
+    return value.upper()
+
+
+def whole_line(value, unit, line):
+    return line
+
+
+def mapped(mapping):
+    """Look the value up with runs of whitespace and hyphens collapsed to one space"""
+
+    def convert(value, unit, line):
+        key = " ".join(value.lower().replace("-", " ").split())
+        return mapping.get(key, key)
+
+    return convert
+
+
+# ===== Rule tables: (field, pattern, converter) =====
+
+XD_RULE = ("xD", NUMBER + r"\s*x\s*d\b", to_float)
+COOLANT_RULE = ("coolant_through", r"coolant[\s-]*(?:through|thru|fed)|through[\s-]*coolant", flag(True))
+POINT_ANGLE_RULE = (
+    "point_angle_deg",
+    NUMBER + r"\s*(?:°|deg(?:ree)?s?)\s*(?:point|pt)|point\s*angle" + SEP + NUMBER.replace("value", "value2"),
+    to_float,
+)
+CENTER_CUTTING_RULE = ("center_cutting", r"(?:non[\s-]*)?cent(?:er|re)[\s-]*cutting", None)
+
+DRILL_RULES = [
+    XD_RULE,
+    POINT_ANGLE_RULE,
+    COOLANT_RULE,
+    ("self_centering", r"self[\s-]*cent(?:er|re)ing", flag(True)),
+    ("near_reamer_finish", r"near[\s-]*reamer", flag(True)),
+    ("neck_diameter", r"neck\s*dia(?:meter|\.)?" + SEP + NUMBER + UNIT, to_inch),
+    ("neck_length", r"neck\s*length" + SEP + NUMBER + UNIT, to_inch),
+]
+
+END_MILL_RULES = [
+    ("end_type", r"(?P<value>ball|bull[\s-]*nose|chamfer|flat|square)(?:\s*end|\s*nose)?\b",
+     mapped({"square": "flat", "bull nose": "bullnose"})),
+    ("corner_radius_mm", r"corner\s*radius" + SEP + NUMBER + UNIT, to_mm),
+    ("helix_angle_deg",
+     NUMBER + r"\s*(?:°|deg(?:ree)?s?)\s*helix|helix(?:\s*angle)?" + SEP + NUMBER.replace("value", "value2"),
+     to_float),
+    ("neck_diameter_mm", r"neck\s*dia(?:meter|\.)?" + SEP + NUMBER + UNIT, to_mm),
+    ("neck_length_mm", r"neck\s*length" + SEP + NUMBER + UNIT, to_mm),
+    CENTER_CUTTING_RULE,
+    ("reduced_shank", r"reduced[\s-]*shank", flag(True)),
+]
+
+REAMER_RULES = [
+    ("flute_style", r"(?P<value>straight|spiral)\s*flut(?:e|ed)", lowered),
+    ("tolerance_class", r"\b(?P<value>h\d{1,2})\b(?:\s*tolerance)?", upper),
+    ("lead_in_length", r"lead[\s-]*in(?:\s*length)?" + SEP + NUMBER + UNIT, to_inch),
+    ("chamfer_length", r"chamfer(?:\s*length)?" + SEP + NUMBER + UNIT, to_inch),
+    COOLANT_RULE,
+]
+
+DRILL_MILL_RULES = [
+    POINT_ANGLE_RULE,
+    CENTER_CUTTING_RULE,
+]
+
+ROUGHER_RULES = [
+    ("chipbreaker_style", r"chip[\s-]*breaker", whole_line),
+    ("serration_note", r"serrat(?:ed|ion|ions)", whole_line),
+    ("rougher_profile_note", r"(?:coarse|fine|semi[\s-]*finish(?:ing)?)\s*(?:pitch|profile|rougher)", whole_line),
+]
+
+BURR_RULES = [
+    ("cut_style", r"(?P<value>single|double)[\s-]*cut", mapped({"single": "single_cut", "double": "double_cut"})),
+    ("head_diameter_mm", r"head\s*dia(?:meter|\.)?" + SEP + NUMBER + UNIT, to_mm),
+    ("head_length_mm", r"head\s*length" + SEP + NUMBER + UNIT, to_mm),
+    ("head_shape",
+     r"(?P<value>cylind(?:er|rical)|ball|oval|tree|flame|inverted\s*cone|cone|pointed|radius\s*end|countersink)"
+     r"(?:\s*(?:shape|head))?",
+     mapped({})),
+]
+
+# family -> (Tool field, attributes model, rules)
+FAMILIES = {
+    "drill": ("drill_attributes", DrillAttributes, DRILL_RULES),
+    "end_mill": ("end_mill_attributes", EndMillAttributes, END_MILL_RULES),
+    "reamer": ("reamer_attributes", ReamerAttributes, REAMER_RULES),
+    "drill_mill": ("drill_mill_attributes", DrillMillAttributes, DRILL_MILL_RULES),
+    "rougher": ("rougher_attributes", RougherAttributes, ROUGHER_RULES),
+    "burr": ("burr_attributes", BurrAttributes, BURR_RULES),
+}
+
+# Product type (product_types.PRODUCT_TYPES) -> (family, fixed attributes)
+PRODUCT_TYPE_FAMILIES = {
+    "Drills - High Performance": ("drill", {"drill_category": "high_performance"}),
+    "Drills - General Purpose": ("drill", {"drill_category": "general_purpose"}),
+    "Reamers": ("reamer", {}),
+    "Drill Mills": ("drill_mill", {}),
+    "Roughers": ("rougher", {}),
+    "End Mills - High Performance": ("end_mill", {}),
+    "End Mills - Stub Length": ("end_mill", {}),
+    "End Mills - Standard Length": ("end_mill", {}),
+    "End Mills - Extra Length": ("end_mill", {}),
+    "Burrs/Rotary Files": ("burr", {}),
+}
+
+
+class CompiledRules:
+    """One family's rule table compiled into a single alternation regex
+
+    Patterns are written in lower case and matched against the lower-cased
+    line, so each line is scanned once and every match is dispatched to its
+    rule by group index. Catalog lines repeat across thousands of EDPs and
+    differ mostly in their values, so the scan is done once per line shape
+    and the resulting plan replayed on every line of that shape.
+    """
+
+    def __init__(self, rules, cache_size=65536):
+        self.rules = []
+        alternatives = []
+        for i, (field, pattern, converter) in enumerate(rules):
+            # Give every rule's groups unique names inside the combined regex
+            pattern = (
+                pattern.replace("(?P<value2>", f"(?P<v{i}b>")
+                .replace("(?P<value>", f"(?P<v{i}>")
+                .replace("(?P<unit>", f"(?P<u{i}>")
+            )
+            alternatives.append(f"(?P<r{i}>{pattern})")
+        # Matches only start at a word boundary, which skips most positions cheaply
+        self.regex = re.compile(r"(?<![a-z0-9])(?:" + "|".join(alternatives) + ")")
+
+        # Resolve group names to indexes once, for the per-match dispatch
+        groups = self.regex.groupindex
+        for i, (field, _, converter) in enumerate(rules):
+            self.rules.append(
+                (
+                    field,
+                    converter,
+                    [groups[name] for name in (f"v{i}", f"v{i}b") if name in groups],
+                    groups.get(f"u{i}"),
+                )
+            )
+        self.dispatch = {groups[f"r{i}"]: rule for i, rule in enumerate(self.rules)}
+        self.cache_size = cache_size
+        self.plans = {}
+
+    def plan(self, shape):
+        """Scan a line shape: ((field, converter, value start, value end, unit), ...)"""
+        steps = {}
+        for match in self.regex.finditer(shape):
+            field, converter, value_groups, unit_group = self.dispatch[match.lastindex]
+            if field in steps:
+                continue  # First mention wins
+            if converter is None:  # center_cutting: "non-center cutting" is False
+                steps[field] = (field, flag(not match.group(0).startswith("non")), 0, 0, None)
+                continue
+            start = end = 0
+            for group in value_groups:
+                if match.group(group) is not None:
+                    start, end = match.span(group)
+                    break
+            unit = match.group(unit_group) if unit_group else None
+            steps[field] = (field, converter, start, end, unit)
+        return tuple(steps.values())
+
+    def parse(self, text):
+        """Return ({field: value}, [unparsed line keys]) for list-info text"""
+        values = {}
+        leftovers = []
+        plans = self.plans
+        lowered = text.lower()
+        # Masking digits keeps every line's length, so a plan's spans index the line
+        shapes = lowered.encode("utf-8").translate(SHAPE_DIGITS).decode("utf-8")
+        for line, low, shape in zip(text.splitlines(), lowered.splitlines(), shapes.splitlines()):
+            shape = shape.strip()
+            if not shape:
+                continue
+            plan = plans.get(shape)
+            if plan is None:
+                plan = self.plan(shape)
+                if len(plans) < self.cache_size:
+                    plans[shape] = plan
+            if not plan:
+                leftovers.append(line.split(":", 1)[0].strip())
+                continue
+            low = low.strip()
+            for field, converter, start, end, unit in plan:
+                if field not in values:
+                    values[field] = converter(low[start:end] if end else None, unit, line.strip())
+        return values, leftovers
+
+
+# Tool.xD is parsed for every family, so each table leads with the xD rule
+COMPILED = {
+    family: CompiledRules(rules if XD_RULE in rules else [XD_RULE] + rules)
+    for family, (_, _, rules) in FAMILIES.items()
+}
+XD_ONLY = CompiledRules([XD_RULE])
+
+
+def family_for_product_type(product_type):
+    """Return (family, fixed attributes) for a product type name, or (None, {})"""
+    return PRODUCT_TYPE_FAMILIES.get(product_type, (None, {}))
+
+
+def parse_attributes(list_info_text, product_type=None):
+    """Parse list-info text into Tool keyword arguments
+
+    Returns a dict with xD, the family's *_attributes model (when the
+    product type is known) and raw_field_keys for unparsed lines.
+    """
+    family, fixed = family_for_product_type(product_type)
+    rules = COMPILED[family] if family else XD_ONLY
+    values, leftovers = rules.parse(list_info_text or "")
+
+    result = {
+        "xD": values.get("xD"),
+        "raw_field_keys": ", ".join(dict.fromkeys(leftovers)) or None,
+    }
+    if family:
+        tool_field, model, family_rules = FAMILIES[family]
+        if XD_RULE not in family_rules:
+            values.pop("xD", None)  # Only drills carry xD in their attributes
+        values.update(fixed)
+        # model_validate on the dict skips building keyword arguments
+        result[tool_field] = model.model_validate(values)
+    return result
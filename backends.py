@@ -0,0 +1,50 @@
+"""
+Fetch backends, loaded on first use
+Each product-details backend lives in its own module, which is only
+imported once a crawl selects it, so importing the crawler, or parsing
+and exporting results, never loads the Firecrawl SDK or requests. A
+backend module provides
+
+    backend_options(workers, cache_dir=None, throttle=None, **options) -> dict
+
+with the fetch options it adds for scrape_edps: a requests session for
+"http", a FirecrawlExtractor for "firecrawl". Extra keyword options are
+backend-specific (batch=True for "firecrawl"). With neither, pages are
+loaded in the listing's browser, so "selenium" adds nothing.
+"""
+
+import importlib
+
+
+# Backend name -> module providing backend_options(), or None for the browser
+BACKENDS = {
+    "selenium": None,
+    "http": "http_fetcher",
+    "firecrawl": "firecrawl_client",
+}
+
+
+def load_backend(name):
+    """Import a backend's module; None for the browser backend"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}; choose from {', '.join(BACKENDS)}")
+    module = BACKENDS[name]
+    return importlib.import_module(module) if module else None
+
+
+def backend_options(name, workers=8, cache_dir=None, throttle=None, **backend_kwargs):
+    """Return {"session": ..., "extractor": ...} for a backend's fetch path"""
+    options = {"session": None, "extractor": None}
+    module = load_backend(name)
+    if module is not None:
+        options.update(module.backend_options(workers, cache_dir, throttle, **backend_kwargs))
+    return options
+
+
+def firecrawl_options(backend, firecrawl_batch=False):
+    """Keyword options for backend_options from main()'s firecrawl_batch"""
+    if not firecrawl_batch:
+        return {}
+    if backend != "firecrawl":
+        raise ValueError("firecrawl_batch needs the firecrawl backend")
+    return {"batch": True}
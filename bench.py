@@ -0,0 +1,775 @@
+"""
+Benchmark harness for parsing and crawl throughput
+Replays saved listing and product-details pages from a local FixtureServer
+and reports pages/sec, per-stage latency (fetch, parse, validate,
+serialize) and peak RSS for each fetch path. The Firecrawl path runs
+against a local FakeFirecrawlServer answering from the same fixtures.
+The parser path measures attribute-parser descriptions/sec on unique
+descriptions and on the fixtures' repeated list-info text (raw rates,
+about 70k/sec on one core, bounded by model validation), and judges the
+100k/sec target on the fixtures through the section index, which is
+how the scraper parses; the records path compares
+per-object validation and dumping with the bulk record layer.
+The throttle path replays the HTTP path against a server that adds
+latency and answers 429 above a concurrency capacity, with and without
+the adaptive Throttle. The startup path imports each entry-point module
+in a fresh interpreter and checks it against an import-time budget and a
+list of heavy packages it must not load; with --check, a miss exits
+non-zero, so a pipeline can gate on it.
+
+Fixtures are either recorded pages exported from a PageCache
+(record_fixtures) or synthetic pages shaped like the live site
+(write_fixtures).
+
+Usage:
+    python bench.py                      # synthetic fixtures, HTTP path
+    python bench.py --fixtures DIR --paths http selenium
+    python bench.py --paths parser --descriptions 200000
+    python bench.py --paths throttle --workers 24 --capacity 6
+    python bench.py --paths startup --check
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from fixture_server import FakeFirecrawlServer, FixtureServer
+
+
+LISTING_PATH = "products/drills-general-purpose"
+
+DESCRIPTION_LINES = [
+    "{xd}xD Drill Depth",
+    "{angle}° Point Angle",
+    "Coolant Through",
+    "Self-Centering Point",
+    "Near Reamer Finish",
+    "{helix}° Helix Angle",
+    "Center Cutting",
+    "Corner Radius: {radius}mm",
+    "AlTiN Coated Solid Carbide",
+    "Neck Diameter: {neck}mm",
+    "Straight Flute",
+    "Double Cut",
+]
+
+PRODUCT_DETAILS_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>EDP {edp} | GARR Tool</title>
+<script>window.dataLayer = window.dataLayer || [];</script></head>
+<body>
+<div class="site"><main><form method="post">
+<div><div><div><div><strong>{series}</strong><span>EDP {edp}</span></div></div></div></div>
+</form></main></div>
+<div id="post-397" class="page"><div class="entry">
+<div class="crumbs"><a href="/">Home</a></div>
+<div class="content">
+<div class="gallery"><img src="/img/{edp}.png"></div>
+<div class="details"><div class="info"><div class="specs">
+<ul class="list-info">{items}</ul>
+<h4>Description</h4>
+<p>{description}</p>
+<h4>Tolerances</h4>
+<ul><li>Diameter: +0.0000/-0.0005</li></ul>
+</div></div></div>
+</div></div></div>
+</body></html>
+"""
+
+HOMEPAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>GARR Tool</title></head>
+<body><nav><ul class="menu"><li><a href="/products/">PRODUCTS</a>
+<ul class="sub-menu"><li><a href="/{listing}/">Drills - General Purpose</a></li></ul>
+</li></ul></nav><main><h1>GARR Tool</h1></main></body></html>
+"""
+
+LISTING_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Drills - General Purpose | GARR Tool</title></head>
+<body><main>{rows}</main></body></html>
+"""
+
+RESULT_ROW_TEMPLATE = """<div class="resultRow"><strong class="name">{series}</strong>
+<ul class="product-table" data-id="{table_id}">{rows}</ul>
+<a href="#" class="load-all">Load All Series Results</a></div>"""
+
+LISTING_ROW_TEMPLATE = """<li data-id="{row_id}" class="series-results-row">
+<strong class="title srEDP"><a href="#" data-id="{edp}" class="open">{edp}</a></strong>
+<span>{diameter}</span><span>{length}</span><span>{flutes}</span></li>"""
+
+
+def synthetic_description(rng):
+    """Return list-info lines shaped like the live product-details pages"""
+    values = dict(
+        xd=rng.choice([3, 5, 8, 12, 15, 20]),
+        angle=rng.choice([118, 130, 135, 140]),
+        helix=rng.choice([30, 35, 38, 45]),
+        radius=rng.choice(["0.2", "0.5", "1.0"]),
+        neck=rng.choice(["2.5", "3.8", "5.5"]),
+    )
+    lines = rng.sample(DESCRIPTION_LINES, k=rng.randint(3, 7))
+    return [line.format(**values) for line in lines]
+
+
+def unique_descriptions(count, seed=7):
+    """Return `count` list-info texts with no numeric line repeated
+
+    Every value is drawn from a wide range, so no text repeats, though
+    lines still share the shape plans of their digit-masked form, as on
+    a real catalog of distinct sizes.
+    """
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        values = dict(
+            xd=f"{3 + i / count * 17:.5f}",
+            angle=f"{118 + rng.random() * 22:.4f}",
+            helix=f"{30 + rng.random() * 15:.4f}",
+            radius=f"{0.1 + i / count * 2:.6f}",
+            neck=f"{1 + rng.random() * 9:.4f}",
+        )
+        lines = rng.sample(DESCRIPTION_LINES, k=rng.randint(3, 7))
+        texts.append("\n".join(line.format(**values) for line in lines))
+    return texts
+
+
+def write_fixtures(directory, series_count=3, edps_per_series=100, seed=7):
+    """Write a synthetic listing page and product-details pages; return the EDPs"""
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(directory, "product-details"), exist_ok=True)
+    os.makedirs(os.path.join(directory, LISTING_PATH), exist_ok=True)
+
+    edps = []
+    result_rows = []
+    for s in range(series_count):
+        series = f"{rng.choice(['VX', 'XD', 'SF', 'MC'])}{100 + s} Series"
+        description = (
+            f"{series} solid carbide tools with a "
+            f"{rng.choice(['TiAlN', 'AlCrN', 'uncoated'])} finish."
+        )
+        rows = []
+        for e in range(edps_per_series):
+            edp = str(10000 + s * edps_per_series + e)
+            edps.append((series, edp))
+            rows.append(
+                LISTING_ROW_TEMPLATE.format(
+                    row_id=edp,
+                    edp=edp,
+                    diameter=f"{rng.uniform(1, 20):.3f}",
+                    length=f"{rng.uniform(20, 150):.1f}",
+                    flutes=rng.choice([2, 3, 4]),
+                )
+            )
+            items = "".join(f"<li>{line}</li>" for line in synthetic_description(rng))
+            with open(
+                os.path.join(directory, "product-details", f"{edp}.html"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(
+                    PRODUCT_DETAILS_TEMPLATE.format(
+                        edp=edp, series=series, items=items, description=description
+                    )
+                )
+        result_rows.append(
+            RESULT_ROW_TEMPLATE.format(series=series, table_id=s + 1, rows="".join(rows))
+        )
+
+    with open(os.path.join(directory, LISTING_PATH, "index.html"), "w", encoding="utf-8") as f:
+        f.write(LISTING_TEMPLATE.format(rows="".join(result_rows)))
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as f:
+        f.write(HOMEPAGE_TEMPLATE.format(listing=LISTING_PATH))
+    return edps
+
+
+def record_fixtures(cache_dir, directory):
+    """Export cached product-details pages into the fixture layout; return the EDPs"""
+    from page_cache import PageCache
+
+    cache = PageCache(cache_dir)
+    os.makedirs(os.path.join(directory, "product-details"), exist_ok=True)
+    edps = []
+    urls = [row[0] for row in cache.db.execute("SELECT url FROM pages")]
+    for url in urls:
+        if "EDP=" not in url:
+            continue
+        edp = url.rsplit("EDP=", 1)[1]
+        page = cache.get(url, touch=False)
+        if page is None or not edp.isalnum():
+            continue
+        with open(
+            os.path.join(directory, "product-details", f"{edp}.html"), "w", encoding="utf-8"
+        ) as f:
+            f.write(page.html)
+        edps.append((None, edp))
+    return edps
+
+
+def fixture_edps(directory):
+    """List (series, edp) pairs for the product-details pages in a fixture dir"""
+    names = sorted(os.listdir(os.path.join(directory, "product-details")))
+    return [
+        (None, name[:-5])
+        for name in names
+        if name.endswith(".html") and name != "default.html"
+    ]
+
+
+# ===== Measurement =====
+
+
+class StageTimer:
+    """Collect per-stage latencies"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def time(self, stage, func, *args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+    def summary(self):
+        summary = {}
+        for stage, samples in self.samples.items():
+            samples = sorted(samples)
+            n = len(samples)
+            summary[stage] = {
+                "count": n,
+                "mean_ms": round(1000 * sum(samples) / n, 3),
+                "p50_ms": round(1000 * samples[n // 2], 3),
+                "p95_ms": round(1000 * samples[min(n - 1, int(n * 0.95))], 3),
+            }
+        return summary
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def bench_http(base_url, edps, workers=8):
+    """Per-stage latency for the HTTP path, then concurrent end-to-end throughput"""
+    from http_fetcher import create_session, product_details_url, scrape_tools_http
+    from page_parser import build_tool, parse_product_details
+
+    session = create_session(pool_size=workers)
+    timer = StageTimer()
+    start = time.perf_counter()
+    for series, edp in edps:
+        response = timer.time("fetch", session.get, product_details_url(edp, base_url))
+        list_info, series_text = timer.time("parse", parse_product_details, response.text)
+        tool = timer.time("validate", build_tool, edp, series or series_text, list_info)
+        timer.time("serialize", tool.model_dump_json)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scrape_tools_http(
+        session, [edp for _, edp in edps], None, workers=workers, base_url=base_url
+    )
+    concurrent = time.perf_counter() - start
+    return {
+        "pages": len(edps),
+        "pages_per_sec": round(len(edps) / sequential, 1),
+        f"pages_per_sec_{workers}_workers": round(len(edps) / concurrent, 1),
+        "stages": timer.summary(),
+    }
+
+
+def bench_selenium(base_url, edps):
+    """Per-stage latency for the Selenium path on a headless browser"""
+    from driver_pool import setup_headless_driver
+    from http_fetcher import product_details_url
+    from readiness import wait_for_list_info
+    from scrape_data import extract_table_rows, scrape_tool_details
+    from selenium.webdriver.common.by import By
+
+    driver = setup_headless_driver()
+    timer = StageTimer()
+    try:
+        driver.get(f"{base_url}{LISTING_PATH}/")
+        tables = driver.find_elements(By.CSS_SELECTOR, "ul.product-table")
+        for table in tables:
+            timer.time("listing_rows", extract_table_rows, driver, table)
+
+        start = time.perf_counter()
+        for series, edp in edps:
+            timer.time("fetch", driver.get, product_details_url(edp, base_url))
+            timer.time("fetch", wait_for_list_info, driver)
+            tool = timer.time("parse+validate", scrape_tool_details, driver, edp, series)
+            timer.time("serialize", tool.model_dump_json)
+        elapsed = time.perf_counter() - start
+    finally:
+        driver.quit()
+    return {
+        "pages": len(edps),
+        "pages_per_sec": round(len(edps) / elapsed, 1),
+        "stages": timer.summary(),
+    }
+
+
+def bench_firecrawl(api_url, base_url, edps, workers=8):
+    """Latency of the Firecrawl path against a local fake Firecrawl endpoint"""
+    from firecrawl_client import FirecrawlExtractor
+    from http_fetcher import product_details_url
+
+    extractor = FirecrawlExtractor(
+        api_key="fc-local", api_url=api_url, max_concurrency=workers
+    )
+    timer = StageTimer()
+    start = time.perf_counter()
+    for series, edp in edps:
+        data = timer.time("fetch+extract", extractor.extract, product_details_url(edp, base_url))
+        tool = timer.time("validate", extractor.to_tool, data, edp, series)
+        timer.time("serialize", tool.model_dump_json)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extractor.extract_tools([edp for _, edp in edps], None, base_url=base_url)
+    concurrent = time.perf_counter() - start
+    return {
+        "pages": len(edps),
+        "pages_per_sec": round(len(edps) / elapsed, 1),
+        f"pages_per_sec_{workers}_workers": round(len(edps) / concurrent, 1),
+        "stages": timer.summary(),
+    }
+
+
+def fixture_list_info(fixture_dir, edps):
+    """Return the list-info text of each EDP's product-details fixture"""
+    from page_parser import parse_product_details
+
+    texts = []
+    for _, edp in edps:
+        path = os.path.join(fixture_dir, "product-details", f"{edp}.html")
+        if not os.path.isfile(path):
+            path = os.path.join(fixture_dir, "product-details", "default.html")
+        with open(path, "r", encoding="utf-8") as f:
+            list_info, _ = parse_product_details(f.read())
+        texts.append(list_info or "")
+    return texts
+
+
+def section_coverage(fixture_dir, edps):
+    """How many product-details fixtures each series section is found on
+
+    Run on recorded pages (--from-cache) to check the SECTION_HEADINGS
+    lookup against the live layout. Raises if a section is found on none
+    of the pages, since Series.details or tolerances would never be set.
+    """
+    from page_parser import parse_page_sections
+
+    coverage = {"pages": 0, "description": 0, "tolerances": 0}
+    for _, edp in edps:
+        path = os.path.join(fixture_dir, "product-details", f"{edp}.html")
+        if not os.path.isfile(path):
+            path = os.path.join(fixture_dir, "product-details", "default.html")
+        with open(path, "r", encoding="utf-8") as f:
+            sections = parse_page_sections(f.read())
+        coverage["pages"] += 1
+        coverage["description"] += sections.description is not None
+        coverage["tolerances"] += sections.tolerances is not None
+    missing = [name for name in ("description", "tolerances") if not coverage[name]]
+    if coverage["pages"] and missing:
+        raise RuntimeError(
+            f"No {' or '.join(missing)} section found on any of "
+            f"{coverage['pages']} product-details pages"
+        )
+    return coverage
+
+
+def bench_parser(fixture_dir, edps, descriptions=100000, target=100000):
+    """Attribute-parser throughput on unique descriptions, on the
+    fixtures' repeated list-info text, and with identical sections
+    parsed once
+
+    target_met is judged on the section-index rate, the path the
+    scraper takes; the raw parse_attributes rates are reported without
+    a target.
+    """
+    import attribute_parser
+    from page_sections import SectionIndex
+
+    product_types = list(attribute_parser.PRODUCT_TYPE_FAMILIES)
+
+    def parse_all(workload):
+        # Start cold so scanning each unique line shape is part of the measurement
+        for rules in attribute_parser.COMPILED.values():
+            rules.plans.clear()
+        start = time.perf_counter()
+        for text, product_type in workload:
+            attribute_parser.parse_attributes(text, product_type)
+        return descriptions / (time.perf_counter() - start)
+
+    unique = unique_descriptions(descriptions)
+    rate = parse_all(
+        [(text, product_types[i % len(product_types)]) for i, text in enumerate(unique)]
+    )
+    del unique
+
+    texts = fixture_list_info(fixture_dir, edps)
+    workload = [
+        (texts[i % len(texts)], product_types[i % len(product_types)])
+        for i in range(descriptions)
+    ]
+    repeated_rate = parse_all(workload)
+
+    # The same workload through the section index: each unique text parsed once
+    sections = SectionIndex()
+    start = time.perf_counter()
+    for text, product_type in workload:
+        sections.attributes(text, product_type)
+    dedup_rate = descriptions / (time.perf_counter() - start)
+    return {
+        "descriptions": descriptions,
+        "descriptions_per_sec": round(rate, 1),
+        "fixture_texts": len(set(texts)),
+        "repeated_descriptions_per_sec": round(repeated_rate, 1),
+        "dedup_descriptions_per_sec": round(dedup_rate, 1),
+        "sections_parsed": sections.summary()["parsed"],
+        "section_coverage": section_coverage(fixture_dir, edps),
+        "target_per_sec": target,
+        "target_met": dedup_rate >= target,
+    }
+
+
+def bench_records(fixture_dir, edps, tools=20000):
+    """Validation and dump CPU: per-object Tool(...) and two indent=2 dumps
+    of the tree, against batch TypeAdapter validation and a single dump"""
+    from attribute_parser import PRODUCT_TYPE_FAMILIES, parse_attributes
+    from tool_records import validate_tools, validate_tools_json, write_products
+    from tool_schemas import Products, ProductType, Series, Tool
+
+    texts = fixture_list_info(fixture_dir, edps)
+    product_types = list(PRODUCT_TYPE_FAMILIES)
+    fields = [
+        dict(
+            vendor_product_id=str(i),
+            series_name="Bench Series",
+            source_html_hash="0" * 64,
+            **parse_attributes(texts[i % len(texts)], product_types[i % len(product_types)]),
+        )
+        for i in range(tools)
+    ]
+
+    def tree(built):
+        return Products(
+            types=[ProductType(name="Bench", series=[Series(name="Bench Series", tools=built)])]
+        )
+
+    timer = StageTimer()
+    built = timer.time("validate_per_object", lambda: [Tool(**f) for f in fields])
+    products = tree(built)
+    timer.time("dump_indent_twice", lambda: [products.model_dump_json(indent=2) for _ in range(2)])
+
+    built = timer.time("validate_batch", validate_tools, fields)
+    products = tree(built)
+    with tempfile.TemporaryDirectory() as directory:
+        timer.time("dump_once", write_products, products, os.path.join(directory, "out.json"))
+
+    # Reading records back, as the journal and JSONL rebuild do
+    rows = [tool.model_dump_json() for tool in built]
+    timer.time("reload_per_object", lambda: [Tool.model_validate_json(r) for r in rows])
+    timer.time("reload_batch", validate_tools_json, rows)
+
+    stages = timer.summary()
+    ms = {stage: s["mean_ms"] for stage, s in stages.items()}
+    before = ms["validate_per_object"] + ms["dump_indent_twice"]
+    after = ms["validate_batch"] + ms["dump_once"]
+    return {
+        "tools": tools,
+        "validate_and_dump_speedup": round(before / after, 1),
+        "dump_speedup": round(ms["dump_indent_twice"] / ms["dump_once"], 1),
+        "reload_speedup": round(ms["reload_per_object"] / ms["reload_batch"], 1),
+        "stages": stages,
+    }
+
+
+def bench_store(fixture_dir, edps, tools=20000, lookups=2000):
+    """CatalogStore bulk upsert, re-upsert and indexed lookup latency"""
+    from attribute_parser import PRODUCT_TYPE_FAMILIES, parse_attributes
+    from catalog_store import CatalogStore
+    from tool_records import validate_tools
+    from tool_schemas import Products, ProductType, Series
+
+    texts = fixture_list_info(fixture_dir, edps)
+    product_types = list(PRODUCT_TYPE_FAMILIES)
+    built = validate_tools(
+        [
+            dict(
+                vendor_product_id=str(i),
+                series_name=f"Bench Series {i % 100}",
+                **parse_attributes(texts[i % len(texts)], product_types[i % len(product_types)]),
+            )
+            for i in range(tools)
+        ]
+    )
+    series = {}
+    for tool in built:
+        series.setdefault(tool.series_name, []).append(tool)
+    products = Products(
+        types=[
+            ProductType(
+                name="Bench", series=[Series(name=name, tools=t) for name, t in series.items()]
+            )
+        ]
+    )
+
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as directory:
+        store = CatalogStore(os.path.join(directory, "catalog.db"))
+        timer.time("upsert", store.upsert_products, products)
+        changes = timer.time("re_upsert", store.upsert_products, products)
+        for i in range(lookups):
+            edp = str(i * 7919 % tools)
+            timer.time("find_edp", store.find_edps, vendor_product_id=edp)
+            timer.time("load_tool", store.tool, edp)
+            timer.time("find_series", store.find_edps, series_name=f"Bench Series {i % 100}")
+            timer.time("find_drill_xd", store.find_edps, "drill", xD=float(i % 8), coolant_through=True)
+        store.close()
+    stages = timer.summary()
+    return {
+        "tools": tools,
+        "unchanged_on_re_upsert": len(changes.unchanged),
+        "edp_lookup_sub_ms": stages["find_edp"]["p95_ms"] < 1.0,
+        "stages": stages,
+    }
+
+
+# Import-time budgets: module -> (milliseconds, top-level packages it must not load)
+HEAVY_PACKAGES = ("selenium", "requests", "firecrawl", "pandas")
+STARTUP_BUDGETS = {
+    "cli": (25, HEAVY_PACKAGES + ("pydantic",)),
+    "page_parser": (60, HEAVY_PACKAGES + ("pydantic",)),
+    "site_map": (80, HEAVY_PACKAGES + ("pydantic",)),
+    "jsonl_sink": (300, HEAVY_PACKAGES),
+    "catalog_store": (300, HEAVY_PACKAGES),
+    "incremental": (350, HEAVY_PACKAGES),
+    "catalog_export": (350, HEAVY_PACKAGES),
+    "scrape_data": (700, ("requests", "firecrawl", "pandas")),
+}
+
+
+def import_profile(module):
+    """Return (ms, top-level packages loaded) for `import module` in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = None
+    packages = set()
+    for line in completed.stderr.splitlines():
+        # import time: <self us> | <cumulative us> | <module, indented by depth>
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            total = int(parts[1]) / 1000
+    return total, packages
+
+
+def bench_startup(repeats=5, budget_scale=1.0):
+    """Import time of each entry-point module against STARTUP_BUDGETS"""
+    result = {"budget_scale": budget_scale}
+    over_budget = []
+    for module, (budget, forbidden) in STARTUP_BUDGETS.items():
+        runs = [import_profile(module) for _ in range(repeats)]
+        ms = min(total for total, _ in runs)
+        budget *= budget_scale
+        result[f"{module}_ms"] = f"{ms:.1f} (budget {budget:.0f})"
+        if ms > budget:
+            over_budget.append(f"{module} {ms:.1f}ms > {budget:.0f}ms")
+        loaded = sorted(set(forbidden) & runs[0][1])
+        if loaded:
+            over_budget.append(f"{module} imports {', '.join(loaded)}")
+    result["over_budget"] = over_budget
+    return result
+
+
+def bench_throttle(fixture_dir, edps, workers=24, capacity=6, latency=0.02):
+    """HTTP path against a server that 429s above `capacity` concurrent
+    requests: fixed workers without a Throttle, then with one"""
+    from http_fetcher import create_session, scrape_tools_http
+    from throttle import PRODUCT_DETAILS, Throttle
+
+    edp_numbers = [edp for _, edp in edps]
+    result = {"workers": workers, "server_capacity": capacity}
+    for label, throttle in (
+        ("fixed", None),
+        ("adaptive", Throttle(initial=2, max_limit=workers, default_retry_after=0.5)),
+    ):
+        with FixtureServer(
+            fixture_dir, latency=latency, capacity=capacity, retry_after=1
+        ) as server:
+            errors = {}
+            start = time.perf_counter()
+            tools = scrape_tools_http(
+                create_session(pool_size=workers),
+                edp_numbers,
+                None,
+                workers=workers,
+                base_url=server.base_url,
+                errors=errors,
+                throttle=throttle,
+            )
+            elapsed = time.perf_counter() - start
+        result[f"{label}_tools"] = len(tools)
+        result[f"{label}_failed"] = len(errors)
+        result[f"{label}_429s"] = server.httpd.throttled
+        result[f"{label}_peak_in_flight"] = server.httpd.peak_in_flight
+        result[f"{label}_pages_per_sec"] = round(len(tools) / elapsed, 1)
+        if throttle is not None:
+            limiter = throttle.summary()[PRODUCT_DETAILS]
+            result["adaptive_final_limit"] = limiter["limit"]
+            result["adaptive_decreases"] = limiter["decreases"]
+    return result
+
+
+def print_report(results):
+    for path, result in results.items():
+        print(f"\n{path}:")
+        if "skipped" in result:
+            print(f"  skipped: {result['skipped']}")
+            continue
+        for key, value in result.items():
+            if key != "stages":
+                print(f"  {key}: {value}")
+        for stage, s in result.get("stages", {}).items():
+            print(
+                f"  {stage:<16} n={s['count']:<6} mean={s['mean_ms']:.3f}ms "
+                f"p50={s['p50_ms']:.3f}ms p95={s['p95_ms']:.3f}ms"
+            )
+
+
+def run_benchmarks(
+    paths=("http",), fixtures=None, cache_dir=None, pages=300, workers=8,
+    descriptions=100000, capacity=6, budget_scale=1.0,
+):
+    """Run the requested benchmark paths and return {path: result}"""
+    results = {}
+    if "startup" in paths:
+        # Fresh interpreters only; no fixtures needed
+        results["startup"] = bench_startup(budget_scale=budget_scale)
+        paths = [path for path in paths if path != "startup"]
+        if not paths:
+            results["peak_rss_mb"] = peak_rss_mb()
+            return results
+
+    fixture_dir = fixtures or tempfile.mkdtemp(prefix="garr_fixtures_")
+    if cache_dir:
+        edps = record_fixtures(cache_dir, fixture_dir)
+    elif fixtures:
+        edps = fixture_edps(fixture_dir)
+    else:
+        edps = write_fixtures(fixture_dir, edps_per_series=max(1, pages // 3))
+    edps = edps[:pages]
+
+    with FixtureServer(fixture_dir) as server, FakeFirecrawlServer(
+        fixture_dir
+    ) as firecrawl, open(os.devnull, "w") as devnull:
+        for path in paths:
+            try:
+                # Keep the scrapers' progress prints out of the timings
+                with contextlib.redirect_stdout(devnull):
+                    if path == "http":
+                        results[path] = bench_http(server.base_url, edps, workers)
+                    elif path == "selenium":
+                        results[path] = bench_selenium(server.base_url, edps)
+                    elif path == "firecrawl":
+                        results[path] = bench_firecrawl(
+                            firecrawl.base_url.rstrip("/"), server.base_url, edps, workers
+                        )
+                    elif path == "parser":
+                        results[path] = bench_parser(fixture_dir, edps, descriptions)
+                    elif path == "records":
+                        results[path] = bench_records(fixture_dir, edps)
+                    elif path == "store":
+                        results[path] = bench_store(fixture_dir, edps)
+                    elif path == "throttle":
+                        results[path] = bench_throttle(fixture_dir, edps, workers, capacity)
+            except Exception as e:
+                reason = skip_reason(e)
+                if reason is None:
+                    raise
+                results[path] = {"skipped": reason}
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+# Packages a path may need that a minimal install can lack
+OPTIONAL_PACKAGES = ("selenium", "firecrawl", "requests", "pandas", "pyarrow")
+
+
+def skip_reason(error):
+    """Why a path cannot run in this environment, or None for a real failure
+
+    Only a missing optional package or a missing Chrome is a skip.
+    """
+    if isinstance(error, ImportError):
+        package = (error.name or "").split(".")[0]
+        return f"{package} is not installed" if package in OPTIONAL_PACKAGES else None
+    try:
+        from selenium.common.exceptions import NoSuchDriverException, WebDriverException
+    except ImportError:
+        return None
+    # No chromedriver, or a chromedriver without a Chrome binary to start
+    if isinstance(error, NoSuchDriverException) or (
+        isinstance(error, WebDriverException) and "chrome binary" in str(error).lower()
+    ):
+        return "Chrome is not available"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark GARR scraping paths")
+    parser.add_argument("--paths", nargs="+", default=["http"],
+                        choices=["http", "selenium", "firecrawl", "parser", "records",
+                                 "store", "throttle", "startup"])
+    parser.add_argument("--fixtures", help="Directory of saved fixtures to replay")
+    parser.add_argument("--from-cache", dest="cache_dir",
+                        help="Export recorded pages from a PageCache directory")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--descriptions", type=int, default=100000,
+                        help="Descriptions to run through the attribute parser")
+    parser.add_argument("--capacity", type=int, default=6,
+                        help="Concurrent requests the throttle path's server accepts")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply the startup path's import-time budgets")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit non-zero if the startup path misses a budget")
+    parser.add_argument("--json", dest="json_path", help="Also write results to a JSON file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.paths, args.fixtures, args.cache_dir, args.pages, args.workers,
+        args.descriptions, args.capacity, args.budget_scale,
+    )
+    peak = results.pop("peak_rss_mb")
+    print_report(results)
+    print(f"\nPeak RSS: {peak} MB")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(dict(results, peak_rss_mb=peak), f, indent=2)
+    if args.check and results.get("startup", {}).get("over_budget"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
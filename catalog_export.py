@@ -0,0 +1,222 @@
+"""
+Columnar export of the scraped catalog
+Flattens Products → ProductType → Series → Tool, including the per-family
+attribute models, into one typed row per tool, and writes Parquet
+partitioned by product type (or one Feather file per product type) plus
+an optional Excel summary.
+
+Parquet and Feather are written through pandas and need pyarrow, from
+the "export" extra: pip install "GarrTool_Scraper[export]". pandas is
+imported when the first frame is built, not with this module.
+
+Usage:
+    python catalog_export.py garr_products.json export/
+    python catalog_export.py garr_products.jsonl export/ --format feather --excel summary.xlsx
+"""
+
+import argparse
+import importlib.util
+import os
+import typing
+from datetime import datetime
+from urllib.parse import quote
+
+from pydantic import BaseModel
+
+from incremental import load_products
+from jsonl_sink import iter_series
+from tool_schemas import Tool
+
+
+FORMATS = ("parquet", "feather")
+
+
+def column_dtype(annotation):
+    """Map a pydantic field annotation to a nullable pandas dtype"""
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    base = args[0] if typing.get_origin(annotation) is typing.Union else annotation
+    if base is bool:
+        return "boolean"
+    if base is int:
+        return "Int64"
+    if base is float:
+        return "Float64"
+    if base is datetime:
+        return "datetime64[ns, UTC]"
+    return "string"
+
+
+def nested_model(annotation):
+    """Return the BaseModel inside Optional[Model], or None"""
+    for arg in typing.get_args(annotation) or (annotation,):
+        if isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg
+    return None
+
+
+def tool_columns():
+    """Return ([(column, tool field, attribute field or None)], {column: dtype})
+
+    Attribute model fields become prefixed columns, e.g.
+    drill_attributes.point_angle_deg → drill_point_angle_deg.
+    """
+    columns = []
+    dtypes = {"product_type": "string", "series": "string"}
+    for name, info in Tool.model_fields.items():
+        model = nested_model(info.annotation)
+        if model is None:
+            columns.append((name, name, None))
+            dtypes[name] = column_dtype(info.annotation)
+            continue
+        prefix = name[: -len("_attributes")] if name.endswith("_attributes") else name
+        for attr, attr_info in model.model_fields.items():
+            column = f"{prefix}_{attr}"
+            columns.append((column, name, attr))
+            dtypes[column] = column_dtype(attr_info.annotation)
+    return columns, dtypes
+
+
+def iter_catalog_series(catalog):
+    """Yield (product type name, Series) from Products or a JSONL stream path"""
+    if isinstance(catalog, str):
+        yield from iter_series(catalog)
+        return
+    for product_type in catalog.types:
+        for series in product_type.series:
+            yield product_type.name, series
+
+
+def iter_rows(catalog, columns):
+    """Yield one flat dict per tool"""
+    for product_type, series in iter_catalog_series(catalog):
+        for tool in series.tools:
+            row = {"product_type": product_type, "series": series.name}
+            for column, field, attr in columns:
+                value = getattr(tool, field)
+                if attr is not None:
+                    value = getattr(value, attr) if value is not None else None
+                row[column] = value
+            yield row
+
+
+def products_to_frame(catalog):
+    """Flatten Products (or a JSONL stream) into a typed DataFrame, one row per tool"""
+    import pandas as pd
+
+    columns, dtypes = tool_columns()
+    frame = pd.DataFrame(list(iter_rows(catalog, columns)), columns=list(dtypes))
+    for column, dtype in dtypes.items():
+        if dtype.startswith("datetime"):
+            frame[column] = pd.to_datetime(frame[column], utc=True)
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def require_pyarrow(fmt):
+    if importlib.util.find_spec("pyarrow") is None:
+        raise RuntimeError(
+            f'{fmt} export needs pyarrow: pip install "GarrTool_Scraper[export]"'
+        )
+
+
+def write_partitions(frame, out_dir, fmt="parquet"):
+    """Write the frame partitioned by product type; return the written paths
+
+    Parquet uses hive-style product_type=<name> directories, so
+    pd.read_parquet(out_dir) reads the whole catalog back and filters on
+    product_type can skip partitions. Feather has no partitioning, so
+    each product type gets its own <name>.feather file.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    require_pyarrow(fmt)
+    os.makedirs(out_dir, exist_ok=True)
+
+    paths = []
+    for name, group in frame.groupby("product_type", sort=False):
+        slug = quote(name, safe="")
+        if fmt == "parquet":
+            directory = os.path.join(out_dir, f"product_type={slug}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, "part-0.parquet")
+            # The partition directory carries product_type
+            group.drop(columns="product_type").to_parquet(path, index=False)
+        else:
+            path = os.path.join(out_dir, f"{slug}.feather")
+            group.reset_index(drop=True).to_feather(path)
+        paths.append(path)
+    return paths
+
+
+def summarize(frame):
+    """Per-series tool counts and parse coverage"""
+    return (
+        frame.groupby(["product_type", "series"], sort=False)
+        .agg(
+            tools=("vendor_product_id", "count"),
+            xD_min=("xD", "min"),
+            xD_max=("xD", "max"),
+            with_unparsed_fields=("raw_field_keys", "count"),
+            last_scraped=("scrape_timestamp_utc", "max"),
+        )
+        .reset_index()
+    )
+
+
+def write_excel_summary(frame, path):
+    """Write the per-series summary, and per-product-type totals, to Excel"""
+    import pandas as pd
+
+    summary = summarize(frame)
+    totals = (
+        summary.groupby("product_type", sort=False)
+        .agg(series=("series", "count"), tools=("tools", "sum"))
+        .reset_index()
+    )
+    # Excel cannot store timezone-aware datetimes
+    summary["last_scraped"] = summary["last_scraped"].dt.tz_localize(None)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        totals.to_excel(writer, sheet_name="product_types", index=False)
+        summary.to_excel(writer, sheet_name="series", index=False)
+
+
+def load_catalog(path):
+    """Load Products from a JSON output; a JSONL stream is passed on as its path
+
+    export_catalog reads a stream one series at a time instead of
+    rebuilding the whole tree.
+    """
+    if path.endswith(".jsonl"):
+        return path
+    products = load_products(path)
+    if products is None:
+        raise FileNotFoundError(path)
+    return products
+
+
+def export_catalog(catalog, out_dir, fmt="parquet", excel_path=None):
+    """Flatten and write Products or a JSONL stream; return the written paths"""
+    frame = products_to_frame(catalog)
+    paths = write_partitions(frame, out_dir, fmt)
+    if excel_path:
+        write_excel_summary(frame, excel_path)
+        paths.append(excel_path)
+    print(f"Exported {len(frame)} tools in {frame['product_type'].nunique()} product types")
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the GARR catalog to Parquet/Feather")
+    parser.add_argument("input", help="Products JSON output or JSONL stream")
+    parser.add_argument("out_dir")
+    parser.add_argument("--format", dest="fmt", choices=FORMATS, default="parquet")
+    parser.add_argument("--excel", dest="excel_path", help="Also write an Excel summary")
+    args = parser.parse_args(argv)
+
+    for path in export_catalog(load_catalog(args.input), args.out_dir, args.fmt, args.excel_path):
+        print(f"  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+Local SQLite catalog store
+Keeps the scraped catalog in normalized tables, so questions like "all
+5xD coolant-through drills" are an indexed query instead of a walk over
+the whole Products tree:
+
+    product_types (name, position)
+    series        (product type, name, details, tolerances, position)
+    tools         (vendor_product_id, series, xD, ..., fingerprint)
+    <family>_attributes, one table per attribute model on Tool
+                  (drill_attributes, end_mill_attributes, ...)
+
+Tables and columns follow tool_schemas, so a field added to Tool or to
+an attribute model shows up here too (new columns need a fresh store).
+The crawler bulk-upserts each series; every tool carries a fingerprint
+of its content, so an upsert reports which EDPs are new, changed or
+removed since the last crawl (removed only from a listing that was read
+in full), and the stored catalog can stand in as the previous run for an
+incremental crawl.
+
+Usage:
+    store = CatalogStore("garr_catalog.db")
+    changes = store.upsert_products(products, listings)
+    edps = store.find_edps("drill", xD=5.0, coolant_through=True)
+    tools = store.tools(edps)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import typing
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from tool_records import validate_tools
+from tool_schemas import Products, ProductType, Series, Tool
+
+
+def sql_type(annotation):
+    """SQLite column type for a pydantic field annotation"""
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    base = args[0] if typing.get_origin(annotation) is typing.Union else annotation
+    if base in (bool, int):
+        return "INTEGER"
+    if base is float:
+        return "REAL"
+    return "TEXT"
+
+
+def attribute_model(annotation):
+    """Return the BaseModel inside Optional[Model], or None"""
+    for arg in typing.get_args(annotation) or (annotation,):
+        if isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg
+    return None
+
+
+# Tool's own columns, and {family table: attribute model} for the nested models
+TOOL_FIELDS = [
+    name for name, info in Tool.model_fields.items() if attribute_model(info.annotation) is None
+]
+FAMILY_MODELS = {
+    name: attribute_model(info.annotation)
+    for name, info in Tool.model_fields.items()
+    if attribute_model(info.annotation) is not None
+}
+
+# Attribute lookups worth an index, beyond the tools table's own
+KEY_ATTRIBUTES = {
+    "drill_attributes": [("xD", "coolant_through"), ("point_angle_deg",), ("drill_category",)],
+    "end_mill_attributes": [("end_type", "corner_radius_mm"), ("center_cutting",)],
+    "reamer_attributes": [("tolerance_class",), ("coolant_through",)],
+    "drill_mill_attributes": [("point_angle_deg",)],
+    "burr_attributes": [("head_shape", "cut_style")],
+}
+
+
+def family_table(family):
+    """Table name for a family given as "drill" or "drill_attributes" """
+    table = family if family.endswith("_attributes") else f"{family}_attributes"
+    if table not in FAMILY_MODELS:
+        raise ValueError(
+            f"Unknown attribute family {family!r}; choose from "
+            f"{', '.join(t[: -len('_attributes')] for t in FAMILY_MODELS)}"
+        )
+    return table
+
+
+def schema():
+    """CREATE statements for every table and index"""
+    tool_columns = ",\n".join(
+        f"    {name} {sql_type(Tool.model_fields[name].annotation)}"
+        + (" PRIMARY KEY" if name == "vendor_product_id" else "")
+        for name in TOOL_FIELDS
+    )
+    statements = [
+        """CREATE TABLE IF NOT EXISTS product_types (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL
+)""",
+        """CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    product_type_id INTEGER NOT NULL REFERENCES product_types (id),
+    name TEXT NOT NULL,
+    details TEXT,
+    tolerances TEXT,
+    position INTEGER NOT NULL,
+    UNIQUE (product_type_id, name)
+)""",
+        f"""CREATE TABLE IF NOT EXISTS tools (
+{tool_columns},
+    series_id INTEGER NOT NULL REFERENCES series (id),
+    position INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)""",
+        "CREATE INDEX IF NOT EXISTS tools_series_id ON tools (series_id, position)",
+        "CREATE INDEX IF NOT EXISTS tools_series_name ON tools (series_name)",
+        "CREATE INDEX IF NOT EXISTS tools_xd ON tools (xD)",
+    ]
+    for table, model in FAMILY_MODELS.items():
+        columns = "".join(
+            f",\n    {name} {sql_type(info.annotation)}" for name, info in model.model_fields.items()
+        )
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table} (\n"
+            f"    vendor_product_id TEXT PRIMARY KEY "
+            f"REFERENCES tools (vendor_product_id) ON DELETE CASCADE{columns}\n)"
+        )
+        for columns in KEY_ATTRIBUTES.get(table, []):
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {table}_{'_'.join(columns).lower()} "
+                f"ON {table} ({', '.join(columns)})"
+            )
+    return ";\n".join(statements) + ";"
+
+
+def to_sql(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def fingerprint(tool):
+    """Hash of a tool's content, ignoring when it was scraped"""
+    payload = tool.model_dump_json(exclude={"scrape_timestamp_utc"})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ChangeSet:
+    """EDPs by what an upsert did to them, compared with the stored catalog"""
+
+    new: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+
+    def extend(self, other):
+        for name in ("new", "changed", "removed", "unchanged"):
+            getattr(self, name).extend(getattr(other, name))
+
+    def summary(self):
+        return (
+            f"{len(self.new)} new, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {len(self.unchanged)} unchanged"
+        )
+
+
+class CatalogStore:
+    """Normalized, indexed SQLite copy of the catalog at `path`"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(schema())
+        self.db.commit()
+        self._upsert_tool_sql = (
+            f"INSERT INTO tools ({', '.join(TOOL_FIELDS)}, series_id, position, fingerprint, "
+            f"updated_at) VALUES ({', '.join('?' * (len(TOOL_FIELDS) + 4))}) "
+            f"ON CONFLICT (vendor_product_id) DO UPDATE SET "
+            + ", ".join(
+                f"{name} = excluded.{name}"
+                for name in TOOL_FIELDS + ["series_id", "position", "fingerprint", "updated_at"]
+                if name != "vendor_product_id"
+            )
+        )
+
+    # ===== Writes =====
+
+    def _product_type_id(self, name, position):
+        self.db.execute(
+            "INSERT INTO product_types (name, position) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET position = excluded.position",
+            (name, position),
+        )
+        return self.db.execute(
+            "SELECT id FROM product_types WHERE name = ?", (name,)
+        ).fetchone()[0]
+
+    def _series_id(self, product_type_id, series, position):
+        self.db.execute(
+            "INSERT INTO series (product_type_id, name, details, tolerances, position) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (product_type_id, name) DO UPDATE SET details = excluded.details, "
+            "tolerances = excluded.tolerances, position = excluded.position",
+            (product_type_id, series.name, series.details, series.tolerances, position),
+        )
+        return self.db.execute(
+            "SELECT id FROM series WHERE product_type_id = ? AND name = ?",
+            (product_type_id, series.name),
+        ).fetchone()[0]
+
+    def _upsert_series(self, product_type_id, series, position, listed_edps=None):
+        series_id = self._series_id(product_type_id, series, position)
+        stored = dict(
+            self.db.execute(
+                "SELECT vendor_product_id, fingerprint FROM tools WHERE series_id = ?",
+                (series_id,),
+            ).fetchall()
+        )
+        changes = ChangeSet()
+        now = time.time()
+        rows = []
+        for i, tool in enumerate(series.tools):
+            digest = fingerprint(tool)
+            previous = stored.pop(tool.vendor_product_id, None)
+            if previous is None:
+                changes.new.append(tool.vendor_product_id)
+            elif previous != digest:
+                changes.changed.append(tool.vendor_product_id)
+            else:
+                changes.unchanged.append(tool.vendor_product_id)
+            rows.append(
+                tuple(to_sql(getattr(tool, name)) for name in TOOL_FIELDS)
+                + (series_id, i, digest, now)
+            )
+        # Only a listing read in full says an EDP is gone; a failed or
+        # capped fetch just leaves the stored row alone
+        if listed_edps is not None:
+            listed = set(listed_edps)
+            changes.removed = [edp for edp in stored if edp not in listed]
+
+        self.db.executemany(
+            "DELETE FROM tools WHERE vendor_product_id = ?", [(edp,) for edp in changes.removed]
+        )
+        self.db.executemany(self._upsert_tool_sql, rows)
+        # Attribute rows only change with the tool's fingerprint
+        rewrite = set(changes.new) | set(changes.changed)
+        written = [tool for tool in series.tools if tool.vendor_product_id in rewrite]
+        edps = [(tool.vendor_product_id,) for tool in written]
+        for table, model in FAMILY_MODELS.items():
+            names = list(model.model_fields)
+            self.db.executemany(f"DELETE FROM {table} WHERE vendor_product_id = ?", edps)
+            self.db.executemany(
+                f"INSERT INTO {table} (vendor_product_id, {', '.join(names)}) "
+                f"VALUES ({', '.join('?' * (len(names) + 1))})",
+                [
+                    (tool.vendor_product_id,)
+                    + tuple(to_sql(getattr(attributes, name)) for name in names)
+                    for tool in written
+                    for attributes in (getattr(tool, table),)
+                    if attributes is not None
+                ],
+            )
+        return changes
+
+    def upsert_series(
+        self, product_type_name, series, position=0, type_position=0, listed_edps=None
+    ):
+        """Insert or update one series and its tools; return a ChangeSet
+
+        listed_edps are the EDPs of the series' listing, read in full;
+        stored tools missing from it are removed. Without it, nothing is
+        removed.
+        """
+        with self.lock:
+            product_type_id = self._product_type_id(product_type_name, type_position)
+            changes = self._upsert_series(product_type_id, series, position, listed_edps)
+            self.db.commit()
+        return changes
+
+    def upsert_products(self, products, listings=None):
+        """Upsert a whole Products tree in one transaction; return a ChangeSet
+
+        listings maps (product type, series name) to the EDPs of listings
+        read in full, as for upsert_series.
+        """
+        listings = listings or {}
+        changes = ChangeSet()
+        with self.lock:
+            for type_position, product_type in enumerate(products.types):
+                product_type_id = self._product_type_id(product_type.name, type_position)
+                for position, series in enumerate(product_type.series):
+                    listed_edps = listings.get((product_type.name, series.name))
+                    changes.extend(
+                        self._upsert_series(product_type_id, series, position, listed_edps)
+                    )
+            self.db.commit()
+        return changes
+
+    # ===== Lookups =====
+
+    def find_edps(self, family=None, product_type=None, **filters):
+        """EDPs matching every filter, in catalog order
+
+        Filters name a tool column (series_name, xD, ...) or, with a
+        family ("drill", "end_mill", ...), one of that family's
+        attributes. A list or tuple value matches any of its items and
+        None matches a missing value.
+        """
+        joins = ["JOIN series s ON s.id = t.series_id", "JOIN product_types p ON p.id = s.product_type_id"]
+        table = None
+        attributes = ()
+        if family is not None:
+            table = family_table(family)
+            attributes = FAMILY_MODELS[table].model_fields
+            joins.append(f"JOIN {table} a ON a.vendor_product_id = t.vendor_product_id")
+        conditions = []
+        params = []
+
+        def match(column, value):
+            if value is None:
+                conditions.append(f"{column} IS NULL")
+            elif isinstance(value, (list, tuple)):
+                conditions.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params.extend(to_sql(v) for v in value)
+            else:
+                conditions.append(f"{column} = ?")
+                params.append(to_sql(value))
+
+        if product_type is not None:
+            match("p.name", product_type)
+        for name, value in filters.items():
+            if name in TOOL_FIELDS:
+                match(f"t.{name}", value)
+            elif name in attributes:
+                match(f"a.{name}", value)
+            else:
+                raise ValueError(
+                    f"Unknown filter {name!r}"
+                    + ("" if family else "; attribute filters need a family")
+                )
+        query = f"SELECT t.vendor_product_id FROM tools t {' '.join(joins)}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY p.position, s.position, t.position"
+        with self.lock:
+            return [row[0] for row in self.db.execute(query, params)]
+
+    def _load_tools(self, where, params):
+        """Rebuild Tools from their rows; returns [(series_id, Tool)] in catalog order"""
+        joins = (
+            "JOIN series s ON s.id = t.series_id "
+            "JOIN product_types p ON p.id = s.product_type_id"
+        )
+        rows = self.db.execute(
+            f"SELECT t.series_id, {', '.join('t.' + name for name in TOOL_FIELDS)} "
+            f"FROM tools t {joins} WHERE {where} "
+            f"ORDER BY p.position, s.position, t.position",
+            params,
+        ).fetchall()
+        records = [dict(zip(TOOL_FIELDS, row[1:])) for row in rows]
+        by_edp = {record["vendor_product_id"]: record for record in records}
+        for table, model in FAMILY_MODELS.items():
+            names = list(model.model_fields)
+            for row in self.db.execute(
+                f"SELECT a.vendor_product_id, {', '.join('a.' + name for name in names)} "
+                f"FROM {table} a JOIN tools t ON t.vendor_product_id = a.vendor_product_id "
+                f"{joins} WHERE {where}",
+                params,
+            ):
+                by_edp[row[0]][table] = dict(zip(names, row[1:]))
+        return list(zip((row[0] for row in rows), validate_tools(records)))
+
+    def tools(self, edps):
+        """Tools for the given EDPs, in catalog order; unknown EDPs are skipped"""
+        edps = list(edps)
+        found = []
+        with self.lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(edps), 500):
+                chunk = edps[start : start + 500]
+                found.extend(
+                    self._load_tools(
+                        f"t.vendor_product_id IN ({', '.join('?' * len(chunk))})", chunk
+                    )
+                )
+        return [tool for _, tool in found]
+
+    def tool(self, edp):
+        """The stored Tool for an EDP, or None"""
+        tools = self.tools([edp])
+        return tools[0] if tools else None
+
+    def products(self):
+        """Rebuild the whole stored catalog as a Products tree"""
+        with self.lock:
+            series_rows = self.db.execute(
+                "SELECT s.id, p.name, s.name, s.details, s.tolerances "
+                "FROM series s JOIN product_types p ON p.id = s.product_type_id "
+                "ORDER BY p.position, s.position"
+            ).fetchall()
+            tools = self._load_tools("1", ())
+        by_series = {}
+        for series_id, tool in tools:
+            by_series.setdefault(series_id, []).append(tool)
+        types = {}
+        for series_id, type_name, name, details, tolerances in series_rows:
+            types.setdefault(type_name, []).append(
+                Series(
+                    name=name,
+                    details=details,
+                    tolerances=tolerances,
+                    tools=by_series.get(series_id, []),
+                )
+            )
+        return Products(
+            types=[ProductType(name=name, series=series) for name, series in types.items()]
+        )
+
+    def counts(self):
+        """Return {table: row count}"""
+        with self.lock:
+            return {
+                table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ["product_types", "series", "tools", *FAMILY_MODELS]
+            }
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,422 @@
+"""
+Command-line entry point (installed as `garr`)
+Runs without prompts, so crawls can be started from cron or a container.
+
+Subcommands:
+    garr discover [--refresh]                 resolve listing URLs and series tables
+    garr crawl [--profile http] [options]     crawl; options override the profile
+    garr crawl --profile production --plan    pages and wall time, without crawling
+    garr export garr_products.json export/    Parquet/Feather (+ Excel) export
+    garr query garr_catalog.db --family drill --where xD=5 --where coolant_through=true
+                                              indexed lookups in a catalog store
+    garr bench --paths http parser            benchmark harness
+
+A profile bundles crawl options: backend, concurrency, cache and output
+format; without --profile, "default" crawls the entire catalog. Limits
+such as --max-edps take 0 or "none" to lift a profile's cap. Built-in
+profiles are listed by `garr crawl --list-profiles`; more can be loaded
+from a JSON file of {name: {option: value}} with --profile-file.
+Backends are imported by the subcommand that needs them, so
+`garr export` never loads Selenium.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from backends import BACKENDS
+
+
+# Crawl profiles: keyword arguments for scrape_data.main, plus
+# output_format (json, jsonl, parquet, feather) and export_dir
+PROFILES = {
+    # The whole catalog, as `python scrape_data.py` has always crawled it
+    "default": {
+        "backend": "selenium",
+        "output_format": "json",
+    },
+    "trial": {
+        "backend": "selenium",
+        "max_product_types": 2,
+        "max_series": 3,
+        "max_edps": 10,
+        "output_format": "json",
+    },
+    "selenium": {
+        "backend": "selenium",
+        "browsers": 2,
+        "cache_dir": "garr_cache",
+        "journal_path": "garr_journal.db",
+        "output_format": "json",
+    },
+    "http": {
+        "backend": "http",
+        "workers": 8,
+        "requests_per_second": 4.0,
+        "cache_dir": "garr_cache",
+        "journal_path": "garr_journal.db",
+        "output_format": "json",
+    },
+    "firecrawl": {
+        "backend": "firecrawl",
+        "workers": 5,
+        "cache_dir": "garr_cache",
+        "output_format": "json",
+    },
+    "production": {
+        "backend": "http",
+        "workers": 16,
+        "requests_per_second": 8.0,
+        "processes": os.cpu_count() or 1,
+        "cache_dir": "garr_cache",
+        "journal_path": "garr_journal.db",
+        "stream_path": "garr_products.jsonl",
+        "incremental": True,
+        "store_path": "garr_catalog.db",
+        "output_format": "parquet",
+        "export_dir": "garr_export",
+    },
+}
+
+OUTPUT_FORMATS = ("json", "jsonl", "parquet", "feather")
+
+
+def load_profiles(path=None):
+    """Built-in profiles, updated with those in a JSON profile file"""
+    profiles = {name: dict(options) for name, options in PROFILES.items()}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for name, options in json.load(f).items():
+                profiles[name] = dict(profiles.get(name, {}), **options)
+    return profiles
+
+
+def resolve_crawl_options(args):
+    """Merge the chosen profile with the options given on the command line
+
+    Returns (main() keyword arguments, output_format, export_dir).
+    """
+    import inspect
+
+    from scrape_data import main as crawl_main
+
+    profiles = load_profiles(args.profile_file)
+    if args.profile not in profiles:
+        raise SystemExit(f"Unknown profile {args.profile!r}; choose from {', '.join(profiles)}")
+    options = dict(profiles[args.profile])
+    options.update(args.crawl_options)
+    output_format = options.pop("output_format", "json")
+    export_dir = options.pop("export_dir", "garr_export")
+    if args.output_format:
+        output_format = args.output_format
+    if args.export_dir:
+        export_dir = args.export_dir
+    if output_format not in OUTPUT_FORMATS:
+        raise SystemExit(f"Unknown output format {output_format!r}")
+    if output_format == "jsonl":
+        options.setdefault("stream_path", "garr_products.jsonl")
+
+    accepted = inspect.signature(crawl_main).parameters
+    unknown = [key for key in options if key not in accepted]
+    if unknown:
+        raise SystemExit(f"Profile {args.profile!r} has unknown options: {', '.join(unknown)}")
+    if options.get("firecrawl_batch") and options.get("backend", "selenium") != "firecrawl":
+        raise SystemExit("--firecrawl-batch needs --backend firecrawl")
+    return options, output_format, export_dir
+
+
+# ===== Subcommands =====
+
+
+def cmd_discover(args):
+    from http_fetcher import BASE_URL, create_session
+    from product_types import PRODUCT_TYPES
+    from site_map import discover_site_map, load_or_discover, session_fetcher
+
+    fetch_html = session_fetcher(create_session())
+    if args.refresh:
+        site_map = discover_site_map(fetch_html, PRODUCT_TYPES, BASE_URL)
+        site_map.save(args.site_map_path)
+    else:
+        site_map = load_or_discover(args.site_map_path, fetch_html, PRODUCT_TYPES, BASE_URL)
+    for name in PRODUCT_TYPES:
+        series = site_map.series_for(name)
+        print(f"  {name:<32} {len(series)} series  {site_map.url_for(name) or 'not found'}")
+    return 0
+
+
+def cmd_crawl(args):
+    if args.list_profiles:
+        for name, options in load_profiles(args.profile_file).items():
+            print(f"{name}: {json.dumps(options)}")
+        return 0
+    options, output_format, export_dir = resolve_crawl_options(args)
+    if args.plan:
+        return plan(options, args.page_seconds)
+
+    if output_format in ("parquet", "feather"):
+        from catalog_export import require_pyarrow
+
+        # Fail now rather than after a multi-hour crawl
+        try:
+            require_pyarrow(output_format)
+        except RuntimeError as e:
+            raise SystemExit(str(e))
+
+    from scrape_data import main as crawl_main
+
+    products = crawl_main(**options)
+    if output_format in ("parquet", "feather"):
+        from catalog_export import export_catalog
+
+        # A streamed crawl returns its series without tools; export from the stream
+        catalog = options.get("stream_path") or products
+        for path in export_catalog(catalog, export_dir, output_format):
+            print(f"  {path}")
+    return 0
+
+
+def plan(options, page_seconds=None):
+    """Print the crawl plan for resolved options; nothing is crawled"""
+    from crawl_plan import plan_crawl
+    from http_fetcher import BASE_URL, create_session
+    from incremental import index_products, load_products
+    from page_cache import PageCache
+    from product_types import PRODUCT_TYPES, select_product_types
+    from site_map import SiteMap, load_or_discover, session_fetcher
+
+    product_types = select_product_types(
+        options.get("product_type_names"), options.get("max_product_types")
+    )
+    site_map_path = options.get("site_map_path", "garr_site_map.json")
+    try:
+        site_map = load_or_discover(
+            site_map_path, session_fetcher(create_session()), PRODUCT_TYPES, BASE_URL
+        )
+    except Exception as e:
+        print(f"  ✗ Site-map discovery failed: {str(e)}")
+        site_map = SiteMap.load(site_map_path)
+    output_path = options.get("output_path", "garr_products.json")
+    previous_products = load_products(output_path)
+    store_path = options.get("store_path")
+    if previous_products is None and store_path and os.path.exists(store_path):
+        from catalog_store import CatalogStore
+
+        store = CatalogStore(store_path)
+        previous_products = store.products()
+        store.close()
+    previous = index_products(previous_products)
+    cache_dir = options.get("cache_dir")
+    cache = PageCache(cache_dir) if cache_dir and os.path.isdir(cache_dir) else None
+    try:
+        plan_crawl(site_map, product_types, options, previous, cache, page_seconds).report()
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+def cmd_export(args):
+    from catalog_export import export_catalog, load_catalog
+
+    for path in export_catalog(load_catalog(args.input), args.out_dir, args.fmt, args.excel_path):
+        print(f"  {path}")
+    return 0
+
+
+def parse_limit(text):
+    """A crawl limit: a positive count, or 0 / "none" for no limit"""
+    if text.strip().lower() in ("0", "none"):
+        return None
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a count or none, got {text!r}")
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"expected a count or none, got {text!r}")
+    return value
+
+
+def parse_filter(text):
+    """NAME=VALUE with VALUE parsed as JSON where it can be (5, true, null)"""
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def cmd_query(args):
+    import time
+
+    from catalog_store import CatalogStore
+
+    if not os.path.exists(args.store):
+        raise SystemExit(f"No catalog store at {args.store}")
+    store = CatalogStore(args.store)
+    try:
+        start = time.perf_counter()
+        edps = store.find_edps(args.family, args.product_type, **dict(args.filters))
+        elapsed = time.perf_counter() - start
+        if args.tools:
+            for tool in store.tools(edps[: args.limit]):
+                print(tool.model_dump_json())
+        else:
+            for edp in edps[: args.limit]:
+                print(edp)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    finally:
+        store.close()
+    print(f"{len(edps)} EDPs in {elapsed * 1000:.2f}ms", file=sys.stderr)
+    return 0
+
+
+def cmd_bench(args):
+    import bench
+
+    bench.main(args.bench_args)
+    return 0
+
+
+def add_crawl_arguments(parser):
+    """Add main()'s options to an argparse parser
+
+    Options are only set when given on the command line, so main()'s
+    defaults (or a crawl profile's values) apply to the rest.
+    """
+    suppress = argparse.SUPPRESS
+    parser.add_argument("--backend", choices=list(BACKENDS), default=suppress,
+                        help="Product-details fetcher: the listing's browser, requests "
+                             "without Chrome, or Firecrawl extraction")
+    parser.add_argument("--workers", type=int, default=suppress,
+                        help="Concurrent product-details fetches; also caps each "
+                             "endpoint's adaptive concurrency")
+    parser.add_argument("--firecrawl-batch", action="store_true", default=suppress,
+                        help="With the firecrawl backend, extract each series as one batch job")
+    parser.add_argument("--no-firecrawl-batch", dest="firecrawl_batch", action="store_false",
+                        default=suppress, help="Extract pages one by one, even under a batch profile")
+    parser.add_argument("--requests-per-second", type=float, default=suppress,
+                        help="Request rate cap for the http backend")
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default=suppress,
+                        help="How the http backend runs its workers")
+    parser.add_argument("--browsers", type=int, default=suppress,
+                        help="Headless Chrome sessions crawling product types in parallel")
+    parser.add_argument("--processes", type=int, default=suppress,
+                        help="Shard the crawl by series across this many worker processes")
+    parser.add_argument("--initial-concurrency", type=int, default=suppress,
+                        help="Starting concurrency of each endpoint's adaptive throttle")
+    parser.add_argument("--cache-dir", default=suppress,
+                        help="Keep product-details pages on disk and parse re-runs from there")
+    parser.add_argument("--output", dest="output_path", default=suppress,
+                        help="Products output file")
+    # A --no- flag for every boolean, so a profile's True can be turned off
+    # (argparse.BooleanOptionalAction needs Python 3.9)
+    parser.add_argument("--incremental", action="store_true", default=suppress,
+                        help="Re-scrape only new or stale EDPs and merge into the previous output")
+    parser.add_argument("--no-incremental", dest="incremental", action="store_false",
+                        default=suppress, help="Re-scrape every EDP, even under an incremental profile")
+    parser.add_argument("--max-age-days", type=float, default=suppress,
+                        help="With --incremental, EDPs older than this are stale")
+    parser.add_argument("--journal", dest="journal_path", default=suppress,
+                        help="Checkpoint per-EDP progress here; a restart resumes "
+                             "an unfinished crawl")
+    parser.add_argument("--stream", dest="stream_path", default=suppress,
+                        help="Stream each tool to this JSONL file as it is scraped")
+    parser.add_argument("--site-map", dest="site_map_path", default=suppress,
+                        help="Cached listing URLs and series table ids")
+    parser.add_argument("--metrics-port", type=int, default=suppress,
+                        help="Serve live stage metrics at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--json-log", dest="json_log_path", default=suppress,
+                        help='Log every stage call as a JSON line ("-" for stderr)')
+    parser.add_argument("--pdf-dir", default=suppress,
+                        help="Also archive each product-details page as a PDF here")
+    parser.add_argument("--store", dest="store_path", default=suppress,
+                        help="Also upsert the result into this SQLite catalog store")
+    # Limits; the default is the entire catalog, and 0 or "none" lifts a
+    # profile's limit
+    parser.add_argument("--product-type", dest="product_type_names", action="append",
+                        metavar="NAME", default=suppress,
+                        help="Crawl only this product type (repeatable)")
+    parser.add_argument("--max-product-types", type=parse_limit, metavar="N",
+                        default=suppress, help="Product types (0 or none: all)")
+    parser.add_argument("--max-series", type=parse_limit, metavar="N", default=suppress,
+                        help="Series per product type (0 or none: all)")
+    parser.add_argument("--max-edps", type=parse_limit, metavar="N", default=suppress,
+                        help="EDPs per series (0 or none: all)")
+    return parser
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="garr", description="GARR Tool catalog scraper")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    discover = commands.add_parser("discover", help="Resolve listing URLs and series tables")
+    discover.add_argument("--site-map", dest="site_map_path", default="garr_site_map.json")
+    discover.add_argument("--refresh", action="store_true", help="Ignore the cached site map")
+    discover.set_defaults(handler=cmd_discover)
+
+    crawl = commands.add_parser("crawl", help="Crawl the catalog")
+    crawl.add_argument("--profile", default="default",
+                       help="Crawl profile; the default crawls the entire catalog")
+    crawl.add_argument("--profile-file", help="JSON file of extra profiles")
+    crawl.add_argument("--list-profiles", action="store_true")
+    crawl.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS)
+    crawl.add_argument("--export-dir")
+    crawl.add_argument("--plan", action="store_true",
+                       help="Report pages and estimated wall time, then exit")
+    crawl.add_argument("--page-seconds", type=float,
+                       help="Measured seconds per product-details page, for --plan")
+    options = crawl.add_argument_group("crawl options (override the profile)")
+    add_crawl_arguments(options)
+    crawl.set_defaults(handler=cmd_crawl)
+
+    export = commands.add_parser("export", help="Export a crawl to Parquet/Feather")
+    export.add_argument("input", help="Products JSON output or JSONL stream")
+    export.add_argument("out_dir")
+    export.add_argument("--format", dest="fmt", choices=("parquet", "feather"), default="parquet")
+    export.add_argument("--excel", dest="excel_path", help="Also write an Excel summary")
+    export.set_defaults(handler=cmd_export)
+
+    query = commands.add_parser("query", help="Look up EDPs in a catalog store")
+    query.add_argument("store", help="Catalog store written by crawl --store")
+    query.add_argument("--family", help="Attribute family: drill, end_mill, reamer, ...")
+    query.add_argument("--product-type")
+    query.add_argument("--where", dest="filters", type=parse_filter, action="append",
+                       default=[], metavar="NAME=VALUE",
+                       help="Tool or family attribute filter (repeatable)")
+    query.add_argument("--tools", action="store_true", help="Print tools as JSON lines")
+    query.add_argument("--limit", type=int)
+    query.set_defaults(handler=cmd_query)
+
+    # Everything after `bench` goes to bench.py's own parser, --help included
+    bench = commands.add_parser("bench", help="Run the benchmark harness", add_help=False)
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def parse_args(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == "crawl":
+        # Crawl options are only present when given, so they can override the profile
+        own = {"command", "handler", "profile", "profile_file", "list_profiles",
+               "output_format", "export_dir", "plan", "page_seconds"}
+        args.crawl_options = {k: v for k, v in vars(args).items() if k not in own}
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Durable crawl journal
+Records the status of every EDP (pending, done, failed + retry count) in
+SQLite as the crawl goes, so a crash or browser hiccup doesn't restart a
+multi-hour run. On restart, finished series are rebuilt from the journal
+and only unfinished or retryable EDPs are scraped again. Failed EDPs are
+retried with exponential backoff up to max_retries. Once a crawl's
+output is written the run is finished and the journal cleared, so the
+next crawl starts from the live listing again.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from tool_records import validate_tools_json
+from tool_schemas import Series
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class CrawlJournal:
+    """SQLite-backed per-EDP crawl state"""
+
+    def __init__(self, path, max_retries=3, backoff_base=2.0, backoff_max=120.0):
+        self.path = path
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS product_types (
+                name TEXT PRIMARY KEY,
+                series_names TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS edps (
+                product_type TEXT NOT NULL,
+                series_name TEXT NOT NULL,
+                edp TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                retries INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                tool_json TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (product_type, series_name, edp)
+            );
+            CREATE INDEX IF NOT EXISTS edps_status
+                ON edps (product_type, series_name, status);
+            CREATE TABLE IF NOT EXISTS series_sections (
+                product_type TEXT NOT NULL,
+                series_name TEXT NOT NULL,
+                details TEXT,
+                tolerances TEXT,
+                PRIMARY KEY (product_type, series_name)
+            );
+            """
+        )
+        self.db.commit()
+
+    # ===== Listing state =====
+
+    def register_product_type(self, name, series_names):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO product_types (name, series_names) VALUES (?, ?)",
+                (name, json.dumps(series_names)),
+            )
+            self.db.commit()
+
+    def series_names(self, name):
+        """Series names recorded for a product type, or None if never listed"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT series_names FROM product_types WHERE name = ?", (name,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def register_edps(self, product_type, series_name, edps):
+        """Add newly listed EDPs as pending; known EDPs keep their status"""
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO edps (product_type, series_name, edp, position, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (product_type, series_name, edp) DO UPDATE SET position = excluded.position",
+                [
+                    (product_type, series_name, edp, i, PENDING, now)
+                    for i, edp in enumerate(edps)
+                ],
+            )
+            self.db.commit()
+
+    def record_series_sections(self, product_type, series_name, details, tolerances):
+        """Keep a series' description and tolerances for a resumed crawl"""
+        if details is None and tolerances is None:
+            return
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO series_sections "
+                "(product_type, series_name, details, tolerances) VALUES (?, ?, ?, ?)",
+                (product_type, series_name, details, tolerances),
+            )
+            self.db.commit()
+
+    # ===== Outcomes =====
+
+    def record(self, product_type, series_name, tools, errors):
+        """Record scraped tools as done and errors ({edp: message}) as failed"""
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "UPDATE edps SET status = ?, tool_json = ?, last_error = NULL, updated_at = ? "
+                "WHERE product_type = ? AND series_name = ? AND edp = ?",
+                [
+                    (DONE, tool.model_dump_json(), now, product_type, series_name,
+                     tool.vendor_product_id)
+                    for tool in tools
+                ],
+            )
+            for edp, message in errors.items():
+                row = self.db.execute(
+                    "SELECT retries FROM edps "
+                    "WHERE product_type = ? AND series_name = ? AND edp = ?",
+                    (product_type, series_name, edp),
+                ).fetchone()
+                retries = (row[0] if row else 0) + 1
+                delay = min(self.backoff_max, self.backoff_base ** retries)
+                self.db.execute(
+                    "UPDATE edps SET status = ?, retries = ?, last_error = ?, "
+                    "next_attempt_at = ?, updated_at = ? "
+                    "WHERE product_type = ? AND series_name = ? AND edp = ?",
+                    (FAILED, retries, message, now + delay, now, product_type,
+                     series_name, edp),
+                )
+            self.db.commit()
+
+    # ===== Run boundary =====
+
+    def unfinished(self):
+        """True if an earlier crawl recorded progress and never finished"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT EXISTS (SELECT 1 FROM edps) OR EXISTS (SELECT 1 FROM product_types)"
+            ).fetchone()
+        return bool(row[0])
+
+    def finish_run(self):
+        """Clear the journal after a successful crawl"""
+        with self.lock:
+            self.db.execute("DELETE FROM edps")
+            self.db.execute("DELETE FROM product_types")
+            self.db.execute("DELETE FROM series_sections")
+            self.db.commit()
+
+    # ===== Queries =====
+
+    def completed_tools(self, product_type, series_name):
+        """Return {edp: Tool} for EDPs already done"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT edp, tool_json FROM edps "
+                "WHERE product_type = ? AND series_name = ? AND status = ? "
+                "ORDER BY position",
+                (product_type, series_name, DONE),
+            ).fetchall()
+        tools = validate_tools_json([tool_json for _, tool_json in rows])
+        return {edp: tool for (edp, _), tool in zip(rows, tools)}
+
+    def retryable(self, product_type, series_name):
+        """Return [(edp, next_attempt_at)] for failed EDPs with retries left"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT edp, next_attempt_at FROM edps "
+                "WHERE product_type = ? AND series_name = ? AND status = ? AND retries < ? "
+                "ORDER BY position",
+                (product_type, series_name, FAILED, self.max_retries),
+            ).fetchall()
+
+    def wait_for_retries(self, product_type, series_name):
+        """Sleep until the earliest backoff expires; return EDPs due for retry"""
+        retryable = self.retryable(product_type, series_name)
+        if not retryable:
+            return []
+        delay = min(next_at for _, next_at in retryable) - time.time()
+        if delay > 0:
+            print(f"  Retrying {len(retryable)} failed EDPs in {delay:.1f}s...")
+            time.sleep(delay)
+        now = time.time()
+        return [edp for edp, next_at in retryable if next_at <= now]
+
+    def series_complete(self, product_type, series_name):
+        """True if the series was listed and nothing is left to do"""
+        with self.lock:
+            counts = self.db.execute(
+                "SELECT COUNT(*), "
+                "SUM(CASE WHEN status = ? OR (status = ? AND retries < ?) THEN 1 ELSE 0 END) "
+                "FROM edps WHERE product_type = ? AND series_name = ?",
+                (PENDING, FAILED, self.max_retries, product_type, series_name),
+            ).fetchone()
+        return counts[0] > 0 and not counts[1]
+
+    def series_sections(self, product_type, series_name):
+        """Return (details, tolerances) recorded for a series, or (None, None)"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT details, tolerances FROM series_sections "
+                "WHERE product_type = ? AND series_name = ?",
+                (product_type, series_name),
+            ).fetchone()
+        return tuple(row) if row else (None, None)
+
+    def listed_edps(self, product_type, series_name):
+        """Every EDP registered for a series, in listing order"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT edp FROM edps WHERE product_type = ? AND series_name = ? "
+                "ORDER BY position",
+                (product_type, series_name),
+            ).fetchall()
+        return [edp for (edp,) in rows]
+
+    def series(self, product_type, series_name, previous=None):
+        """Rebuild a Series from the journal
+
+        With `previous` ({edp: Tool} from the last run), listed EDPs that
+        ran out of retries keep their previous tool, as in a live
+        incremental crawl.
+        """
+        details, tolerances = self.series_sections(product_type, series_name)
+        tools = list(self.completed_tools(product_type, series_name).values())
+        if previous:
+            from incremental import merge_tools
+
+            tools = merge_tools(self.listed_edps(product_type, series_name), previous, tools)
+        return Series(
+            name=series_name,
+            details=details,
+            tolerances=tolerances,
+            tools=tools,
+        )
+
+    def summary(self):
+        """Return {status: count} over the whole journal"""
+        with self.lock:
+            return dict(
+                self.db.execute("SELECT status, COUNT(*) FROM edps GROUP BY status").fetchall()
+            )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,162 @@
+"""
+Dry-run planning for a crawl
+Works out, before anything is fetched, how many listing and
+product-details pages a crawl with the given options will touch, and
+roughly how long it will take. EDP counts come from the previous output
+where a series was crawled before, and otherwise from the rows a
+listing shows before expansion (a lower bound). Fresh cached pages and,
+for incremental crawls, up-to-date previous tools are not counted as
+fetches.
+
+Per-page timings are rough defaults per backend; pass measured values
+(e.g. the stage means from a previous run's metrics) for a better
+estimate.
+"""
+
+from dataclasses import dataclass, field
+
+from http_fetcher import product_details_url
+from incremental import is_stale, max_age_from_days
+
+
+# Seconds per product-details page for one worker, by backend
+PAGE_SECONDS = {"selenium": 2.5, "http": 0.4, "firecrawl": 8.0}
+# Seconds to load one listing and expand every table on it
+LISTING_SECONDS = 20.0
+
+
+@dataclass
+class SeriesPlan:
+    name: str
+    edps: int
+    exact: bool  # False: a lower bound from the unexpanded listing
+    to_fetch: int
+
+
+@dataclass
+class ProductTypePlan:
+    name: str
+    series: list = field(default_factory=list)
+    series_known: bool = True
+
+
+@dataclass
+class CrawlPlan:
+    backend: str
+    product_types: list = field(default_factory=list)
+    listing_pages: int = 0
+    detail_pages: int = 0
+    fetch_pages: int = 0
+    lower_bound: bool = False
+    estimated_seconds: float = 0.0
+
+    def report(self):
+        print(f"Crawl plan ({self.backend} backend):")
+        for product_type in self.product_types:
+            if not product_type.series_known:
+                print(f"  {product_type.name:<32} series unknown until the listing is loaded")
+                continue
+            edps = sum(s.edps for s in product_type.series)
+            to_fetch = sum(s.to_fetch for s in product_type.series)
+            exact = all(s.exact for s in product_type.series)
+            edp_count = f"edps{'=' if exact else '>='}{edps}"
+            print(
+                f"  {product_type.name:<32} series={len(product_type.series):<4} "
+                f"{edp_count:<12} to_fetch={to_fetch}"
+            )
+        bound = ">=" if self.lower_bound else ""
+        print(
+            f"Pages: {self.listing_pages} listings, {bound}{self.detail_pages} product details "
+            f"({bound}{self.fetch_pages} to fetch)"
+        )
+        minutes, seconds = divmod(int(self.estimated_seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        print(f"Estimated wall time: {bound}{hours}h{minutes:02d}m{seconds:02d}s")
+
+
+def count_to_fetch(previous_tools, max_age=None, cache=None, incremental=False):
+    """How many of a series' known EDPs would be fetched over the network"""
+    to_fetch = 0
+    for edp, tool in previous_tools.items():
+        if incremental and not is_stale(tool, max_age, cache):
+            continue
+        if cache is not None and cache.get_fresh(product_details_url(edp)) is not None:
+            continue
+        to_fetch += 1
+    return to_fetch
+
+
+def estimate_seconds(plan, options, page_seconds=None, listing_seconds=LISTING_SECONDS):
+    """Wall time for the plan's listings and fetches under the given options"""
+    backend = options.get("backend", "selenium")
+    per_page = page_seconds or PAGE_SECONDS[backend]
+    processes = max(1, options.get("processes") or 1)
+    browsers = max(1, options.get("browsers") or 1)
+    workers = max(1, options.get("workers") or 8)
+
+    listing_parallel = min(max(browsers, processes), max(1, len(plan.product_types)))
+    listings = plan.listing_pages * listing_seconds / listing_parallel
+    if backend == "selenium":
+        details = plan.fetch_pages * per_page / max(browsers, processes)
+    else:
+        details = plan.fetch_pages * per_page / (workers * processes)
+        rate = options.get("requests_per_second")
+        if backend == "http" and rate:
+            # The per-host rate cap is shared by every worker and process
+            details = max(details, plan.fetch_pages / rate)
+    return listings + details
+
+
+def plan_crawl(
+    site_map,
+    product_types,
+    options,
+    previous_index=None,
+    cache=None,
+    page_seconds=None,
+):
+    """Build a CrawlPlan for main()-style options without fetching anything
+
+    previous_index is {product type: {series: {edp: Tool}}} from the
+    previous output, if there is one.
+    """
+    previous_index = previous_index or {}
+    max_series = options.get("max_series")
+    max_edps = options.get("max_edps")
+    incremental = options.get("incremental", False)
+    max_age = max_age_from_days(options.get("max_age_days"))
+    plan = CrawlPlan(backend=options.get("backend", "selenium"))
+
+    for name in product_types:
+        plan.listing_pages += 1
+        previous_series = previous_index.get(name, {})
+        known = site_map.series_for(name) if site_map is not None else []
+        names = [entry["name"] for entry in known] or list(previous_series)
+        product_type = ProductTypePlan(name, series_known=bool(names))
+        plan.product_types.append(product_type)
+        if not names:
+            plan.lower_bound = True
+            continue
+        rows = {entry["name"]: entry.get("rows") or 0 for entry in known}
+        for series_name in names[:max_series]:
+            previous_tools = previous_series.get(series_name)
+            if previous_tools:
+                edps = len(previous_tools)
+                # Series with a previous crawl: only stale/uncached EDPs are fetched
+                to_fetch = count_to_fetch(previous_tools, max_age, cache, incremental)
+                exact = True
+            else:
+                edps = rows.get(series_name, 0)
+                to_fetch = edps
+                exact = False
+            if max_edps is not None:
+                edps = min(edps, max_edps)
+                to_fetch = min(to_fetch, edps)
+                exact = exact or edps == max_edps
+            product_type.series.append(SeriesPlan(series_name, edps, exact, to_fetch))
+            plan.detail_pages += edps
+            plan.fetch_pages += to_fetch
+            plan.lower_bound = plan.lower_bound or not exact
+
+    plan.estimated_seconds = estimate_seconds(plan, options, page_seconds)
+    return plan
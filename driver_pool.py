@@ -0,0 +1,152 @@
+"""
+Pool of reusable headless Chrome sessions
+Starting Chrome costs about a second and a few hundred MB, so workers check
+a session out per product type and hand it back instead of starting a
+browser per page. Unhealthy or over-used sessions are recycled on checkin.
+"""
+
+import queue
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+
+# Resources the scraper never looks at; blocking them speeds up page loads
+BLOCKED_URL_PATTERNS = [
+    "*.css", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.ttf",
+]
+
+
+def setup_headless_driver(block_resources=True):
+    """Start a headless Chrome, by default with images and CSS disabled
+
+    Pass block_resources=False for sessions that print pages to PDF.
+    """
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if block_resources:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option(
+            "prefs",
+            {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.managed_default_content_settings.stylesheets": 2,
+            },
+        )
+
+    driver = webdriver.Chrome(options=chrome_options)
+    if block_resources:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    driver.implicitly_wait(1)
+    return driver
+
+
+def is_driver_healthy(driver):
+    """Return True if the session answers and has not leaked extra tabs"""
+    try:
+        return (
+            driver.execute_script("return 1") == 1
+            and len(driver.window_handles) == 1
+        )
+    except Exception:
+        return False
+
+
+class DriverPool:
+    """Fixed-size pool of WebDriver sessions, started lazily
+
+    Each slot in the idle queue holds either a live driver or None, which
+    means "start a new session here". Warm sessions are handed out first.
+    """
+
+    def __init__(self, size=2, factory=setup_headless_driver, max_uses=100):
+        self.size = size
+        self.factory = factory
+        self.max_uses = max_uses
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put(None)
+        self.uses = {}
+        self.closed = False
+
+    def _start(self):
+        try:
+            driver = self.factory()
+        except Exception:
+            self.idle.put(None)  # Give the slot back
+            raise
+        self.uses[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        self.uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def checkout(self, timeout=None):
+        """Take a healthy session from the pool, starting one if needed"""
+        if self.closed:
+            raise RuntimeError("DriverPool is closed")
+        driver = self.idle.get(timeout=timeout)
+        if driver is None:
+            return self._start()
+        if not is_driver_healthy(driver):
+            print("  ✗ Recycling unhealthy browser session")
+            self._discard(driver)
+            return self._start()
+        return driver
+
+    def checkin(self, driver, healthy=True):
+        """Return a session; crashed, leaked or worn-out sessions are replaced"""
+        self.uses[id(driver)] = self.uses.get(id(driver), 0) + 1
+        if self.closed:
+            self._discard(driver)
+            return
+        if healthy and self.uses[id(driver)] < self.max_uses:
+            # Drop cookies left over from the previous checkout
+            try:
+                driver.delete_all_cookies()
+                self.idle.put(driver)
+                return
+            except Exception:
+                pass
+        self._discard(driver)
+        self.idle.put(None)
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Check a session out for the duration of a with-block"""
+        driver = self.checkout(timeout)
+        healthy = True
+        try:
+            yield driver
+        except Exception:
+            healthy = is_driver_healthy(driver)
+            raise
+        finally:
+            self.checkin(driver, healthy=healthy)
+
+    def close(self):
+        """Quit every idle session; sessions still checked out quit on checkin"""
+        self.closed = True
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
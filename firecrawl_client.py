@@ -0,0 +1,315 @@
+"""
+Firecrawl extraction backend
+One shared Firecrawl client extracts Tool JSON from product-details pages,
+either concurrently under a limit or as a single batch job. Transient
+failures are retried with backoff, and results are memoized on disk by
+URL + extraction schema hash so unchanged pages aren't paid for twice.
+
+The extraction schema is Tool's without the traceability fields: the
+scrape timestamp and the HTML hash are set here from the fetch itself
+(the raw HTML comes back alongside the JSON), never by the model.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+
+from concurrency import map_ordered
+from http_fetcher import BASE_URL, product_details_url
+from page_cache import html_hash
+from throttle import PRODUCT_DETAILS, call_throttled, classify
+from tool_schemas import Tool
+
+
+FIRECRAWL_API_URL = "https://api.firecrawl.dev"
+
+EXTRACTION_PROMPT = (
+    "Scrape all relevant fields for the tool on this page. "
+    "Return a JSON object matching the Tool schema."
+)
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Tool fields filled in locally rather than extracted from the page
+LOCAL_FIELDS = ("scrape_timestamp_utc", "source_html_hash", "raw_field_keys")
+
+
+def is_transient(error):
+    """True for network errors and Firecrawl errors worth retrying"""
+    import requests
+    from firecrawl import FirecrawlError
+
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, TimeoutError)):
+        return True
+    return (
+        isinstance(error, FirecrawlError)
+        and getattr(error, "status_code", None) in TRANSIENT_STATUS_CODES
+    )
+
+
+def extraction_schema(model=Tool, exclude=LOCAL_FIELDS):
+    """A model's JSON schema without the fields the model must not fill in"""
+    schema = model.model_json_schema()
+    for name in exclude:
+        schema["properties"].pop(name, None)
+    if "required" in schema:
+        schema["required"] = [name for name in schema["required"] if name not in exclude]
+    return schema
+
+
+def schema_hash(schema):
+    """Short hash of a JSON schema; changes whenever the schema does"""
+    text = json.dumps(schema, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class ExtractionCache:
+    """On-disk memo of extraction results keyed by URL + schema hash"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url, schema_key):
+        key = hashlib.sha256(f"{schema_key}:{url}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url, schema_key):
+        try:
+            with open(self._path(url, schema_key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, url, schema_key, data):
+        path = self._path(url, schema_key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+
+class FirecrawlExtractor:
+    """Shared Firecrawl client with concurrency limit, retries and memoization
+
+    With a Throttle, API calls also count against its adaptive
+    product-details limit and circuit breaker.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        api_url=FIRECRAWL_API_URL,
+        max_concurrency=5,
+        retries=3,
+        backoff=1.0,
+        timeout_ms=120000,
+        cache_dir=None,
+        client=None,
+        throttle=None,
+        batch=False,
+    ):
+        if client is None:
+            # The SDK is slow to import, so it is only loaded for a real client
+            from firecrawl import Firecrawl
+
+            # Retries are handled here, so the SDK's own retry loop is disabled
+            client = Firecrawl(
+                api_key=api_key or os.getenv("firecrawl_api"),
+                api_url=api_url,
+                max_retries=0,
+            )
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout_ms = timeout_ms
+        self.cache = ExtractionCache(cache_dir) if cache_dir else None
+        self.schema = extraction_schema(Tool)
+        self.schema_key = schema_hash(self.schema)
+        self.throttle = throttle
+        self.batch = batch  # extract_tools' default: one batch job per call
+
+    def _formats(self):
+        return [
+            {"type": "json", "schema": self.schema, "prompt": EXTRACTION_PROMPT},
+            "rawHtml",
+        ]
+
+    def _with_retries(self, func, *args, **kwargs):
+        """Call the API with backoff on transient errors; each attempt runs
+        under the throttle's product-details limit
+
+        The Throttle already retries throttled answers (429/503) and waits
+        out an open circuit, so with one those are not retried again here.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                return call_throttled(self.throttle, PRODUCT_DETAILS, func, *args, **kwargs)
+            except Exception as e:
+                retried_by_throttle = (
+                    self.throttle is not None and classify(e)[0] == "throttled"
+                )
+                if attempt == self.retries or retried_by_throttle or not is_transient(e):
+                    raise
+                delay = self.backoff * 2 ** attempt
+                print(f"  ✗ Firecrawl transient error ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def extraction(document):
+        """{"json": extracted fields, "source_html_hash": hash of the raw HTML}"""
+        raw_html = getattr(document, "raw_html", None)
+        return {
+            "json": document.json or {},
+            "source_html_hash": html_hash(raw_html) if raw_html else None,
+        }
+
+    def extract(self, url):
+        """Return the extraction for one URL, from the memo if possible"""
+        if self.cache is not None:
+            cached = self.cache.get(url, self.schema_key)
+            if cached is not None:
+                return cached
+        document = self._with_retries(
+            self.client.scrape,
+            url,
+            formats=self._formats(),
+            only_main_content=False,
+            timeout=self.timeout_ms,
+        )
+        data = self.extraction(document)
+        if self.cache is not None:
+            self.cache.put(url, self.schema_key, data)
+        return data
+
+    def extract_batch(self, urls):
+        """Extract many URLs as one Firecrawl batch job; return {url: extraction}"""
+        results = {}
+        pending = []
+        for url in urls:
+            cached = self.cache.get(url, self.schema_key) if self.cache else None
+            if cached is not None:
+                results[url] = cached
+            else:
+                pending.append(url)
+        if not pending:
+            return results
+
+        job = self._with_retries(
+            self.client.batch_scrape,
+            pending,
+            formats=self._formats(),
+            only_main_content=False,
+            timeout=self.timeout_ms,
+            max_concurrency=self.max_concurrency,
+        )
+        for document in job.data or []:
+            metadata = document.metadata
+            url = metadata and (metadata.source_url or metadata.url)
+            if url in pending and document.json is not None:
+                results[url] = self.extraction(document)
+                if self.cache is not None:
+                    self.cache.put(url, self.schema_key, results[url])
+        return results
+
+    def to_tool(self, data, edp_number, series_name):
+        """Validate an extraction as a Tool
+
+        Identity comes from our own inputs, and the timestamp and HTML
+        hash from the fetch; anything else in LOCAL_FIELDS is dropped.
+        """
+        fields = {k: v for k, v in data["json"].items() if k not in LOCAL_FIELDS}
+        return Tool.model_validate(
+            dict(
+                fields,
+                vendor_product_id=edp_number,
+                series_name=series_name,
+                scrape_timestamp_utc=datetime.now(timezone.utc),
+                source_html_hash=data.get("source_html_hash"),
+            )
+        )
+
+    def extract_tool(self, edp_number, series_name, product_url=None):
+        url = product_url or product_details_url(edp_number)
+        return self.to_tool(self.extract(url), edp_number, series_name)
+
+    def extract_tools(
+        self,
+        edp_numbers,
+        series_name,
+        base_url=BASE_URL,
+        batch=None,
+        errors=None,
+        on_tool=None,
+    ):
+        """Extract many EDPs and return their Tools in input order
+
+        With batch=True (by default, the extractor's own batch setting) a
+        single batch job is submitted; otherwise pages are scraped
+        concurrently, at most max_concurrency at a time. Failed EDPs
+        are reported, left out, and recorded in `errors` if given. on_tool
+        is called with each Tool as soon as it is validated.
+        """
+        if batch is None:
+            batch = self.batch
+        urls = {edp: product_details_url(edp, base_url) for edp in edp_numbers}
+        batch_results = self.extract_batch(list(urls.values())) if batch else None
+
+        def extract_one(edp_number):
+            try:
+                if batch_results is not None:
+                    data = batch_results.get(urls[edp_number])
+                    if data is None:
+                        raise RuntimeError("missing from batch results")
+                else:
+                    data = self.extract(urls[edp_number])
+                tool = self.to_tool(data, edp_number, series_name)
+                if on_tool is not None:
+                    on_tool(tool)
+                return tool
+            except ValidationError as ve:
+                print(f"  ✗ Validation error for EDP {edp_number}: {str(ve)}")
+                message = f"Validation error: {ve}"
+            except Exception as e:
+                print(f"  ✗ Firecrawl error for EDP {edp_number}: {str(e)}")
+                message = str(e)
+            if errors is not None:
+                errors[edp_number] = message
+            return None
+
+        results = map_ordered(extract_one, edp_numbers, workers=self.max_concurrency)
+        return [tool for tool in results if tool is not None]
+
+
+_shared_extractor = None
+_shared_lock = threading.Lock()
+
+
+def get_extractor(**kwargs):
+    """Return the process-wide FirecrawlExtractor, creating it on first use"""
+    global _shared_extractor
+    with _shared_lock:
+        if _shared_extractor is None:
+            _shared_extractor = FirecrawlExtractor(**kwargs)
+        return _shared_extractor
+
+
+def backend_options(workers, cache_dir=None, throttle=None, batch=False):
+    """Fetch options for the "firecrawl" backend (see backends.py)
+
+    With batch=True each series' EDPs are extracted as one batch job.
+    """
+    return {
+        "extractor": get_extractor(
+            max_concurrency=workers,
+            cache_dir=os.path.join(cache_dir, "firecrawl") if cache_dir else None,
+            throttle=throttle,
+            batch=batch,
+        )
+    }
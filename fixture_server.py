@@ -0,0 +1,244 @@
+"""
+Local HTTP stand-in for www.garrtool.com
+Serves saved HTML fixtures so the HTTP fetcher can run without the live site.
+It can also behave like a loaded site: every request can be delayed by a
+fixed latency, and requests beyond a concurrency `capacity` are answered
+with 429 and a Retry-After header.
+
+FakeFirecrawlServer answers the Firecrawl v2 scrape and batch-scrape
+endpoints from the same fixtures, so the Firecrawl extraction client can be
+exercised without the hosted service.
+
+Fixture layout:
+    <root>/index.html                      homepage
+    <root>/<path>/index.html               listing pages
+    <root>/product-details/<EDP>.html      product-details page for one EDP
+    <root>/product-details/default.html    fallback for any other EDP
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    """Map site URLs onto files in the server's fixture directory"""
+
+    def resolve_path(self, path=None):
+        url = urlsplit(path or self.path)
+        root = self.server.fixture_dir
+        parts = [p for p in url.path.split("/") if p and p not in (".", "..")]
+        if parts[:1] == ["product-details"]:
+            edp = parse_qs(url.query).get("EDP", [""])[0]
+            names = [f"{edp}.html"] if edp.isalnum() else []
+            for name in names + ["default.html"]:
+                candidate = os.path.join(root, "product-details", name)
+                if os.path.isfile(candidate):
+                    return candidate
+            return None
+        candidate = os.path.join(root, *parts)
+        if os.path.isdir(candidate):
+            candidate = os.path.join(candidate, "index.html")
+        return candidate if os.path.isfile(candidate) else None
+
+    def admit(self):
+        """Count this request in flight; False if it is over capacity"""
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.in_flight += 1
+            self.server.peak_in_flight = max(self.server.peak_in_flight, self.server.in_flight)
+            capacity = self.server.capacity
+            if capacity is not None and self.server.in_flight > capacity:
+                self.server.throttled += 1
+                return False
+        return True
+
+    def leave(self):
+        with self.server.lock:
+            self.server.in_flight -= 1
+
+    def do_GET(self):
+        admitted = self.admit()
+        try:
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            if not admitted:
+                self.send_response(429)
+                self.send_header("Retry-After", str(self.server.retry_after))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_fixture()
+        finally:
+            self.leave()
+
+    def send_fixture(self):
+        path = self.resolve_path()
+        if path is None:
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serve a fixture directory on localhost in a background thread
+
+    latency delays every GET by that many seconds; with a capacity, GETs
+    arriving while more than `capacity` are in flight get a 429 with
+    Retry-After: retry_after.
+    """
+
+    def __init__(
+        self,
+        fixture_dir,
+        port=0,
+        handler=FixtureRequestHandler,
+        latency=0.0,
+        capacity=None,
+        retry_after=1,
+    ):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixture_dir = os.path.abspath(fixture_dir)
+        self.httpd.lock = threading.Lock()
+        self.httpd.latency = latency
+        self.httpd.capacity = capacity
+        self.httpd.retry_after = retry_after
+        self.httpd.requests = 0
+        self.httpd.in_flight = 0
+        self.httpd.peak_in_flight = 0
+        self.httpd.throttled = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeFirecrawlHandler(FixtureRequestHandler):
+    """Answer Firecrawl v2 /scrape and /batch/scrape by parsing fixtures locally"""
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def document_for(self, url):
+        from firecrawl_client import LOCAL_FIELDS
+        from page_parser import parse_tool_details
+
+        edp = parse_qs(urlsplit(url).query).get("EDP", [""])[0]
+        path = self.resolve_path(url)
+        if path is None:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        tool = parse_tool_details(html, edp, None)
+        return {
+            "json": tool.model_dump(mode="json", exclude=set(LOCAL_FIELDS)),
+            "rawHtml": html,
+            "metadata": {"sourceURL": url, "url": url, "statusCode": 200},
+        }
+
+    def take_failure(self):
+        """Consume one injected failure, if any are left"""
+        with self.server.lock:
+            self.server.scrape_calls += 1
+            if self.server.failures_left > 0:
+                self.server.failures_left -= 1
+                return True
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.take_failure():
+            self.send_json(503, {"success": False, "error": "Injected failure"})
+            return
+        if self.path.startswith("/v2/scrape"):
+            document = self.document_for(request.get("url", ""))
+            if document is None:
+                self.send_json(404, {"success": False, "error": "Not found"})
+                return
+            self.send_json(200, {"success": True, "data": document})
+        elif self.path.startswith("/v2/batch/scrape"):
+            urls = request.get("urls", [])
+            documents = [d for d in map(self.document_for, urls) if d is not None]
+            with self.server.lock:
+                job_id = f"job-{next(self.server.job_ids)}"
+                self.server.jobs[job_id] = documents
+            self.send_json(
+                200,
+                {"success": True, "id": job_id, "url": f"/v2/batch/scrape/{job_id}"},
+            )
+        else:
+            self.send_json(404, {"success": False, "error": "Unknown endpoint"})
+
+    def do_GET(self):
+        if not self.path.startswith("/v2/batch/scrape/"):
+            super().do_GET()
+            return
+        job_id = self.path.rsplit("/", 1)[1]
+        with self.server.lock:
+            documents = self.server.jobs.get(job_id)
+        if documents is None:
+            self.send_json(404, {"success": False, "error": "Unknown job"})
+            return
+        self.send_json(
+            200,
+            {
+                "success": True,
+                "status": "completed",
+                "completed": len(documents),
+                "total": len(documents),
+                "creditsUsed": len(documents),
+                "data": documents,
+            },
+        )
+
+
+class FakeFirecrawlServer(FixtureServer):
+    """Local Firecrawl API stand-in; the first `failures` scrape calls return 503"""
+
+    def __init__(self, fixture_dir, port=0, failures=0):
+        super().__init__(fixture_dir, port, handler=FakeFirecrawlHandler)
+        self.httpd.failures_left = failures
+        self.httpd.scrape_calls = 0
+        self.httpd.jobs = {}
+        self.httpd.job_ids = itertools.count(1)
+
+    @property
+    def scrape_calls(self):
+        return self.httpd.scrape_calls
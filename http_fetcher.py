@@ -0,0 +1,165 @@
+"""
+HTTP-only product-details fetcher
+Pulls product-details pages with a pooled requests session and parses them
+without a browser. Chrome is only needed for the JS-driven listing pages.
+requests itself is imported by create_session, so modules that only need
+product_details_url stay cheap to import.
+"""
+
+from pydantic import ValidationError
+
+from concurrency import map_ordered
+from metrics import timed_stage
+from page_parser import parse_tool_details
+from throttle import PRODUCT_DETAILS, call_throttled
+
+
+BASE_URL = "https://www.garrtool.com/"
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def backend_options(workers, cache_dir=None, throttle=None):
+    """Fetch options for the "http" backend (see backends.py)"""
+    return {"session": create_session(pool_size=workers)}
+
+
+def product_details_url(edp_number, base_url=BASE_URL):
+    """Return the product-details URL for an EDP number"""
+    return f"{base_url}product-details/?EDP={edp_number}"
+
+
+def create_session(pool_size=10, retries=2):
+    """Create a requests session with a keep-alive connection pool
+
+    429 and 503 are left out of the transport-level retries, which
+    would otherwise sleep out Retry-After while holding a connection:
+    they are handled by the Throttle, which honors Retry-After for the
+    whole endpoint type and lowers its concurrency limit.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=False,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_product_details(
+    session, edp_number, base_url=BASE_URL, timeout=15, cache=None, throttle=None
+):
+    """Download the product-details HTML for an EDP number
+
+    With a PageCache, fresh pages come from disk and stale ones are
+    revalidated with a conditional GET. With a Throttle, requests that
+    go out over the network run under its product-details limit.
+    """
+    url = product_details_url(edp_number, base_url)
+    if cache is not None:
+        cached = cache.get_fresh(url)
+        if cached is not None:
+            return cached.html
+        return call_throttled(
+            throttle, PRODUCT_DETAILS, cache.fetch, session, url, timeout=timeout
+        ).html
+
+    def get():
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    return call_throttled(throttle, PRODUCT_DETAILS, get)
+
+
+@timed_stage("scrape_tool_details")
+def scrape_tool_details_http(
+    session,
+    edp_number,
+    series_name,
+    base_url=BASE_URL,
+    cache=None,
+    product_type=None,
+    throttle=None,
+):
+    """Fetch and parse a product-details page over HTTP and return Tool object"""
+    html = fetch_product_details(
+        session, edp_number, base_url, cache=cache, throttle=throttle
+    )
+    tool = parse_tool_details(html, edp_number, series_name, product_type=product_type)
+    print(f" Created Tool Object: {tool}")
+    return tool
+
+
+def scrape_tools_http(
+    session,
+    edp_numbers,
+    series_name,
+    workers=8,
+    rate_limiter=None,
+    engine="threads",
+    base_url=BASE_URL,
+    cache=None,
+    errors=None,
+    product_type=None,
+    throttle=None,
+    on_tool=None,
+):
+    """Fetch many EDPs concurrently and return their Tools in input order
+
+    Failed or invalid EDPs are reported and left out of the result; if an
+    `errors` dict is given, it receives {edp: message} for each of them.
+    With a Throttle, at most its adaptive limit of the `workers` are
+    fetching at any moment. on_tool is called with each Tool as soon as
+    it is validated.
+    """
+
+    def scrape_one(edp_number):
+        if rate_limiter is not None:
+            rate_limiter.acquire(product_details_url(edp_number, base_url))
+        try:
+            print(f"  Fetching tool EDP {edp_number} over HTTP...")
+            tool = scrape_tool_details_http(
+                session,
+                edp_number,
+                series_name,
+                base_url,
+                cache=cache,
+                product_type=product_type,
+                throttle=throttle,
+            )
+            if on_tool is not None:
+                on_tool(tool)
+            return tool
+        except ValidationError as ve:
+            print(f"  ✗ Validation error for EDP {edp_number}: {str(ve)}")
+            if errors is not None:
+                errors[edp_number] = f"Validation error: {ve}"
+        except Exception as e:
+            print(f"  ✗ Error fetching EDP {edp_number}: {str(e)}")
+            if errors is not None:
+                errors[edp_number] = str(e)
+        return None
+
+    results = map_ordered(scrape_one, edp_numbers, workers=workers, engine=engine)
+    return [tool for tool in results if tool is not None]
@@ -0,0 +1,155 @@
+"""
+Incremental re-crawl support
+Loads the previous Products output, diffs each series' current EDP list
+against it, and decides which EDPs need fetching: new ones, and ones that
+are stale by age or whose cached page hash no longer matches. Everything
+else is carried over unchanged and merged back into the tree.
+"""
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from http_fetcher import product_details_url
+from tool_schemas import Products, ProductType
+
+
+@dataclass
+class SeriesDiff:
+    new: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    stale: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+
+    @property
+    def to_fetch(self):
+        return self.new + self.stale
+
+    def summary(self):
+        return (
+            f"{len(self.new)} new, {len(self.removed)} removed, "
+            f"{len(self.stale)} stale, {len(self.unchanged)} unchanged"
+        )
+
+
+def load_products(path):
+    """Load a previous Products JSON output, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return Products.model_validate_json(f.read())
+
+
+def index_products(products):
+    """Return {product_type: {series_name: {edp: Tool}}}"""
+    index = {}
+    if products is None:
+        return index
+    for product_type in products.types:
+        series_index = index.setdefault(product_type.name, {})
+        for series in product_type.series:
+            series_index[series.name] = {
+                tool.vendor_product_id: tool for tool in series.tools
+            }
+    return index
+
+
+def is_stale(tool, max_age=None, cache=None, now=None):
+    """True if a previously scraped tool is too old or its page has changed"""
+    if max_age is not None:
+        scraped = tool.scrape_timestamp_utc
+        if scraped is None:
+            return True
+        if scraped.tzinfo is None:
+            scraped = scraped.replace(tzinfo=timezone.utc)
+        if (now or datetime.now(timezone.utc)) - scraped > max_age:
+            return True
+    if cache is not None and tool.source_html_hash:
+        cached = cache.get(product_details_url(tool.vendor_product_id), touch=False)
+        if cached is not None and cached.content_hash != tool.source_html_hash:
+            return True
+    return False
+
+
+def diff_series(previous_tools, current_edps, max_age=None, cache=None):
+    """Compare the EDPs listed now with the tools scraped last time"""
+    diff = SeriesDiff()
+    now = datetime.now(timezone.utc)
+    current = set(current_edps)
+    for edp in current_edps:
+        tool = previous_tools.get(edp)
+        if tool is None:
+            diff.new.append(edp)
+        elif is_stale(tool, max_age, cache, now):
+            diff.stale.append(edp)
+        else:
+            diff.unchanged.append(edp)
+    diff.removed = [edp for edp in previous_tools if edp not in current]
+    return diff
+
+
+def merge_tools(current_edps, previous_tools, fetched_tools):
+    """Return tools in current listing order, preferring freshly fetched ones
+
+    EDPs that failed to fetch keep their previous tool if there was one;
+    removed EDPs are dropped.
+    """
+    fetched = {tool.vendor_product_id: tool for tool in fetched_tools}
+    merged = []
+    for edp in current_edps:
+        tool = fetched.get(edp) or previous_tools.get(edp)
+        if tool is not None:
+            merged.append(tool)
+    return merged
+
+
+def carry_over_sections(series, previous):
+    """Keep a series' previous details and tolerances when none were fetched
+
+    Outputs written before the sections were extracted hold "..." instead.
+    """
+    if previous is None or series.details is not None or series.tolerances is not None:
+        return series
+    kept = {
+        name: value
+        for name, value in (("details", previous.details), ("tolerances", previous.tolerances))
+        if value != "..."
+    }
+    return series.model_copy(update=kept) if kept else series
+
+
+def merge_products(previous, crawled, catalog_order):
+    """Merge freshly crawled product types into the previous tree
+
+    Product types and series not visited in this run are kept as they were.
+    """
+    if previous is None:
+        return crawled
+    crawled_types = {product_type.name: product_type for product_type in crawled.types}
+    previous_types = {product_type.name: product_type for product_type in previous.types}
+    merged = []
+    for name in catalog_order + [n for n in previous_types if n not in catalog_order]:
+        new_type = crawled_types.get(name)
+        old_type = previous_types.get(name)
+        if new_type is None:
+            if old_type is not None:
+                merged.append(old_type)
+            continue
+        if old_type is None:
+            merged.append(new_type)
+            continue
+        old_series = {series.name: series for series in old_type.series}
+        crawled_series = [
+            carry_over_sections(series, old_series.get(series.name))
+            for series in new_type.series
+        ]
+        crawled_names = {series.name for series in new_type.series}
+        kept = [s for s in old_type.series if s.name not in crawled_names]
+        merged.append(
+            ProductType(name=name, series=crawled_series + kept)
+        )
+    return Products(types=merged)
+
+
+def max_age_from_days(days):
+    return timedelta(days=days) if days is not None else None
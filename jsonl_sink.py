@@ -0,0 +1,170 @@
+"""
+Streaming JSONL output
+Each validated Tool is written as one JSON line (tagged with its product
+type and series) as soon as it is scraped, and each finished series is
+closed by a series record listing its EDPs, so memory stays flat and the
+file can be tailed while the crawl runs. iter_series reads a stream back
+one series at a time, and rebuild_products turns it back into the nested
+Products document offline.
+
+Line formats:
+    {"kind": "tool", "product_type": ..., "series": ..., "tool": {...}}
+    {"kind": "series", "product_type": ..., "name": ..., "details": ..., "tolerances": ...,
+     "edps": [...]}
+"""
+
+import json
+import threading
+
+from tool_records import validate_tools
+from tool_schemas import Products, ProductType, Series
+
+
+class JsonlToolSink:
+    """Append-only, thread-safe JSONL writer for scraped tools"""
+
+    def __init__(self, path, mode="a", flush_every=1):
+        self.path = path
+        self.file = open(path, mode, encoding="utf-8")
+        self.flush_every = flush_every
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def _write_line(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def _write_tool(self, product_type, series_name, tool):
+        # Splice the tool's own JSON in rather than dumping it to a dict first
+        self.file.write(
+            f'{{"kind": "tool", "product_type": {json.dumps(product_type, ensure_ascii=False)}, '
+            f'"series": {json.dumps(series_name, ensure_ascii=False)}, '
+            f'"tool": {tool.model_dump_json()}}}\n'
+        )
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def write_tool(self, product_type, series_name, tool):
+        with self.lock:
+            self._write_tool(product_type, series_name, tool)
+
+    def write_series(self, product_type, series, streamed=()):
+        """Close a finished series: write its tools not yet streamed, then its record
+
+        streamed holds the EDPs already written with write_tool.
+        """
+        with self.lock:
+            for tool in series.tools:
+                if tool.vendor_product_id not in streamed:
+                    self._write_tool(product_type, series.name, tool)
+            self._write_line(
+                {
+                    "kind": "series",
+                    "product_type": product_type,
+                    "name": series.name,
+                    "details": series.details,
+                    "tolerances": series.tolerances,
+                    "edps": [tool.vendor_product_id for tool in series.tools],
+                }
+            )
+
+    def flush(self):
+        self.file.flush()
+        self.pending = 0
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path):
+    """Yield decoded records from a JSONL stream, skipping a torn last line"""
+    for _, record in iter_offsets(path):
+        yield record
+
+
+def iter_offsets(path):
+    """Yield (byte offset, decoded record) for each line of a JSONL stream"""
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            start, offset = offset, offset + len(line)
+            if not line.strip():
+                continue
+            try:
+                yield start, json.loads(line)
+            except json.JSONDecodeError:
+                print(f"  ✗ Skipping malformed line in {path}")
+
+
+def index_stream(path, catalog_order=None):
+    """Map a stream to {product type: {series: {"meta": ..., "tools": {edp: offset}}}}
+
+    Product types follow catalog_order (then first appearance); series
+    follow first appearance. A series record closes the tools written
+    before it, in the order of its "edps", so a series written again
+    (e.g. by a resumed or incremental crawl) replaces its earlier
+    version. Tools with no closing series record yet are included as
+    well. Only byte offsets are kept, not the tools themselves.
+    """
+    types = {}
+    for offset, record in iter_offsets(path):
+        product_type = types.setdefault(record["product_type"], {})
+        name = record["series"] if record["kind"] == "tool" else record["name"]
+        series = product_type.setdefault(name, {"meta": {}, "tools": {}, "open": {}})
+        if record["kind"] == "tool":
+            series["open"][record["tool"]["vendor_product_id"]] = offset
+        elif record["kind"] == "series":
+            edps = record.get("edps")
+            if edps is None:
+                series["tools"] = series["open"]
+            else:
+                opened = series["open"]
+                series["tools"] = {edp: opened[edp] for edp in edps if edp in opened}
+            series["open"] = {}
+            series["meta"] = {
+                "details": record.get("details"),
+                "tolerances": record.get("tolerances"),
+            }
+    for product_type in types.values():
+        for series in product_type.values():
+            series["tools"].update(series.pop("open"))
+
+    order = list(catalog_order or [])
+    order += [name for name in types if name not in order]
+    return {name: types[name] for name in order if name in types}
+
+
+def iter_series(path, catalog_order=None):
+    """Yield (product type name, Series) from a stream, one series in memory at a time"""
+    index = index_stream(path, catalog_order)
+    with open(path, "rb") as f:
+        for product_type, series_index in index.items():
+            for series_name, series in series_index.items():
+                records = []
+                for offset in series["tools"].values():
+                    f.seek(offset)
+                    records.append(json.loads(f.readline())["tool"])
+                yield product_type, Series(
+                    name=series_name, tools=validate_tools(records), **series["meta"]
+                )
+
+
+def rebuild_products(path, catalog_order=None):
+    """Rebuild the nested Products document from a JSONL stream"""
+    types = {}
+    for product_type, series in iter_series(path, catalog_order):
+        types.setdefault(product_type, []).append(series)
+    return Products(
+        types=[ProductType(name=name, series=series) for name, series in types.items()]
+    )
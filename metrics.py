@@ -0,0 +1,237 @@
+"""
+Crawl metrics
+Per-stage call counters, latency histograms and in-flight gauges, plus
+free-form counters (tools scraped, EDPs failed, ...). Each finished stage
+call can also be written as a structured JSON log line, and the live
+numbers can be served in Prometheus text format from a local endpoint
+while a crawl runs.
+
+Usage:
+    @timed_stage("scrape_tool_details")
+    def scrape_tool_details(...): ...
+
+    METRICS.inc("tools_scraped_total", product_type=name)
+
+    from metrics_server import MetricsServer
+    server = MetricsServer(METRICS, port=9108).start()   # GET /metrics
+"""
+
+import bisect
+import functools
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PREFIX = "garr_"
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms, keyed by name and labels"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.log_file = None
+
+    def inc(self, name, value=1, **labels):
+        key = (name, label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_gauge(self, name, value, **labels):
+        key = (name, label_key(labels))
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, label_key(labels))
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    # ===== Structured logs =====
+
+    def enable_json_log(self, path=None):
+        """Write one JSON object per event to path (or stderr)"""
+        self.log_file = open(path, "a", encoding="utf-8") if path else sys.stderr
+
+    def log(self, event, **fields):
+        if self.log_file is None:
+            return
+        record = {"ts": datetime.now(timezone.utc).isoformat(), "event": event, **fields}
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self.lock:
+            self.log_file.write(line + "\n")
+            self.log_file.flush()
+
+    # ===== Stages =====
+
+    def stage(self, stage, **labels):
+        """Context manager timing one call of a pipeline stage"""
+        return StageTimer(self, stage, labels)
+
+    # ===== Export =====
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted(
+                (key, list(h.cumulative()), h.sum, h.count)
+                for key, h in self.histograms.items()
+            )
+
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, "counter")
+            lines.append(f"{PREFIX}{name}{format_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            declare(name, "gauge")
+            lines.append(f"{PREFIX}{name}{format_labels(labels)} {value}")
+        for (name, labels), buckets, total, count in histograms:
+            declare(name, "histogram")
+            for bound, cumulative in buckets:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{PREFIX}{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}"
+                )
+            lines.append(f"{PREFIX}{name}_sum{format_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}{name}_count{format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Return {stage: {calls, errors, in_flight, mean_s, p95_le_s}} from the stage metrics"""
+        with self.lock:
+            histograms = {
+                dict(labels)["stage"]: h
+                for (name, labels), h in self.histograms.items()
+                if name == "stage_seconds"
+            }
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        summary = {}
+        for stage, h in sorted(histograms.items()):
+            errors = counters.get(
+                ("stage_calls_total", label_key({"stage": stage, "status": "error"})), 0
+            )
+            # p95 as the upper bound of the bucket holding the 95th percentile
+            target = 0.95 * h.count
+            p95 = next((bound for bound, total in h.cumulative() if total >= target), None)
+            summary[stage] = {
+                "calls": h.count,
+                "errors": errors,
+                "in_flight": gauges.get(("stage_in_flight", label_key({"stage": stage})), 0),
+                "mean_s": round(h.sum / h.count, 3) if h.count else 0.0,
+                "p95_le_s": p95,
+            }
+        return summary
+
+    def report(self):
+        """Print a table of stage metrics"""
+        print("\nStage metrics:")
+        for stage, s in self.summary().items():
+            print(
+                f"  {stage:<26} calls={s['calls']:<6} errors={s['errors']:<4} "
+                f"mean={s['mean_s']:.3f}s p95<={s['p95_le_s']}s"
+            )
+
+
+class StageTimer:
+    """Tracks one stage call: in-flight gauge, latency, outcome, JSON log line"""
+
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.metrics.add_gauge("stage_in_flight", 1, stage=self.stage)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        status = "ok" if exc_type is None else "error"
+        self.metrics.add_gauge("stage_in_flight", -1, stage=self.stage)
+        self.metrics.observe("stage_seconds", seconds, stage=self.stage)
+        self.metrics.inc("stage_calls_total", stage=self.stage, status=status)
+        fields = dict(self.labels, stage=self.stage, status=status, seconds=round(seconds, 4))
+        if exc is not None:
+            fields["error"] = f"{exc_type.__name__}: {exc}"
+        self.metrics.log("stage", **fields)
+        return False
+
+
+METRICS = Metrics()
+
+
+def timed_stage(stage, metrics=None):
+    """Decorator recording every call of a function as one stage call"""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with (metrics or METRICS).stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
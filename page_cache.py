@@ -0,0 +1,289 @@
+"""
+Persistent on-disk HTML page cache
+Pages are stored gzip-compressed and content-addressed by the SHA256 of their
+HTML, so identical pages are stored once and the hash doubles as
+Tool.source_html_hash. A small SQLite index maps URLs to content hashes,
+keeps ETag/Last-Modified validators for conditional revalidation, and
+tracks access times for size-bounded LRU eviction. The stored size is kept
+as a running total, and access times are written in batches, so reads and
+writes do not scan or commit the index each time.
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Puts between re-reading the stored size, which other processes also grow
+SYNC_EVERY = 256
+
+
+def html_hash(html):
+    """SHA256 hex digest of an HTML string"""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedPage:
+    url: str
+    html: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class PageCache:
+    """Content-addressed, LRU-bounded HTML cache rooted at `directory`"""
+
+    def __init__(
+        self, directory, max_bytes=512 * 1024 * 1024, max_age=24 * 3600, touch_batch=256
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.touch_batch = touch_batch
+        self.touches = {}  # url -> accessed_at not yet written to the index
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"), check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS objects (
+                content_hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)"
+        )
+        self.db.commit()
+        self.total = self._stored_bytes()
+        self.unsynced = 0  # puts since self.total was last read from the index
+
+    def _stored_bytes(self):
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def _flush_touches(self):
+        # Caller holds the lock
+        if self.touches:
+            self.db.executemany(
+                "UPDATE pages SET accessed_at = ? WHERE url = ?",
+                [(accessed_at, url) for url, accessed_at in self.touches.items()],
+            )
+            self.touches.clear()
+            self.db.commit()
+
+    def _object_path(self, content_hash):
+        return os.path.join(
+            self.directory, "objects", content_hash[:2], f"{content_hash}.html.gz"
+        )
+
+    def _read_object(self, content_hash):
+        with gzip.open(self._object_path(content_hash), "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def _write_object(self, content_hash, html):
+        path = self._object_path(content_hash)
+        if os.path.exists(path):
+            return os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    def get(self, url, touch=True):
+        """Return the CachedPage for a URL, or None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT content_hash, etag, last_modified, fetched_at "
+                "FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            if touch:
+                self.touches[url] = time.time()
+                if len(self.touches) >= self.touch_batch:
+                    self._flush_touches()
+        try:
+            html = self._read_object(row[0])
+        except FileNotFoundError:
+            self.delete(url)
+            return None
+        return CachedPage(url, html, row[0], row[1], row[2], row[3])
+
+    def content_hash(self, url):
+        """Return the content hash cached for a URL, or None, without reading the page"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT content_hash FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, page):
+        return page is not None and (self.max_age is None or page.age() <= self.max_age)
+
+    def get_fresh(self, url):
+        """Return the cached page if it is younger than max_age"""
+        page = self.get(url)
+        return page if self.is_fresh(page) else None
+
+    def put(self, url, html, etag=None, last_modified=None):
+        """Store a page and return its content hash"""
+        content_hash = html_hash(html)
+        size = self._write_object(content_hash, html)
+        now = time.time()
+        with self.lock:
+            stored = self.db.execute(
+                "SELECT size FROM objects WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO objects (content_hash, size) VALUES (?, ?)",
+                (content_hash, size),
+            )
+            self.total += size - (stored[0] if stored else 0)
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, content_hash, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content_hash, etag, last_modified, now, now),
+            )
+            self.touches.pop(url, None)
+            self.db.commit()
+            self.unsynced += 1
+            over = self.max_bytes is not None and self.total > self.max_bytes
+        if over or self.unsynced >= SYNC_EVERY:
+            self.evict()
+        return content_hash
+
+    def touch_validated(self, url):
+        """Mark a cached page as revalidated (HTTP 304) just now"""
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            self.touches.pop(url, None)
+            self.db.commit()
+
+    def delete(self, url):
+        with self.lock:
+            self.db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self.touches.pop(url, None)
+            self.db.commit()
+
+    def total_bytes(self):
+        """Stored object bytes, as counted by this process"""
+        with self.lock:
+            return self.total
+
+    def evict(self, batch=64):
+        """Drop least recently used pages until the cache fits in max_bytes
+
+        Pages are taken oldest first, `batch` at a time, through the
+        accessed_at index rather than sorting the whole table.
+        """
+        if self.max_bytes is None:
+            return
+        with self.lock:
+            # Other processes sharing the directory add objects too
+            self.total = total = self._stored_bytes()
+            self.unsynced = 0
+            if total <= self.max_bytes:
+                return
+            # Pending access times decide which pages are least recent
+            self._flush_touches()
+            lru = []
+            while total > self.max_bytes:
+                if not lru:
+                    lru = self.db.execute(
+                        "SELECT url, content_hash FROM pages ORDER BY accessed_at LIMIT ?",
+                        (batch,),
+                    ).fetchall()
+                    if not lru:
+                        break
+                url, content_hash = lru.pop(0)
+                self.db.execute("DELETE FROM pages WHERE url = ?", (url,))
+                still_used = self.db.execute(
+                    "SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)
+                ).fetchone()
+                if still_used:
+                    continue
+                size = self.db.execute(
+                    "SELECT size FROM objects WHERE content_hash = ?", (content_hash,)
+                ).fetchone()
+                self.db.execute(
+                    "DELETE FROM objects WHERE content_hash = ?", (content_hash,)
+                )
+                try:
+                    os.remove(self._object_path(content_hash))
+                except FileNotFoundError:
+                    pass
+                total -= size[0] if size else 0
+            self.total = total
+            self.db.commit()
+
+    def fetch(self, session, url, timeout=15):
+        """Return a CachedPage for url, revalidating stale entries over HTTP
+
+        Fresh entries are served from disk. Stale ones are revalidated with
+        If-None-Match / If-Modified-Since; a 304 keeps the cached body.
+        """
+        cached = self.get(url)
+        if self.is_fresh(cached):
+            return cached
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            self.touch_validated(url)
+            return cached
+        response.raise_for_status()
+        html = response.text
+        content_hash = self.put(
+            url,
+            html,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return CachedPage(
+            url,
+            html,
+            content_hash,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            time.time(),
+        )
+
+    def close(self):
+        with self.lock:
+            self._flush_touches()
+            self.db.close()
@@ -0,0 +1,225 @@
+"""
+Product-details page parsing without a browser
+Builds a lightweight element tree from raw HTML so the same XPaths the
+Selenium scraper uses can be evaluated on saved or HTTP-fetched pages.
+Extracting text needs nothing beyond the standard library; the Tool
+models are imported when the first Tool is built.
+"""
+
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+
+from page_cache import html_hash
+from page_sections import SECTIONS, PageSections
+
+
+# XPaths shared with the Selenium scraper (scrape_data.scrape_tool_details)
+LIST_INFO_XPATH = '//*[@id="post-397"]/div/div[2]/div[2]/div[1]/div[1]/ul[1]'
+SERIES_NAME_XPATH = "/html/body/div[1]/main/form/div/div/div[1]/div[1]/strong"
+
+# The series description and tolerances are found by their section heading
+# (matched case-insensitively, without a trailing colon) rather than by
+# position, so they do not depend on the page's wrapper divs. Check them
+# against recorded pages with `python bench.py --from-cache <cache dir>
+# --paths parser`, whose section_coverage fails when one matches no page.
+SECTION_HEADINGS = {
+    "description": {"description", "product description", "overview"},
+    "tolerances": {"tolerance", "tolerances"},
+}
+HEADING_ELEMENTS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+# Elements that never have children or a closing tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+# Elements that start a new line in rendered text, like Selenium's .text
+BLOCK_ELEMENTS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl",
+    "dt", "fieldset", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+    "section", "table", "tr", "ul",
+}
+
+# Content of these elements is never rendered
+SKIP_ELEMENTS = {"script", "style", "noscript", "template", "head"}
+
+
+class _TreeBuilder(HTMLParser):
+    """Feed HTML and collect an ElementTree rooted at a #document element"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = ET.Element("#document")
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        # An unclosed <li> or <p> is implicitly closed by its next sibling
+        if tag in ("li", "p") and self.stack[-1].tag == tag:
+            self.stack.pop()
+        element = ET.SubElement(
+            self.stack[-1], tag, {k: v if v is not None else "" for k, v in attrs}
+        )
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        ET.SubElement(
+            self.stack[-1], tag, {k: v if v is not None else "" for k, v in attrs}
+        )
+
+    def handle_endtag(self, tag):
+        # Pop back to the matching open element; ignore stray end tags
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        parent = self.stack[-1]
+        if len(parent):
+            last = parent[-1]
+            last.tail = (last.tail or "") + data
+        else:
+            parent.text = (parent.text or "") + data
+
+
+def parse_html(html):
+    """Parse an HTML string and return the #document root element"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _to_etree_path(xpath):
+    """Translate a simple absolute XPath into ElementTree path syntax"""
+    # "/html/..." and "//..." both become relative to the #document root
+    return "." + xpath.replace('"', "'")
+
+
+def find_elements(root, xpath):
+    """Return all elements matching a simple XPath (tags, [n], [@attr='v'])"""
+    return root.findall(_to_etree_path(xpath))
+
+
+def element_text(element):
+    """Return the visible text of an element, one line per block element"""
+    parts = []
+
+    def walk(node):
+        if node.tag in SKIP_ELEMENTS:
+            return
+        block = node.tag in BLOCK_ELEMENTS
+        if block:
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append("\n")
+
+    walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _is_heading(element):
+    return element.tag in HEADING_ELEMENTS
+
+
+def _following_siblings(parents, element):
+    children = list(parents[element])
+    return children[children.index(element) + 1:]
+
+
+def section_text(root, names, parents=None):
+    """Text following the first heading named in `names`, up to the next heading
+
+    A heading wrapped in an element of its own (<div><h3>Tolerances</h3></div>)
+    is followed from its wrapper. None when the page has no such heading.
+    """
+    for heading in root.iter():
+        if not _is_heading(heading) or element_text(heading).lower().rstrip(": ") not in names:
+            continue
+        if parents is None:
+            parents = {child: parent for parent in root.iter() for child in parent}
+        node = heading
+        while parents.get(parents.get(node)) is not None and not _following_siblings(parents, node):
+            node = parents[node]
+        texts = []
+        for sibling in _following_siblings(parents, node) if node in parents else ():
+            if any(_is_heading(element) for element in sibling.iter()):
+                break
+            text = element_text(sibling)
+            if text:
+                texts.append(text)
+        return "\n".join(texts) or None
+    return None
+
+
+def build_tool(
+    edp_number, series_name, list_info_text, source_html_hash=None, product_type=None
+):
+    """Create a Tool from the scraped list-info text
+
+    The text is parsed by the product type's attribute rule table, which
+    fills xD, the family's *_attributes and raw_field_keys; identical
+    list-info sections are parsed once, and each Tool gets its own copy
+    of the result.
+    """
+    # The pydantic models are only loaded once a Tool is built
+    from tool_schemas import Tool
+
+    return Tool(
+        vendor_product_id=edp_number,
+        series_name=series_name,
+        source_html_hash=source_html_hash,
+        **SECTIONS.attributes(list_info_text, product_type),
+    )
+
+
+def parse_page_sections(html):
+    """Return the PageSections of a product-details page"""
+    root = parse_html(html)
+
+    def text(xpath):
+        elements = find_elements(root, xpath)
+        return element_text(elements[0]) if elements else None
+
+    parents = {child: parent for parent in root.iter() for child in parent}
+    return PageSections(
+        list_info=text(LIST_INFO_XPATH),
+        series_name=text(SERIES_NAME_XPATH),
+        description=section_text(root, SECTION_HEADINGS["description"], parents),
+        tolerances=section_text(root, SECTION_HEADINGS["tolerances"], parents),
+    )
+
+
+def parse_product_details(html):
+    """Return (list_info_text, series_text) from a product-details page"""
+    sections = parse_page_sections(html)
+    return sections.list_info, sections.series_name
+
+
+def parse_tool_details(
+    html, edp_number, series_name, content_hash=None, product_type=None
+):
+    """Parse a product-details page and return Tool object
+
+    The page's description and tolerances are counted towards the
+    series' details in SECTIONS.
+    """
+    sections = parse_page_sections(html)
+    SECTIONS.observe(product_type, series_name, sections)
+    return build_tool(
+        edp_number,
+        series_name,
+        sections.list_info,
+        content_hash or html_hash(html),
+        product_type,
+    )
@@ -0,0 +1,155 @@
+"""
+Deduplication of repeated product-page sections
+EDPs of one series share the same description block and tolerances,
+and often the same list-info text; only their dimension rows differ.
+Each section is normalized (whitespace collapsed, blank lines dropped)
+and hashed, list-info text is parsed into Tool attributes once per
+unique hash and product type, and every EDP with the same hash gets its
+own copy of the parsed result. The description and tolerances seen across a
+series' pages are counted, and the most common ones become
+Series.details and Series.tolerances.
+
+A process-wide SECTIONS index is shared by every fetch path, the way
+METRICS is; entries for a series are dropped once the series is built.
+"""
+
+import hashlib
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+from metrics import METRICS
+
+
+@dataclass
+class PageSections:
+    """The text sections of one product-details page"""
+
+    list_info: Optional[str] = None
+    series_name: Optional[str] = None
+    description: Optional[str] = None
+    tolerances: Optional[str] = None
+
+
+def normalize_section(text):
+    """Collapse whitespace and drop blank lines; None for an empty section"""
+    if not text:
+        return None
+    lines = (" ".join(line.split()) for line in text.split("\n"))
+    return "\n".join(line for line in lines if line) or None
+
+
+def section_hash(text):
+    """SHA256 hex digest of a normalized section"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def copy_attributes(parsed):
+    """A parse_attributes result with its attribute models copied"""
+    return {
+        name: value.model_copy() if hasattr(value, "model_copy") else value
+        for name, value in parsed.items()
+    }
+
+
+class SectionIndex:
+    """Parsed list-info attributes by section hash, and per-series sections"""
+
+    def __init__(self, max_entries=65536, metrics=METRICS):
+        self.max_entries = max_entries
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.parsed = {}  # (product type, hash) -> parse_attributes result
+        self.raw = {}  # (product type, raw text) -> the same result
+        self.texts = {}  # hash -> normalized text, for series sections
+        self.series = {}  # (product type, series) -> {"description"/"tolerances": Counter}
+        self.hits = 0
+        self.misses = 0
+
+    def attributes(self, list_info_text, product_type=None):
+        """parse_attributes(list_info_text, product_type), parsed once per unique section
+
+        Each call returns its own copy, attribute models included, so
+        Tools built from the same section share no state.
+        """
+        # Exact repeats are found by the raw text; only new texts are normalized and hashed
+        raw_key = (product_type, list_info_text)
+        with self.lock:
+            parsed = self.raw.get(raw_key)
+            if parsed is not None:
+                self.hits += 1
+                return copy_attributes(parsed)
+        text = normalize_section(list_info_text)
+        key = (product_type, section_hash(text) if text else None)
+        with self.lock:
+            parsed = self.parsed.get(key)
+            if parsed is not None:
+                self.hits += 1
+        if parsed is None:
+            from attribute_parser import parse_attributes
+
+            parsed = parse_attributes(text, product_type)
+            self.metrics.inc("page_sections_parsed_total")
+            with self.lock:
+                self.misses += 1
+        with self.lock:
+            if len(self.raw) >= self.max_entries:
+                self.raw.clear()
+                self.parsed.clear()
+            self.parsed[key] = parsed
+            self.raw[raw_key] = parsed
+        return copy_attributes(parsed)
+
+    def observe(self, product_type, series_name, sections):
+        """Count a page's description and tolerances towards its series"""
+        if series_name is None:
+            return
+        with self.lock:
+            counts = self.series.setdefault(
+                (product_type, series_name),
+                {"description": Counter(), "tolerances": Counter()},
+            )
+            for kind in ("description", "tolerances"):
+                text = normalize_section(getattr(sections, kind))
+                if text is None:
+                    continue
+                digest = section_hash(text)
+                self.texts.setdefault(digest, text)
+                counts[kind][digest] += 1
+
+    def series_sections(self, product_type, series_name):
+        """Return (details, tolerances) for a series and forget its counts
+
+        Either is None when no page of the series had that section.
+        """
+        with self.lock:
+            counts = self.series.pop((product_type, series_name), None)
+            if counts is None:
+                return None, None
+            found = [
+                self.texts.get(counts[kind].most_common(1)[0][0]) if counts[kind] else None
+                for kind in ("description", "tolerances")
+            ]
+            # Texts are only kept while some series still counts them
+            live = {
+                digest
+                for other in self.series.values()
+                for counter in other.values()
+                for digest in counter
+            }
+            for digest in [d for d in self.texts if d not in live]:
+                del self.texts[digest]
+        return found[0], found[1]
+
+    def summary(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "parsed": self.misses,
+                "reused": self.hits,
+                "reuse_rate": round(self.hits / total, 3) if total else None,
+            }
+
+
+SECTIONS = SectionIndex()
@@ -0,0 +1,263 @@
+"""
+PDF archiving of product-details pages
+Pages are printed with CDP Page.printToPDF using transferMode
+ReturnAsStream, and the PDF is pulled in IO.read chunks instead of as one
+base64 blob. Chunks go through a bounded queue to a background writer
+thread, which decodes them and writes to disk, so the capturing browsers
+only wait on Chrome. A manifest of page hashes lets a re-run skip pages
+whose HTML has not changed since their PDF was written; when the crawl's
+PageCache holds the page, its content hash is checked before the browser
+loads anything.
+
+Layout:
+    <out_dir>/<EDP>.pdf
+    <out_dir>/pdf_manifest.json     {edp: page hash}
+"""
+
+import base64
+import json
+import os
+import queue
+import threading
+
+from concurrency import map_threaded
+from http_fetcher import BASE_URL, product_details_url
+from metrics import METRICS, timed_stage
+from page_cache import html_hash
+from throttle import PRODUCT_DETAILS, call_throttled
+
+
+PDF_OPTIONS = {
+    "printBackground": True,
+    "landscape": True,  # Landscape for wide tables
+    "paperWidth": 11,
+    "paperHeight": 8.5,
+    "marginTop": 0.4,
+    "marginBottom": 0.4,
+    "marginLeft": 0.4,
+    "marginRight": 0.4,
+    "scale": 0.9,
+}
+
+CHUNK_SIZE = 256 * 1024
+
+
+def iter_pdf_chunks(driver, chunk_size=CHUNK_SIZE):
+    """Print the current page and yield (data, base64_encoded) chunks
+
+    With ReturnAsStream, printToPDF returns a stream handle and the PDF is
+    read from it piece by piece with IO.read.
+    """
+    result = driver.execute_cdp_cmd(
+        "Page.printToPDF", dict(PDF_OPTIONS, transferMode="ReturnAsStream")
+    )
+    handle = result.get("stream")
+    if handle is None:
+        # Chrome without stream support answers with the whole document
+        yield result["data"], True
+        return
+    try:
+        while True:
+            chunk = driver.execute_cdp_cmd("IO.read", {"handle": handle, "size": chunk_size})
+            if chunk.get("data"):
+                yield chunk["data"], chunk.get("base64Encoded", False)
+            if chunk.get("eof"):
+                break
+    finally:
+        driver.execute_cdp_cmd("IO.close", {"handle": handle})
+
+
+def decode_chunk(data, base64_encoded):
+    return base64.b64decode(data) if base64_encoded else data.encode("latin-1")
+
+
+class PdfWriter:
+    """Background thread that decodes PDF chunks and writes them to disk
+
+    Each PDF is written to <path>.part and renamed into place once all of
+    its chunks have arrived; its page hash is then recorded in the
+    manifest. Once a chunk fails to write, the rest of that EDP's chunks
+    are dropped and it is neither renamed into place nor recorded. The
+    queue is bounded, so capture stalls rather than buffering
+    unboundedly if the disk falls behind.
+    """
+
+    def __init__(self, out_dir, max_pending=64):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest_path = os.path.join(out_dir, "pdf_manifest.json")
+        self.manifest = self._load_manifest()
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.files = {}
+        self.written = 0
+        self.failed = set()  # EDPs whose PDF could not be written
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def path_for(self, edp_number):
+        return os.path.join(self.out_dir, f"{edp_number}.pdf")
+
+    def is_current(self, edp_number, page_hash):
+        """True if this EDP's PDF exists and was printed from the same page"""
+        with self.lock:
+            recorded = self.manifest.get(edp_number)
+        return recorded == page_hash and os.path.exists(self.path_for(edp_number))
+
+    # ===== Called from capture threads =====
+
+    def write_chunk(self, edp_number, data, base64_encoded):
+        self.queue.put(("chunk", edp_number, (data, base64_encoded)))
+
+    def finish(self, edp_number, page_hash):
+        self.queue.put(("finish", edp_number, page_hash))
+
+    def abort(self, edp_number):
+        self.queue.put(("abort", edp_number, None))
+
+    # ===== Writer thread =====
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            kind, edp_number, payload = item
+            try:
+                self._handle(kind, edp_number, payload)
+            except Exception as e:
+                print(f"  ✗ Error writing PDF for EDP {edp_number}: {str(e)}")
+                self.failed.add(edp_number)
+                self._close_part(edp_number, keep=False)
+
+    def _handle(self, kind, edp_number, payload):
+        part_path = self.path_for(edp_number) + ".part"
+        if edp_number in self.failed:
+            # A truncated PDF must never be renamed into place
+            if kind == "finish":
+                print(f"  ✗ Discarded incomplete PDF for EDP {edp_number}")
+            return
+        if kind == "chunk":
+            f = self.files.get(edp_number)
+            if f is None:
+                f = self.files[edp_number] = open(part_path, "wb")
+            f.write(decode_chunk(*payload))
+        elif kind == "finish":
+            self._close_part(edp_number, keep=True)
+            with self.lock:
+                self.manifest[edp_number] = payload
+            self.written += 1
+            print(f"  ✓ Saved: {os.path.basename(self.path_for(edp_number))}")
+        elif kind == "abort":
+            self._close_part(edp_number, keep=False)
+
+    def _close_part(self, edp_number, keep):
+        f = self.files.pop(edp_number, None)
+        if f is None:
+            return
+        f.close()
+        part_path = self.path_for(edp_number) + ".part"
+        if keep:
+            os.replace(part_path, self.path_for(edp_number))
+        elif os.path.exists(part_path):
+            os.remove(part_path)
+
+    def close(self):
+        """Drain the queue, stop the thread and save the manifest"""
+        self.queue.put(None)
+        self.thread.join()
+        with self.lock:
+            manifest = dict(self.manifest)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@timed_stage("print_page_to_pdf")
+def stream_pdf(driver, edp_number, writer, page_hash=None):
+    """Print the current page and hand its chunks to the writer"""
+    try:
+        for data, base64_encoded in iter_pdf_chunks(driver):
+            writer.write_chunk(edp_number, data, base64_encoded)
+    except Exception:
+        writer.abort(edp_number)
+        raise
+    writer.finish(edp_number, page_hash)
+
+
+def load_product_page(driver, url):
+    from readiness import wait_for_list_info
+
+    driver.get(url)
+    wait_for_list_info(driver)
+
+
+def capture_pdf(driver, edp_number, writer, base_url=BASE_URL, throttle=None, page_hash=None):
+    """Load one product-details page and archive it unless unchanged
+
+    page_hash is the fetched HTML's content hash when the caller knows it
+    (archive_pdfs has already checked it against the manifest); otherwise
+    the rendered page source is hashed. Returns "written", "unchanged" or
+    "failed".
+    """
+    try:
+        call_throttled(
+            throttle,
+            PRODUCT_DETAILS,
+            load_product_page,
+            driver,
+            product_details_url(edp_number, base_url),
+        )
+        if page_hash is None:
+            page_hash = html_hash(driver.page_source)
+            if writer.is_current(edp_number, page_hash):
+                METRICS.inc("pdfs_total", status="unchanged")
+                return "unchanged"
+        stream_pdf(driver, edp_number, writer, page_hash)
+        METRICS.inc("pdfs_total", status="written")
+        return "written"
+    except Exception as e:
+        print(f"  ✗ Error printing PDF for EDP {edp_number}: {str(e)}")
+        METRICS.inc("pdfs_total", status="failed")
+        return "failed"
+
+
+def archive_pdfs(pool, edp_numbers, out_dir, base_url=BASE_URL, throttle=None, cache=None):
+    """Print many product-details pages to PDF in parallel across a DriverPool
+
+    Pages found unchanged in `cache` are skipped without a browser session.
+    Returns {"written": n, "unchanged": n, "failed": n}.
+    """
+
+    def capture_one(edp_number):
+        # The fetched HTML's hash decides the skip before any page is loaded
+        url = product_details_url(edp_number, base_url)
+        page_hash = cache.content_hash(url) if cache is not None else None
+        if page_hash is not None and writer.is_current(edp_number, page_hash):
+            METRICS.inc("pdfs_total", status="unchanged")
+            return "unchanged"
+        with pool.session() as driver:
+            return capture_pdf(driver, edp_number, writer, base_url, throttle, page_hash)
+
+    with PdfWriter(out_dir) as writer:
+        results = map_threaded(capture_one, edp_numbers, workers=pool.size)
+    counts = {"written": 0, "unchanged": 0, "failed": 0}
+    for edp_number, result in zip(edp_numbers, results):
+        if result == "written" and edp_number in writer.failed:
+            result = "failed"
+        counts[result] += 1
+    return counts
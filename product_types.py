@@ -0,0 +1,31 @@
+"""
+GARR product types
+The catalog's product types in catalog order, as named in the site's
+PRODUCTS menu. Kept apart from the crawler so the CLI, planning and
+discovery can use them without importing Selenium.
+"""
+
+PRODUCT_TYPES = [
+    "Drills - High Performance",
+    "Drills - General Purpose",
+    "Reamers",
+    "Drill Mills",
+    "Roughers",
+    "End Mills - High Performance",
+    "End Mills - Stub Length",
+    "End Mills - Standard Length",
+    "End Mills - Extra Length",
+    "Burrs/Rotary Files",
+]
+
+
+def select_product_types(names=None, limit=None):
+    """Product types to crawl, in catalog order"""
+    if names:
+        unknown = [name for name in names if name not in PRODUCT_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown product types: {', '.join(unknown)}")
+        selected = [name for name in PRODUCT_TYPES if name in names]
+    else:
+        selected = list(PRODUCT_TYPES)
+    return selected[:limit]
@@ -0,0 +1,176 @@
+"""
+Event-driven readiness waits
+Replaces fixed time.sleep() calls with waits on concrete DOM conditions.
+Every wait is timed, and each wait's timeout adapts to how long that
+condition has actually taken so far.
+"""
+
+import threading
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from page_parser import LIST_INFO_XPATH
+
+
+class WaitStats:
+    """Record how long each named wait takes and derive adaptive timeouts"""
+
+    def __init__(self, default_timeout=10.0, min_timeout=2.0, max_timeout=30.0,
+                 multiplier=4.0, min_samples=5):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.samples = {}
+        self.timeouts = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, timed_out=False):
+        with self.lock:
+            self.samples.setdefault(name, []).append(seconds)
+            if timed_out:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+    def timeout_for(self, name):
+        """Timeout for a wait: a multiple of its observed p95, within bounds"""
+        with self.lock:
+            samples = sorted(self.samples.get(name, []))
+        if len(samples) < self.min_samples:
+            return self.default_timeout
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.multiplier))
+
+    def summary(self):
+        """Return {name: {count, timeouts, total_s, mean_s, p95_s, max_s}}"""
+        with self.lock:
+            items = {name: sorted(s) for name, s in self.samples.items()}
+            timeouts = dict(self.timeouts)
+        summary = {}
+        for name, samples in items.items():
+            summary[name] = {
+                "count": len(samples),
+                "timeouts": timeouts.get(name, 0),
+                "total_s": round(sum(samples), 3),
+                "mean_s": round(sum(samples) / len(samples), 3),
+                "p95_s": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+                "max_s": round(samples[-1], 3),
+            }
+        return summary
+
+    def report(self):
+        """Print a table of wait timings"""
+        print("\nReadiness wait timings:")
+        for name, s in sorted(self.summary().items()):
+            print(
+                f"  {name:<24} n={s['count']:<5} total={s['total_s']:>8.2f}s "
+                f"mean={s['mean_s']:.3f}s p95={s['p95_s']:.3f}s "
+                f"max={s['max_s']:.3f}s timeouts={s['timeouts']}"
+            )
+
+
+WAIT_STATS = WaitStats()
+
+
+def wait_for(driver, name, condition, timeout=None, poll_frequency=0.1, stats=WAIT_STATS):
+    """Wait until condition(driver) is truthy, record the wait and return the result"""
+    if timeout is None:
+        timeout = stats.timeout_for(name)
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(
+            driver,
+            timeout,
+            poll_frequency=poll_frequency,
+            ignored_exceptions=(StaleElementReferenceException,),
+        ).until(condition)
+    except TimeoutException:
+        stats.record(name, time.perf_counter() - start, timed_out=True)
+        raise
+    stats.record(name, time.perf_counter() - start)
+    return result
+
+
+# ===== Conditions =====
+
+
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def url_changed(old_url):
+    def condition(driver):
+        return driver.current_url != old_url and document_ready(driver)
+
+    return condition
+
+
+def elements_present(by, selector):
+    def condition(driver):
+        return driver.find_elements(by, selector) or False
+
+    return condition
+
+
+ROW_COUNT_JS = "return arguments[0].querySelectorAll(arguments[1]).length;"
+
+
+class rows_stable:
+    """Condition: the number of matching rows has moved off `baseline` and
+    then not changed for `settle` seconds. Returns the row count once
+    stable.
+
+    baseline is the count before the click that loads more rows, and the
+    settle timer only starts once the count leaves it, so a load slower
+    than `settle` is waited for instead of being read as "no new rows".
+    Rows are counted in the page, so polling a table with tens of
+    thousands of rows does not create a WebElement for each of them.
+    """
+
+    def __init__(self, container, baseline, selector="li.series-results-row", settle=0.5):
+        self.container = container
+        self.selector = selector
+        self.settle = settle
+        self.count = baseline
+        self.changed_at = None
+
+    def __call__(self, driver):
+        count = driver.execute_script(ROW_COUNT_JS, self.container, self.selector)
+        now = time.monotonic()
+        if count != self.count:
+            self.count = count
+            self.changed_at = now
+            return False
+        if self.changed_at is not None and now - self.changed_at >= self.settle:
+            return count
+        return False
+
+
+# ===== Named waits used by the scraper =====
+
+
+def wait_for_document(driver, name="document_ready"):
+    return wait_for(driver, name, document_ready)
+
+
+def wait_for_navigation(driver, old_url, name="navigation"):
+    return wait_for(driver, name, url_changed(old_url))
+
+
+def wait_for_product_table(driver):
+    """Wait for the listing's series names and product tables to render"""
+    wait_for(driver, "product_table", elements_present(By.CSS_SELECTOR, "ul.product-table"))
+    return wait_for(driver, "series_names", elements_present(By.CSS_SELECTOR, "strong.name"))
+
+
+def wait_for_rows_stable(driver, container, baseline, settle=0.5):
+    """Wait for a table to grow past `baseline` rows and settle; return the count"""
+    return wait_for(driver, "rows_stable", rows_stable(container, baseline, settle=settle))
+
+
+def wait_for_list_info(driver):
+    """Wait for the product-details list-info <ul> to appear"""
+    return wait_for(driver, "list_info", elements_present(By.XPATH, LIST_INFO_XPATH))
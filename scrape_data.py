@@ -10,87 +10,213 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
+import functools
 import os
-import json
-import re
 import sys
-from tool_schemas import Tool, Series, ProductType, Products
+from tool_schemas import Series, ProductType, Products
 from pydantic import ValidationError
-from firecrawl import Firecrawl
+from page_parser import (
+    LIST_INFO_XPATH,
+    SERIES_NAME_XPATH,
+    build_tool,
+    parse_page_sections,
+    parse_tool_details,
+)
+from page_sections import SECTIONS, normalize_section
+from page_cache import PageCache
+from backends import backend_options, firecrawl_options
+from product_types import PRODUCT_TYPES, select_product_types
+from crawl_journal import CrawlJournal
+from catalog_store import CatalogStore, ChangeSet
+from jsonl_sink import JsonlToolSink, iter_series
+from tool_records import ProductsWriter, write_products
+from site_map import load_or_discover, session_fetcher
+from metrics import METRICS, timed_stage
+from pdf_archive import archive_pdfs, decode_chunk, iter_pdf_chunks
+from incremental import (
+    carry_over_sections,
+    diff_series,
+    index_products,
+    load_products,
+    max_age_from_days,
+    merge_products,
+    merge_tools,
+)
+from http_fetcher import (
+    BASE_URL,
+    create_session,
+    product_details_url,
+    scrape_tools_http,
+)
+from concurrency import HostRateLimiter, map_threaded
+from throttle import LISTING, PRODUCT_DETAILS, Throttle, call_throttled
+from driver_pool import DriverPool, setup_headless_driver
+from shard_crawl import crawl_sharded
+from readiness import (
+    WAIT_STATS,
+    wait_for,
+    wait_for_document,
+    wait_for_list_info,
+    wait_for_navigation,
+    wait_for_product_table,
+    wait_for_rows_stable,
+)
 
 
 ##################################
 # Playground for developing code snippets
 ##################################
 
-PRODUCT_TYPES = [
-    "Drills - High Performance",
-    "Drills - General Purpose",
-    "Reamers",
-    "Drill Mills",
-    "Roughers",
-    "End Mills - High Performance",
-    "End Mills - Stub Length",
-    "End Mills - Standard Length",
-    "End Mills - Extra Length",
-    "Burrs/Rotary Files",
-]
-BASE_URL = "https://www.garrtool.com/"
-
-def scrape_tool_details(driver, edp_number, series_name):
+@timed_stage("scrape_tool_details")
+def scrape_tool_details(driver, edp_number, series_name, cache=None, product_type=None):
     """Scrape individual tool page and return Tool object"""
-    # Click into tool page
+    html = driver.page_source
+    # Keep a copy of the page so re-runs can parse it without the browser
+    source_html_hash = cache.put(driver.current_url, html) if cache is not None else None
     # Extract all fields
-    list_info = driver.find_elements(
-        By.XPATH,
-        '//*[@id="post-397"]/div/div[2]/div[2]/div[1]/div[1]/ul[1]',
-    )
+    list_info = driver.find_elements(By.XPATH, LIST_INFO_XPATH)
     print(f" Scraped List Info: {list_info[0].text if list_info else 'N/A'}")
-    series = driver.find_elements(
-        By.XPATH,
-        "/html/body/div[1]/main/form/div/div/div[1]/div[1]/strong",
-    )
+    series = driver.find_elements(By.XPATH, SERIES_NAME_XPATH)
     print(f" Scraped Series Name: {series[0].text if series else 'N/A'}")
-    regex = r"\d+(?:\.\d+)?xD"
-    print(
-        f"XD Extraction Result: {float(re.findall(regex, list_info[0].text, re.IGNORECASE)[0][:-2]) if list_info else None}"
-    )
-    tool = Tool(
-        vendor_product_id=edp_number,
-        series_name=series_name,
-        xD=float(
-            re.findall(r"\d+(?:\.\d+)?xD", list_info[0].text, re.IGNORECASE)[0][:-2]
-        )
-        if list_info
-        else None,
+    # The description and tolerances are found by their headings in the page source
+    SECTIONS.observe(product_type, series_name, parse_page_sections(html))
+    tool = build_tool(
+        edp_number,
+        series_name,
+        list_info[0].text if list_info else None,
+        source_html_hash,
+        product_type,
     )
+    print(f"XD Extraction Result: {tool.xD}")
     print(f" Created Tool Object: {tool}")
     return tool
 
-def scrape_tool_details_firecrawl(edp_number, series_name, product_url):
-    """Scrape individual tool page and return Tool object"""
-    # Click into tool page
-    # Extract all fields
-    app = Firecrawl(api_key="fc-f6dd17dfb285400b85b5002f1701962f")
-
-    result = app.scrape(
-        'https://www.garrtool.com/product-details/?EDP=70631',
-        formats=[{
-        "type": "json",
-        "schema": Tool.model_json_schema(),
-        "prompt": "Scrape all relevant fields for the tool on this page. Return a JSON object matching the Tool schema."
-        }],
-        only_main_content=False,
-        timeout=120000
-    )
-    tool = Tool.model_validate(result)
-    return tool
+def scrape_tool_details_firecrawl(edp_number, series_name, product_url=None):
+    """Extract individual tool page with Firecrawl and return Tool object"""
+    from firecrawl_client import get_extractor
+
+    # One shared client; results are memoized by URL + Tool schema hash
+    return get_extractor().extract_tool(edp_number, series_name, product_url)
 
-def scrape_series_table(driver, series_name):
-    """Parse table and scrape all tools in series"""
 
+def scrape_edps(
+    driver,
+    edp_numbers,
+    series_name,
+    session=None,
+    workers=8,
+    rate_limiter=None,
+    engine="threads",
+    cache=None,
+    extractor=None,
+    product_type=None,
+    throttle=None,
+    on_tool=None,
+):
+    """Scrape a list of EDPs and return (tools, errors)
+
+    errors maps each EDP that could not be scraped to its error message.
+    With a FirecrawlExtractor, pages are extracted by Firecrawl instead.
+    With a Throttle, every page load runs under its adaptive
+    product-details limit and circuit breaker. on_tool is called with
+    each Tool as soon as it is validated.
+    """
+    errors = {}
+    if extractor is not None:
+        backend = "firecrawl"
+        tools = extractor.extract_tools(
+            edp_numbers, series_name, errors=errors, on_tool=on_tool
+        )
+    elif session is not None:
+        backend = "http"
+        tools = scrape_tools_http(
+            session,
+            edp_numbers,
+            series_name,
+            workers=workers,
+            rate_limiter=rate_limiter,
+            engine=engine,
+            cache=cache,
+            errors=errors,
+            product_type=product_type,
+            throttle=throttle,
+            on_tool=on_tool,
+        )
+    else:
+        backend = "selenium"
+        tools = scrape_edps_selenium(
+            driver, edp_numbers, series_name, errors, cache, product_type, throttle, on_tool
+        )
+    METRICS.inc("tools_scraped_total", len(tools), backend=backend)
+    METRICS.inc("edps_failed_total", len(errors), backend=backend)
+    return tools, errors
+
+
+def load_product_details(driver, url):
+    driver.get(url)
+    wait_for_list_info(driver)
+
+
+def scrape_edps_selenium(
+    driver,
+    edp_numbers,
+    series_name,
+    errors,
+    cache=None,
+    product_type=None,
+    throttle=None,
+    on_tool=None,
+):
+    """Scrape EDPs one at a time in the browser; failures go into errors"""
     tools = []
+    for edp_number in edp_numbers:
+        try:
+            url = product_details_url(edp_number)
+            cached = cache.get_fresh(url) if cache is not None else None
+            if cached is None:
+                call_throttled(throttle, PRODUCT_DETAILS, load_product_details, driver, url)
+            # Scrape tool details
+            try:
+                print(f"  Scraping tool EDP {edp_number}...")
+                if cached is not None:
+                    tool = parse_tool_details(
+                        cached.html,
+                        edp_number,
+                        series_name,
+                        cached.content_hash,
+                        product_type,
+                    )
+                else:
+                    tool = scrape_tool_details(
+                        driver, edp_number, series_name, cache, product_type
+                    )
+                tools.append(tool)
+                if on_tool is not None:
+                    on_tool(tool)
+
+            except ValidationError as ve:
+                print(f"  ✗ Validation error for EDP {edp_number}: {str(ve)}")
+                errors[edp_number] = f"Validation error: {ve}"
+
+        except Exception as e:
+            print(f"  ✗ Error navigating to EDP {edp_number}: {str(e)}")
+            errors[edp_number] = str(e)
+    return tools
+
+
+def find_series_table(driver, series_name, table_id=None):
+    """Return a series' ul.product-table, by data-id if known, else by name
+
+    A data-id from the cached site map that is no longer on the page
+    falls back to the name lookup.
+    """
+    if table_id is not None:
+        tables = driver.find_elements(
+            By.CSS_SELECTOR, f'ul.product-table[data-id="{table_id}"]'
+        )
+        if tables:
+            return tables[0]
+        print(f"  ✗ Table {table_id} of series '{series_name}' not found; looking it up by name")
     result_row_xpath = f'//div[@class="resultRow"]//strong[@class="name" and contains(text(), "{series_name}")]'
     series_element = driver.find_element(By.XPATH, result_row_xpath)
     result_row = series_element.find_element(
@@ -98,57 +224,215 @@ def scrape_series_table(driver, series_name):
     )
 
     # Find the product-table within this resultRow
-    product_table = result_row.find_element(By.CSS_SELECTOR, "ul.product-table")
+    return result_row.find_element(By.CSS_SELECTOR, "ul.product-table")
+
 
-    # Get the data-id of this table for reference
-    table_id = product_table.get_attribute("data-id")
+def list_series_edps(driver, series_name, table_id=None, max_edps=None, unexpanded=()):
+    """Read the EDP numbers of one series from the (expanded) listing page
+
+    Lazily loaded rows are pulled in first, then the table is read in
+    chunks. With max_edps, reading stops after that many EDPs. Returns
+    (edp_numbers, complete); complete is False when the list was cut at
+    max_edps, or the table's rows did not all arrive: its expansion timed
+    out (its data-id is in `unexpanded`, see expand_all_tables; None when
+    expanding the listing failed altogether) or a "Load More" did.
+    """
+    product_table = find_series_table(driver, series_name, table_id)
+    row_count, complete = load_all_rows(driver, product_table, max_rows=max_edps)
+    if unexpanded is None or (
+        unexpanded and product_table.get_attribute("data-id") in unexpanded
+    ):
+        complete = False
+    print(f"Found {row_count} rows in series '{series_name}'")
 
-    # Find all rows within this specific table
     # <li data-id="12641" class="series-results-row">
-    rows = product_table.find_elements(By.CSS_SELECTOR, "li.series-results-row")
-    print(f"Found {len(rows)} rows in series '{series_name}'")
     edp_numbers = []
-    count = 0
-    for row in rows:
-        edp_number = get_edp_from_row(row)
-        if edp_number:
-            edp_numbers.append(edp_number)
-            count += 1
-        if count >= 10:
+    for row in iter_table_rows(driver, product_table):
+        if row["edp"]:
+            edp_numbers.append(row["edp"])
+        if max_edps is not None and len(edp_numbers) >= max_edps:
             break
     print(f"Found {len(edp_numbers)} EDP numbers in series '{series_name}'")
-    for edp_number in edp_numbers:
-        try:
-            driver.get(f"https://www.garrtool.com/product-details/?EDP={edp_number}")
-            time.sleep(2)  # Wait for page to load
-            # Scrape tool details
-            try:
-                print(f"  Scraping tool EDP {edp_number}...")
-                tool = scrape_tool_details(driver, edp_number, series_name)
-                tools.append(tool)
+    if not complete:
+        print(f"  ✗ Listing of series '{series_name}' did not load in full")
+    return edp_numbers, complete and listing_complete(edp_numbers, max_edps)
 
-            except ValidationError as ve:
-                print(f"  ✗ Validation error for EDP {edp_number}: {str(ve)}")
 
-        except Exception as e:
-            print(f"  ✗ Error navigating to EDP {edp_number}: {str(e)}")
+def listing_complete(edp_numbers, max_edps=None):
+    """True if a series' EDP list was read in full rather than cut at max_edps"""
+    return max_edps is None or len(edp_numbers) < max_edps
+
+
+@timed_stage("scrape_series_table")
+def scrape_series_table(
+    driver,
+    series_name,
+    previous=None,
+    max_age=None,
+    journal=None,
+    product_type_name=None,
+    edp_numbers=None,
+    complete=False,
+    table_id=None,
+    max_edps=None,
+    listings=None,
+    **fetch_options,
+):
+    """Parse table and scrape all tools in series
+
+    With edp_numbers (read earlier by list_series_edps, which also says
+    whether they are `complete`), the listing page is not touched;
+    otherwise the series table is located by table_id or name and at
+    most max_edps of its EDPs are read. fetch_options are
+    passed to scrape_edps. With `previous` ({edp: Tool} from the last
+    run), only new or stale EDPs are fetched and the rest are carried
+    over. With a CrawlJournal, EDPs already done are skipped and failures
+    are retried with backoff. A `listings` dict receives the listed EDPs
+    under (product_type_name, series_name) when the listing was read in
+    full.
+    """
+    if edp_numbers is None:
+        edp_numbers, complete = list_series_edps(driver, series_name, table_id, max_edps)
+    listed_edps = edp_numbers
+    if listings is not None and complete:
+        listings[(product_type_name, series_name)] = list(listed_edps)
+    if previous is not None:
+        diff = diff_series(
+            previous, listed_edps, max_age=max_age, cache=fetch_options.get("cache")
+        )
+        print(f"Series '{series_name}': {diff.summary()}")
+        edp_numbers = diff.to_fetch
+
+    fetch_options["product_type"] = product_type_name
+    if journal is None:
+        tools, _ = scrape_edps(driver, edp_numbers, series_name, **fetch_options)
+    else:
+        # The whole listing is registered and carried-over EDPs are marked
+        # done, so a resumed crawl rebuilds the entire series from the journal
+        journal.register_edps(product_type_name, series_name, listed_edps)
+        done = journal.completed_tools(product_type_name, series_name)
+        if previous is not None:
+            carried = [previous[edp] for edp in diff.unchanged if edp not in done]
+            journal.record(product_type_name, series_name, carried, {})
+        edp_numbers = [edp for edp in edp_numbers if edp not in done]
+        if done:
+            print(f"  Resuming: {len(done)} EDPs already done")
+        while edp_numbers:
+            tools, errors = scrape_edps(driver, edp_numbers, series_name, **fetch_options)
+            journal.record(product_type_name, series_name, tools, errors)
+            edp_numbers = journal.wait_for_retries(product_type_name, series_name)
+        done = journal.completed_tools(product_type_name, series_name)
+        tools = [done[edp] for edp in listed_edps if edp in done]
+
+    if previous is not None:
+        tools = merge_tools(listed_edps, previous, tools)
 
+    details, tolerances = SECTIONS.series_sections(product_type_name, series_name)
+    if details is None and tolerances is None:
+        # Nothing fetched this run: a resumed or fully carried-over series
+        if journal is not None:
+            details, tolerances = journal.series_sections(product_type_name, series_name)
+        if details is None and tolerances is None:
+            details, tolerances = cached_series_sections(
+                fetch_options.get("cache"), listed_edps
+            )
+    if journal is not None:
+        journal.record_series_sections(product_type_name, series_name, details, tolerances)
     series = Series(
         name=series_name,
-        details="...",  # Extract from page
-        tolerances="...",  # Extract from page
+        details=details,
+        tolerances=tolerances,
         tools=tools,
     )
     return series
 
 
-def scrape_product_type(driver, actions, product_type_name):
-    """Navigate to product type and scrape all series"""
+def cached_series_sections(cache, edp_numbers):
+    """(details, tolerances) from the first cached page of a series, if any"""
+    if cache is None:
+        return None, None
+    for edp_number in edp_numbers:
+        cached = cache.get(product_details_url(edp_number), touch=False)
+        if cached is not None:
+            sections = parse_page_sections(cached.html)
+            return normalize_section(sections.description), normalize_section(sections.tolerances)
+    return None, None
+
+
+def scrape_product_type(
+    driver,
+    actions,
+    product_type_name,
+    previous=None,
+    journal=None,
+    sink=None,
+    site_map=None,
+    max_series=None,
+    max_edps=None,
+    **series_options,
+):
+    """Navigate to product type and scrape all series
+
+    With a SiteMap, the listing is loaded straight from its discovered
+    URL; otherwise it is reached through the PRODUCTS menu. Every series
+    table is expanded and its EDPs read on that one page load, before
+    any product-details page is visited. max_series and max_edps cap
+    the series crawled and the EDPs read per series (None: all of them).
+
+    series_options are passed through to scrape_series_table; `previous`
+    maps series names to {edp: Tool} from the last run. With a
+    CrawlJournal, series finished in an earlier run are rebuilt from the
+    journal instead of being crawled again. With a JsonlToolSink, each
+    tool is streamed out as soon as it is scraped, each finished series
+    is closed in the stream, and the returned ProductType holds the
+    series without their tools.
+    """
+    series_list = []
+
+    def stream_tools(series_name, streamed):
+        def on_tool(tool):
+            sink.write_tool(product_type_name, series_name, tool)
+            streamed.add(tool.vendor_product_id)
+
+        return on_tool
+
+    def previous_for(series_name):
+        return previous.get(series_name, {}) if previous is not None else None
+
+    def finish_series(series, streamed=()):
+        if sink is None:
+            series_list.append(series)
+            return
+        sink.write_series(product_type_name, series, streamed)
+        series_list.append(series.model_copy(update={"tools": []}))
+        print(f"✓ Series {series.name}: {len(series.tools)} tools streamed")
+
+    if journal is not None:
+        journaled_names = journal.series_names(product_type_name)
+        if journaled_names and all(
+            journal.series_complete(product_type_name, name) for name in journaled_names
+        ):
+            print(f"✓ {product_type_name} already complete in journal")
+            for name in journaled_names:
+                finish_series(journal.series(product_type_name, name, previous_for(name)))
+            return ProductType(name=product_type_name, series=series_list)
+
     # Navigate to product type page
+    product_type_url = site_map.url_for(product_type_name) if site_map else None
+    throttle = series_options.get("throttle")
     try:
-        # Click all "Load All Series Results" buttons
-        go_to_product_table_page(driver, BASE_URL, actions, link_text=product_type_name)
-        product_type_url = driver.current_url
+        if product_type_url:
+            call_throttled(throttle, LISTING, driver.get, product_type_url)
+        else:
+            call_throttled(
+                throttle,
+                LISTING,
+                go_to_product_table_page,
+                driver,
+                BASE_URL,
+                actions,
+                link_text=product_type_name,
+            )
 
     except Exception as e:
         print(f"\n✗ Fatal error: {str(e)}")
@@ -156,49 +440,111 @@ def scrape_product_type(driver, actions, product_type_name):
 
         traceback.print_exc()
 
-    serieses = WebDriverWait(driver, 10).until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, "strong.name"))
-    )
-    series_names = [series.text.split("\n", 1)[0] for series in serieses]
+    serieses = wait_for_product_table(driver)
+    known_tables = site_map.series_for(product_type_name) if site_map else []
+    table_ids = {entry["name"]: entry["table_id"] for entry in known_tables}
+    series_names = [series.text.split("\n", 1)[0] for series in serieses][:max_series]
 
-    series_list = []
-    for i, series_name in enumerate(series_names):
+    # Expand every series on this one page load, then read all EDP lists;
+    # a series that fails is reported and the others carry on
+    unexpanded = expand_tables_safely(driver)
+    listed = {}
+    for series_name in series_names:
+        if journal is None or not journal.series_complete(product_type_name, series_name):
+            try:
+                listed[series_name] = list_series_edps(
+                    driver, series_name, table_ids.get(series_name), max_edps, unexpanded
+                )
+            except Exception as e:
+                print(f"  ✗ Could not list series '{series_name}': {type(e).__name__}: {e}")
+                listed[series_name] = None
+
+    for series_name in series_names:
+        if series_name in listed and listed[series_name] is None:
+            continue
+        if series_name not in listed:
+            print(f"✓ Series {series_name} already complete in journal")
+            finish_series(
+                journal.series(product_type_name, series_name, previous_for(series_name))
+            )
+            continue
         print(f"Scraping series: {series_name}")
-        expand_table(driver, actions, i)
-        series_list.append(scrape_series_table(driver, series_name))
-        print(series_list)
-        driver.get(product_type_url)
-        time.sleep(2)
-        if i >= 2:
-            break
+        edp_numbers, complete = listed[series_name]
+        streamed = set()
+        try:
+            series = scrape_series_table(
+                driver,
+                series_name,
+                previous=previous_for(series_name),
+                journal=journal,
+                product_type_name=product_type_name,
+                edp_numbers=edp_numbers,
+                complete=complete,
+                on_tool=stream_tools(series_name, streamed) if sink is not None else None,
+                **series_options,
+            )
+        except Exception as e:
+            print(f"  ✗ Series {series_name} failed: {type(e).__name__}: {e}")
+            continue
+        finish_series(series, streamed)
+        print(f"✓ Series {series_name}: {len(series.tools)} tools")
+    if journal is not None:
+        # Failed series are registered too, so a resumed crawl retries them
+        journal.register_product_type(product_type_name, series_names)
     # return series_list
     return ProductType(name=product_type_name, series=series_list)
 
 
-def expand_table(driver, actions, table_number):
-    """Expand all series tables by clicking 'Load All Series Results' buttons"""
+def scrape_product_type_pooled(pool, product_type_name, **kwargs):
+    """Check a browser out of the pool and scrape one product type with it"""
+    with pool.session() as driver:
+        return scrape_product_type(
+            driver, ActionChains(driver), product_type_name, **kwargs
+        )
+
+
+# Clicks every "Load All Series Results" button on the listing at once
+# and returns [table, table data-id, row count before the click] for the
+# product tables they belong to
+EXPAND_ALL_JS = """
+const tables = [];
+for (const link of document.querySelectorAll("a")) {
+    if (!link.textContent.includes("Load All Series Results")) continue;
+    const row = link.closest("div.resultRow");
+    const table = row && row.querySelector("ul.product-table");
+    const before = table ? table.querySelectorAll("li.series-results-row").length : 0;
+    link.click();
+    if (table) tables.push([table, table.getAttribute("data-id"), before]);
+}
+return tables;
+"""
+
 
+def expand_tables_safely(driver):
+    """expand_all_tables, or None (every listing incomplete) if it fails"""
     try:
-        load_buttons = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located(
-                (By.PARTIAL_LINK_TEXT, "Load All Series Results")
-            )
-        )
-        print(f"Found {len(load_buttons)} 'Load All Series Results' buttons")
-
-        if load_buttons:
-            button = load_buttons[table_number]
-            button = WebDriverWait(driver, 10).until(EC.element_to_be_clickable(button))
-            actions.scroll_to_element(button).perform()
-            # Use JavaScript click as fallback
-            driver.execute_script("arguments[0].click();", button)
-
-        if not load_buttons:
-            print("No 'Load All Series Results' buttons found")
-        time.sleep(1)
+        return expand_all_tables(driver)
     except Exception as e:
-        print(f"No more buttons found or error: {e}")
-    print("All series tables expanded.")
+        print(f"  ✗ Could not expand the series tables: {type(e).__name__}: {e}")
+        return None
+
+
+@timed_stage("expand_table")
+def expand_all_tables(driver):
+    """Expand every series table on the current listing with one script call
+
+    Each clicked table has to grow; returns the data-ids of the tables
+    whose rows did not arrive in time, whose listings are incomplete.
+    """
+    tables = driver.execute_script(EXPAND_ALL_JS) or []
+    unexpanded = set()
+    for table, table_id, before in tables:
+        try:
+            wait_for_rows_stable(driver, table, before)
+        except TimeoutException:
+            unexpanded.add(table_id)
+    print(f"Expanded {len(tables) - len(unexpanded)} of {len(tables)} series tables")
+    return unexpanded
 
 
 ###################################
@@ -209,16 +555,8 @@ def setup_chrome_driver(output_folder):
     chrome_options = Options()
 
     # Set download preferences for PDF
+    # (PDFs are printed over CDP, see pdf_archive, so no kiosk printing)
     prefs = {
-        "printing.print_preview_sticky_settings.appState": json.dumps(
-            {
-                "recentDestinations": [
-                    {"id": "Save as PDF", "origin": "local", "account": ""}
-                ],
-                "selectedDestinationId": "Save as PDF",
-                "version": 2,
-            }
-        ),
         "savefile.default_directory": output_folder,
         "download.default_directory": output_folder,
         "download.prompt_for_download": False,
@@ -227,7 +565,6 @@ def setup_chrome_driver(output_folder):
     }
 
     chrome_options.add_experimental_option("prefs", prefs)
-    chrome_options.add_argument("--kiosk-printing")
 
     driver = webdriver.Chrome(options=chrome_options)
     driver.maximize_window()
@@ -235,11 +572,12 @@ def setup_chrome_driver(output_folder):
     return driver
 
 
+@timed_stage("go_to_product_table_page")
 def go_to_product_table_page(driver, url, actions, link_text):
     """Navigate to the product table page"""
     # Navigate to main page
     driver.get(url)
-    time.sleep(2)  # Wait for page load
+    wait_for_document(driver)
 
     # Hover over the products button to reveal the submenu
     products_button = WebDriverWait(driver, 10).until(
@@ -247,13 +585,14 @@ def go_to_product_table_page(driver, url, actions, link_text):
     )
 
     actions.move_to_element(products_button).perform()
-    time.sleep(1)
-    # Click on "Drills - General Purpose"
-    drills_button = WebDriverWait(driver, 10).until(
-        EC.element_to_be_clickable((By.LINK_TEXT, link_text))
+    # Click on "Drills - General Purpose" once the submenu has opened
+    drills_button = wait_for(
+        driver, "submenu_link", EC.element_to_be_clickable((By.LINK_TEXT, link_text))
     )
+    old_url = driver.current_url
     drills_button.click()
-    time.sleep(2)
+    wait_for_navigation(driver, old_url)
+    wait_for_product_table(driver)
 
 
 def get_all_product_rows(driver):
@@ -275,6 +614,104 @@ def get_all_product_rows(driver):
         return []
 
 
+# Rows read per execute_script call when walking a table in chunks
+ROW_CHUNK_SIZE = 500
+
+# Returns one object per row of a ul.product-table, for rows
+# [offset, offset + limit): the table and row data-ids, the EDP link
+# text and the visible text of each column
+EXTRACT_ROWS_JS = """
+const table = arguments[0];
+const offset = arguments[1] || 0;
+const limit = arguments[2] == null ? Infinity : arguments[2];
+const tableId = table.getAttribute("data-id");
+const rows = table.querySelectorAll("li.series-results-row");
+const end = Math.min(rows.length, offset + limit);
+const result = [];
+for (let i = offset; i < end; i++) {
+    const row = rows[i];
+    const link = row.querySelector("strong.srEDP a.open");
+    result.push({
+        table_id: tableId,
+        data_id: row.getAttribute("data-id"),
+        edp: link ? link.textContent.trim() : null,
+        edp_data_id: link ? link.getAttribute("data-id") : null,
+        columns: Array.from(row.children)
+            .map(cell => cell.innerText.trim())
+            .filter(text => text.length > 0),
+    });
+}
+return result;
+"""
+
+
+def extract_table_rows(driver, product_table, offset=0, limit=None):
+    """Extract rows of a product table with one execute_script call
+
+    Returns a list of dicts with table_id, data_id, edp, edp_data_id and
+    columns (the visible text of each cell), for every row or for the
+    `limit` rows starting at `offset`.
+    """
+    return driver.execute_script(EXTRACT_ROWS_JS, product_table, offset, limit) or []
+
+
+def iter_table_rows(driver, product_table, chunk_size=ROW_CHUNK_SIZE):
+    """Yield the rows of a product table, read `chunk_size` at a time
+
+    Only one chunk of plain dicts is held at once, however long the
+    table is, and no WebElement is created per row.
+    """
+    offset = 0
+    while True:
+        rows = extract_table_rows(driver, product_table, offset, chunk_size)
+        yield from rows
+        if len(rows) < chunk_size:
+            break
+        offset += len(rows)
+
+
+# Triggers the next lazy load of a product table: scrolls its last row
+# into view and clicks any visible "Load More" link in its resultRow
+# ("Load All Series Results" was already clicked by expand_all_tables,
+# and clicking it again may collapse the table). Returns [row count,
+# whether a link was clicked].
+LOAD_MORE_ROWS_JS = """
+const table = arguments[0];
+const rows = table.querySelectorAll("li.series-results-row");
+if (rows.length) rows[rows.length - 1].scrollIntoView({block: "end"});
+const row = table.closest("div.resultRow");
+let clicked = false;
+for (const link of row ? row.querySelectorAll("a") : []) {
+    if (link.offsetParent !== null && /load more|show more/i.test(link.textContent)) {
+        link.click();
+        clicked = true;
+    }
+}
+return [rows.length, clicked];
+"""
+
+
+def load_all_rows(driver, product_table, max_rows=None, max_rounds=500):
+    """Click "Load More" until a table has every row; return (row count, complete)
+
+    The table is complete once no "Load More" link is left. Each click
+    has to grow the table; one whose rows do not arrive in time leaves
+    the table incomplete, as does stopping early once it has max_rows
+    rows.
+    """
+    for _ in range(max_rounds):
+        count, clicked = driver.execute_script(LOAD_MORE_ROWS_JS, product_table)
+        if max_rows is not None and count >= max_rows:
+            return count, False
+        if not clicked:
+            return count, True
+        try:
+            wait_for_rows_stable(driver, product_table, count)
+        except TimeoutException:
+            return count, False
+    return count, False
+
+
 def get_edp_from_row(row):
     """Extract EDP number from a row element"""
     try:
@@ -298,17 +735,14 @@ def expand_row_and_click_details(driver, row, edp_number):
 
         # Scroll into view
         driver.execute_script("arguments[0].scrollIntoView(true);", edp_link)
-        time.sleep(0.5)
 
         # Click to expand
         print(f"  Expanding row for EDP {edp_number}...")
         driver.execute_script("arguments[0].click();", edp_link)
         # edp_link.click()
-        time.sleep(1)  # Wait for expansion animation
         print(f"  Row expanded.")
         # Step 2: Find and click the "FULL DETAILS" button
         # The button should now be visible in the expanded content
-        wait = WebDriverWait(driver, 5)
         print(f"Creating selectors for FULL DETAILS button...")
         # Try multiple possible selectors for the FULL DETAILS button
         selectors = [
@@ -320,15 +754,21 @@ def expand_row_and_click_details(driver, row, edp_number):
         ]
         print(f"  Locating FULL DETAILS button...")
         # Use XPath as it's most reliable for text matching
-        full_details_btn = wait.until(
-            EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, "FULL DETAILS"))
+        # The wait also covers the row's expansion animation
+        full_details_btn = wait_for(
+            driver,
+            "full_details_button",
+            EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, "FULL DETAILS")),
+            timeout=5,
         )
 
         print(f"  Clicking FULL DETAILS button...")
+        old_url = driver.current_url
         driver.execute_script("arguments[0].click();", full_details_btn)
 
         # full_details_btn.click()
-        time.sleep(2)  # Wait for page to load
+        wait_for_navigation(driver, old_url)
+        wait_for_list_info(driver)
 
         return True
 
@@ -343,64 +783,286 @@ def expand_row_and_click_details(driver, row, edp_number):
         return False
 
 
+@timed_stage("print_page_to_pdf")
 def print_page_to_pdf(driver, filename):
-    """Print current page to PDF"""
-    try:
-        # Execute Chrome's print command
-        result = driver.execute_cdp_cmd(
-            "Page.printToPDF",
-            {
-                "printBackground": True,
-                "landscape": True,  # Landscape for wide tables
-                "paperWidth": 11,
-                "paperHeight": 8.5,
-                "marginTop": 0.4,
-                "marginBottom": 0.4,
-                "marginLeft": 0.4,
-                "marginRight": 0.4,
-                "scale": 0.9,
-            },
-        )
+    """Print current page to PDF
 
-        # Decode and save PDF
-        import base64
-
-        with open(filename, "wb") as f:
-            f.write(base64.b64decode(result["data"]))
+    The PDF is streamed from Chrome in chunks and written as it arrives;
+    use pdf_archive.archive_pdfs to capture many pages in parallel with
+    a background writer.
+    """
+    # Written to a temporary path and renamed, so a failure leaves no partial PDF
+    part_path = f"{filename}.part"
+    try:
+        with open(part_path, "wb") as f:
+            for data, base64_encoded in iter_pdf_chunks(driver):
+                f.write(decode_chunk(data, base64_encoded))
+        os.replace(part_path, filename)
 
         print(f"  ✓ Saved: {os.path.basename(filename)}")
         return True
     except Exception as e:
         print(f"  ✗ Error printing PDF: {str(e)}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
         return False
 
 
-def main():
-    output_folder = os.path.join(os.getcwd(), "tool_pdfs")
-    driver = setup_chrome_driver(output_folder)
-    actions = ActionChains(driver)
-    product_types = []
-    for i, product_type_name in enumerate(PRODUCT_TYPES):
-        product_type = scrape_product_type(driver, actions, product_type_name)
-        product_types.append(product_type)
-        print(product_types)
-        if i >= 1:
-            break
+def write_streamed_output(
+    sink, stream_path, output_path, product_types, previous=None, store=None, listings=None
+):
+    """Write the output, and upsert the store, from the JSONL stream
 
-    products = Products(types=product_types)
-    print(products.model_dump_json(indent=2))
-    with open("garr_products.json", "w", encoding="utf-8") as f:
-        f.write(products.model_dump_json(indent=2))
+    Series kept from the previous run are closed in the stream first, so
+    it holds the whole catalog. The stream is then read back one series
+    at a time; the full tree is never built. Returns the Products without
+    their tools, and the EDPs written.
+    """
+    crawled = {(t.name, s.name) for t in product_types for s in t.series}
+    previous_series = {}
+    for product_type in previous.types if previous is not None else []:
+        for series in product_type.series:
+            if (product_type.name, series.name) in crawled:
+                previous_series[(product_type.name, series.name)] = series
+            else:
+                sink.write_series(product_type.name, series)
+    sink.close()
 
-    driver.quit()
+    types = {}
+    edps = []
+    changes = ChangeSet()
+    with ProductsWriter(output_path) as writer:
+        for product_type_name, series in iter_series(stream_path, PRODUCT_TYPES):
+            series = carry_over_sections(
+                series, previous_series.get((product_type_name, series.name))
+            )
+            writer.add_series(product_type_name, series)
+            series_list = types.setdefault(product_type_name, [])
+            if store is not None:
+                changes.extend(
+                    store.upsert_series(
+                        product_type_name,
+                        series,
+                        position=len(series_list),
+                        type_position=list(types).index(product_type_name),
+                        listed_edps=(listings or {}).get((product_type_name, series.name)),
+                    )
+                )
+            series_list.append(series.model_copy(update={"tools": []}))
+            edps.extend(tool.vendor_product_id for tool in series.tools)
+    print(f"Wrote {len(edps)} tools ({writer.size / 1024:.0f} KB) to {output_path}")
+    if store is not None:
+        print(f"Catalog store: {changes.summary()}")
+    products = Products(
+        types=[ProductType(name=name, series=series) for name, series in types.items()]
+    )
+    return products, edps
 
-if __name__ == "__main__":
-    print("\n" + "=" * 60)
-    print("=" * 60)
-    print("=" * 60 + "\n")
 
-    response = input("Ready to start? (y/n): ")
-    if response.lower() == "y":
-        main()
+def main(
+    backend="selenium",
+    workers=8,
+    requests_per_second=4.0,
+    engine="threads",
+    browsers=1,
+    cache_dir=None,
+    output_path="garr_products.json",
+    incremental=False,
+    max_age_days=None,
+    journal_path=None,
+    stream_path=None,
+    site_map_path="garr_site_map.json",
+    metrics_port=None,
+    json_log_path=None,
+    pdf_dir=None,
+    initial_concurrency=4,
+    processes=1,
+    product_type_names=None,
+    max_product_types=None,
+    max_series=None,
+    max_edps=None,
+    store_path=None,
+    firecrawl_batch=False,
+):
+    """Crawl the catalog, write it to output_path and return the Products
+
+    By default the entire catalog is crawled in one browser. The options
+    are documented in `garr crawl --help` (cli.add_crawl_arguments).
+    """
+    crawl_types = select_product_types(product_type_names, max_product_types)
+    metrics_server = None
+    if metrics_port:
+        # http.server is only loaded when metrics are served
+        from metrics_server import MetricsServer
+
+        metrics_server = MetricsServer(METRICS, port=metrics_port).start()
+        print(f"Serving metrics at {metrics_server.url}")
+    if json_log_path:
+        METRICS.enable_json_log(None if json_log_path == "-" else json_log_path)
+    rate_limiter = HostRateLimiter(requests_per_second, burst=workers)
+    throttle = Throttle(
+        initial=min(initial_concurrency, workers), max_limit=max(workers, browsers)
+    )
+    cache = PageCache(cache_dir) if cache_dir else None
+    # Only the selected backend's module (and its dependencies) is imported
+    backend_fetch = backend_options(
+        backend, workers, cache_dir, throttle, **firecrawl_options(backend, firecrawl_batch)
+    )
+    session = backend_fetch["session"]
+    store = CatalogStore(store_path) if store_path else None
+    previous_products = load_products(output_path) if incremental else None
+    if incremental and previous_products is None and store is not None:
+        previous_products = store.products()
+    previous_index = index_products(previous_products)
+    fetch_options = dict(
+        session=session,
+        workers=workers,
+        rate_limiter=rate_limiter,
+        engine=engine,
+        cache=cache,
+        extractor=backend_fetch["extractor"],
+        throttle=throttle,
+        max_age=max_age_from_days(max_age_days),
+        journal=CrawlJournal(journal_path) if journal_path else None,
+        # (product type, series) -> EDPs of listings read in full
+        listings={},
+    )
+    journal = fetch_options["journal"]
+    resuming = journal is not None and journal.unfinished()
+    if resuming:
+        print(f"Resuming the unfinished crawl in {journal_path}")
+    # A resumed crawl appends to the stream it started
+    fetch_options["sink"] = (
+        JsonlToolSink(stream_path, mode="a" if resuming else "w") if stream_path else None
+    )
+
+    try:
+        fetch_options["site_map"] = load_or_discover(
+            site_map_path,
+            session_fetcher(session or create_session(), throttle=throttle),
+            PRODUCT_TYPES,
+            BASE_URL,
+        )
+    except Exception as e:
+        # Without a site map, listings are reached through the PRODUCTS menu
+        print(f"  ✗ Site-map discovery failed: {str(e)}")
+
+    def previous_for(product_type_name):
+        return previous_index.get(product_type_name, {}) if incremental else None
+
+    if processes > 1:
+        crawled_products = crawl_sharded(
+            crawl_types,
+            site_map=fetch_options.get("site_map"),
+            processes=processes,
+            previous_index=previous_index if incremental else None,
+            sink=fetch_options["sink"],
+            journal=journal,
+            listings=fetch_options["listings"],
+            max_series=max_series,
+            max_edps=max_edps,
+            backend=backend,
+            workers=workers,
+            requests_per_second=requests_per_second,
+            engine=engine,
+            cache_dir=cache_dir,
+            journal_path=journal_path,
+            max_age_days=max_age_days,
+            initial_concurrency=initial_concurrency,
+            firecrawl_batch=firecrawl_batch,
+        )
+        product_types = crawled_products.types
+    elif browsers > 1:
+        # Product types run in parallel, each on a pooled headless browser
+        with DriverPool(size=browsers) as pool:
+            product_types = map_threaded(
+                lambda name: scrape_product_type_pooled(
+                    pool,
+                    name,
+                    previous=previous_for(name),
+                    max_series=max_series,
+                    max_edps=max_edps,
+                    **fetch_options,
+                ),
+                crawl_types,
+                workers=browsers,
+            )
     else:
-        print("Cancelled.")
+        output_folder = os.path.join(os.getcwd(), "tool_pdfs")
+        driver = setup_chrome_driver(output_folder)
+        actions = ActionChains(driver)
+        product_types = []
+        for product_type_name in crawl_types:
+            product_type = scrape_product_type(
+                driver,
+                actions,
+                product_type_name,
+                previous=previous_for(product_type_name),
+                max_series=max_series,
+                max_edps=max_edps,
+                **fetch_options,
+            )
+            product_types.append(product_type)
+            print(f"✓ {product_type_name}: {len(product_type.series)} series")
+        driver.quit()
+
+    listings = fetch_options["listings"]
+    if stream_path:
+        products, edps = write_streamed_output(
+            fetch_options["sink"],
+            stream_path,
+            output_path,
+            product_types,
+            previous_products,
+            store,
+            listings,
+        )
+    else:
+        products = merge_products(
+            previous_products, Products(types=product_types), PRODUCT_TYPES
+        )
+        # Serialize the tree once, straight to the file
+        size = write_products(products, output_path)
+        tool_count = sum(len(s.tools) for t in products.types for s in t.series)
+        print(f"Wrote {tool_count} tools ({size / 1024:.0f} KB) to {output_path}")
+        edps = [
+            tool.vendor_product_id
+            for product_type in products.types
+            for series in product_type.series
+            for tool in series.tools
+        ]
+        if store is not None:
+            changes = store.upsert_products(products, listings)
+            print(f"Catalog store {store_path}: {changes.summary()}")
+    if store is not None:
+        store.close()
+    if journal is not None:
+        # The output is safe; the next crawl starts from the listing again
+        journal.finish_run()
+        journal.close()
+    if pdf_dir:
+        factory = functools.partial(setup_headless_driver, block_resources=False)
+        with DriverPool(size=max(browsers, 2), factory=factory) as pdf_pool:
+            counts = archive_pdfs(pdf_pool, edps, pdf_dir, throttle=throttle, cache=cache)
+        print(
+            f"PDFs: {counts['written']} written, {counts['unchanged']} unchanged, "
+            f"{counts['failed']} failed"
+        )
+    if cache is not None:
+        cache.close()
+    sections = SECTIONS.summary()
+    print(
+        f"Page sections: {sections['parsed']} parsed, {sections['reused']} reused "
+        f"(reuse rate {sections['reuse_rate']})"
+    )
+    WAIT_STATS.report()
+    METRICS.report()
+    throttle.report()
+    if metrics_server is not None:
+        metrics_server.stop()
+    return products
+
+if __name__ == "__main__":
+    from cli import main as cli_main
+
+    cli_main(["crawl", *sys.argv[1:]])
@@ -0,0 +1,412 @@
+"""
+Process-pool crawl sharded by (product type, series)
+The catalog is cut into shards, one per series of each product type (or
+one per product type when its series are not known yet), and shards of
+the same product type are grouped into batches. Each batch runs in a
+worker process with its own headless browser, HTTP session, page cache,
+journal connection and throttle: the worker loads the listing once,
+expands every table, and scrapes the batch's series. Results come back
+to the coordinator, which reassembles ProductType/Series in catalog
+order no matter which batch finished first.
+
+A failing series only fails its own shard, and a batch whose worker
+process dies is retried in a fresh pool, then given up on, without
+taking down the other batches. Stage metrics are collected per process
+and are not merged into the coordinator's.
+"""
+
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+from typing import Optional
+
+from tool_schemas import Products, ProductType, Series
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One series of a product type; series_name None means every series"""
+
+    product_type: str
+    series_name: Optional[str] = None
+    table_id: Optional[str] = None
+    listing_url: Optional[str] = None
+
+
+@dataclass
+class ShardResult:
+    product_type: str
+    series_name: Optional[str]
+    series: Optional[Series] = None
+    error: Optional[str] = None
+    listed_edps: Optional[list] = None  # Set when the listing was read in full
+
+
+def build_shards(product_types, site_map=None, max_series=None):
+    """Return the shards for a crawl, in catalog order"""
+    shards = []
+    for name in product_types:
+        url = site_map.url_for(name) if site_map else None
+        known = site_map.series_for(name) if site_map else []
+        if not known:
+            shards.append(Shard(name, listing_url=url))
+            continue
+        for entry in known[:max_series]:
+            shards.append(Shard(name, entry["name"], entry["table_id"], url))
+    return shards
+
+
+def failed_results(shards, message):
+    return [ShardResult(s.product_type, s.series_name, error=message) for s in shards]
+
+
+def batch_shards(shards, batch_size=4):
+    """Group consecutive shards of the same product type into batches"""
+    batches = []
+    for shard in shards:
+        if (
+            batches
+            and batches[-1][0].product_type == shard.product_type
+            and len(batches[-1]) < batch_size
+        ):
+            batches[-1].append(shard)
+        else:
+            batches.append([shard])
+    return batches
+
+
+# ===== Worker process =====
+
+
+class CrawlWorker:
+    """Per-process crawl resources, created once by the pool initializer"""
+
+    def __init__(
+        self,
+        backend="selenium",
+        workers=8,
+        requests_per_second=4.0,
+        engine="threads",
+        cache_dir=None,
+        journal_path=None,
+        max_age_days=None,
+        max_series=None,
+        max_edps=None,
+        initial_concurrency=4,
+        firecrawl_batch=False,
+    ):
+        from backends import backend_options, firecrawl_options
+        from concurrency import HostRateLimiter
+        from crawl_journal import CrawlJournal
+        from incremental import max_age_from_days
+        from page_cache import PageCache
+        from throttle import Throttle
+
+        self.max_series = max_series
+        self.max_edps = max_edps
+        self.cache = PageCache(cache_dir) if cache_dir else None
+        self.journal = CrawlJournal(journal_path) if journal_path else None
+        self.throttle = Throttle(initial=min(initial_concurrency, workers), max_limit=workers)
+        backend_fetch = backend_options(
+            backend,
+            workers,
+            cache_dir,
+            self.throttle,
+            **firecrawl_options(backend, firecrawl_batch),
+        )
+        self.session = backend_fetch["session"]
+        self.fetch_options = dict(
+            session=self.session,
+            workers=workers,
+            rate_limiter=HostRateLimiter(requests_per_second, burst=workers),
+            engine=engine,
+            cache=self.cache,
+            extractor=backend_fetch["extractor"],
+            throttle=self.throttle,
+            max_age=max_age_from_days(max_age_days),
+        )
+        self.driver = None
+
+    def browser(self):
+        """This process's headless browser, restarted if it has died"""
+        from driver_pool import is_driver_healthy, setup_headless_driver
+
+        if self.driver is not None and not is_driver_healthy(self.driver):
+            print(f"  ✗ Restarting browser in worker {os.getpid()}")
+            self.close_browser()
+        if self.driver is None:
+            self.driver = setup_headless_driver()
+        return self.driver
+
+    def close_browser(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def close(self):
+        self.close_browser()
+        for resource in (self.cache, self.journal):
+            if resource is not None:
+                resource.close()
+
+
+_worker = None
+
+
+def init_worker(options):
+    global _worker
+    _worker = CrawlWorker(**options)
+    # Runs when the pool shuts the process down
+    Finalize(_worker, _worker.close, exitpriority=10)
+
+
+def open_listing(driver, product_type_name, listing_url=None):
+    """Load and fully expand a product type's listing
+
+    Returns its series names and the data-ids of the tables that did not
+    finish expanding (see expand_all_tables; None if expanding failed).
+    """
+    from selenium.webdriver.common.action_chains import ActionChains
+
+    from http_fetcher import BASE_URL
+    from readiness import wait_for_product_table
+    from scrape_data import expand_tables_safely, go_to_product_table_page
+    from throttle import LISTING
+
+    throttle = _worker.throttle
+    if listing_url:
+        throttle.call(LISTING, driver.get, listing_url)
+    else:
+        throttle.call(
+            LISTING,
+            go_to_product_table_page,
+            driver,
+            BASE_URL,
+            ActionChains(driver),
+            link_text=product_type_name,
+        )
+    serieses = wait_for_product_table(driver)
+    series_names = [series.text.split("\n", 1)[0] for series in serieses]
+    return series_names, expand_tables_safely(driver)
+
+
+def crawl_batch(shards, previous=None):
+    """Crawl one batch of shards (all of one product type) in this worker
+
+    previous maps series names to {edp: Tool} from the last run, for an
+    incremental crawl. Returns a ShardResult per series, in listing order.
+    """
+    from scrape_data import list_series_edps, scrape_series_table
+
+    product_type_name = shards[0].product_type
+    journal = _worker.journal
+    try:
+        driver = _worker.browser()
+        listed_names, unexpanded = open_listing(driver, product_type_name, shards[0].listing_url)
+    except Exception as e:
+        message = f"Listing failed: {type(e).__name__}: {e}"
+        print(f"  ✗ {product_type_name}: {message}")
+        return failed_results(shards, message)
+
+    if shards[0].series_name is None:
+        targets = [(name, None) for name in listed_names[: _worker.max_series]]
+    else:
+        targets = [(shard.series_name, shard.table_id) for shard in shards]
+
+    # Read every EDP list while the browser is still on the expanded
+    # listing; scraping a series can move it to product-details pages
+    listed, errors = {}, {}
+    for series_name, table_id in targets:
+        if journal is not None and journal.series_complete(product_type_name, series_name):
+            continue
+        try:
+            listed[series_name] = list_series_edps(
+                driver, series_name, table_id, _worker.max_edps, unexpanded
+            )
+        except Exception as e:
+            traceback.print_exc()
+            errors[series_name] = f"{type(e).__name__}: {e}"
+
+    results = []
+    for series_name, _ in targets:
+        if series_name in errors:
+            results.append(
+                ShardResult(product_type_name, series_name, error=errors[series_name])
+            )
+            continue
+        listings = {}
+        series_previous = previous.get(series_name, {}) if previous is not None else None
+        try:
+            if series_name not in listed:
+                print(f"✓ Series {series_name} already complete in journal")
+                series = journal.series(product_type_name, series_name, series_previous)
+            else:
+                print(f"Scraping series: {series_name} (worker {os.getpid()})")
+                edp_numbers, complete = listed[series_name]
+                series = scrape_series_table(
+                    driver,
+                    series_name,
+                    previous=series_previous,
+                    journal=journal,
+                    product_type_name=product_type_name,
+                    edp_numbers=edp_numbers,
+                    complete=complete,
+                    listings=listings,
+                    **_worker.fetch_options,
+                )
+            results.append(
+                ShardResult(
+                    product_type_name,
+                    series_name,
+                    series=series,
+                    listed_edps=listings.get((product_type_name, series_name)),
+                )
+            )
+        except Exception as e:
+            traceback.print_exc()
+            results.append(
+                ShardResult(product_type_name, series_name, error=f"{type(e).__name__}: {e}")
+            )
+    return results
+
+
+# ===== Coordinator =====
+
+
+class OrderedMerge:
+    """Collect batch results and release them strictly in batch order
+
+    With a JsonlToolSink, each series is streamed out as soon as every
+    batch before it has been released, so the stream is in catalog order
+    too, and only its tool-less copy is kept.
+    """
+
+    def __init__(self, batch_count, sink=None):
+        self.results = [None] * batch_count
+        self.released = 0
+        self.sink = sink
+        self.types = {}
+        self.failed = []
+        self.listings = {}
+
+    def add(self, index, results):
+        self.results[index] = results
+        while self.released < len(self.results) and self.results[self.released] is not None:
+            for result in self.results[self.released]:
+                self._release(result)
+            self.results[self.released] = []  # Keep the slot marked as done
+            self.released += 1
+
+    def _release(self, result):
+        series_list = self.types.setdefault(result.product_type, [])
+        if result.series is None:
+            self.failed.append(result)
+            return
+        series = result.series
+        if result.listed_edps is not None:
+            self.listings[(result.product_type, series.name)] = result.listed_edps
+        if self.sink is not None:
+            self.sink.write_series(result.product_type, series)
+            series = series.model_copy(update={"tools": []})
+        series_list.append(series)
+        print(f"✓ Series {series.name}: {len(result.series.tools)} tools")
+
+    def products(self, catalog_order):
+        return Products(
+            types=[
+                ProductType(name=name, series=self.types[name])
+                for name in catalog_order
+                if name in self.types
+            ]
+        )
+
+
+def crawl_sharded(
+    product_types,
+    site_map=None,
+    processes=None,
+    batch_size=4,
+    previous_index=None,
+    sink=None,
+    journal=None,
+    listings=None,
+    max_series=None,
+    max_edps=None,
+    pool_retries=1,
+    **worker_options,
+):
+    """Crawl product types across a pool of worker processes
+
+    worker_options (backend, workers, requests_per_second, engine,
+    cache_dir, journal_path, max_age_days, initial_concurrency,
+    firecrawl_batch) configure
+    each worker's own resources; the per-host request rate is split
+    evenly between the processes. previous_index is {product type:
+    {series: {edp: Tool}}} for an incremental crawl. max_series and
+    max_edps cap the series per product type and the EDPs per series
+    (None: all of them). With a `listings` dict, the EDPs of every
+    series listing read in full are added to it. Returns Products in
+    catalog order; failed shards are reported and left out.
+    """
+    processes = processes or os.cpu_count() or 1
+    batches = batch_shards(build_shards(product_types, site_map, max_series), batch_size)
+    if not batches:
+        print("Nothing to crawl")
+        return Products(types=[])
+    worker_options = dict(worker_options, max_series=max_series, max_edps=max_edps)
+    worker_options["requests_per_second"] = (
+        worker_options.get("requests_per_second", 4.0) / min(processes, len(batches))
+    )
+    merge = OrderedMerge(len(batches), sink)
+    print(f"Crawling {len(batches)} shard batches on {processes} processes")
+
+    def previous_for(batch):
+        if previous_index is None:
+            return None
+        return previous_index.get(batch[0].product_type, {})
+
+    pending = list(range(len(batches)))
+    for attempt in range(pool_retries + 1):
+        crashed = []
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(pending)),
+            initializer=init_worker,
+            initargs=(worker_options,),
+        ) as pool:
+            futures = {
+                pool.submit(crawl_batch, batches[i], previous_for(batches[i])): i
+                for i in pending
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    merge.add(i, future.result())
+                except BrokenProcessPool:
+                    crashed.append(i)
+                except Exception as e:
+                    merge.add(i, failed_results(batches[i], f"{type(e).__name__}: {e}"))
+        pending = sorted(crashed)
+        if not pending:
+            break
+        if attempt < pool_retries:
+            print(f"  ✗ Worker process died; retrying {len(pending)} batches in a new pool")
+    for i in pending:
+        merge.add(i, failed_results(batches[i], "Worker process died"))
+
+    for result in merge.failed:
+        print(f"  ✗ Shard failed: {result.product_type} / {result.series_name}: {result.error}")
+    products = merge.products(product_types)
+    if listings is not None:
+        listings.update(merge.listings)
+    if journal is not None:
+        for product_type in products.types:
+            journal.register_product_type(
+                product_type.name, [series.name for series in product_type.series]
+            )
+    return products
@@ -0,0 +1,157 @@
+"""
+Site-map discovery
+Resolves each product type's listing URL from the homepage menu and the
+series tables on each listing (series name → ul.product-table data-id)
+in one pass, and caches the result as JSON. The crawler then loads each
+listing directly instead of hovering the PRODUCTS menu, and finds series
+tables by data-id instead of re-expanding them by index.
+
+Pages are read through a fetch function (url → html), such as
+session_fetcher over a requests session.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urljoin
+
+from page_parser import element_text, parse_html
+from throttle import LISTING, call_throttled
+
+
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+
+def has_class(element, name):
+    return name in (element.get("class") or "").split()
+
+
+def find_menu_links(html, base_url, names):
+    """Return {link text: absolute URL} for the menu links named in `names`"""
+    wanted = set(names)
+    links = {}
+    for link in parse_html(html).iter("a"):
+        text = element_text(link)
+        href = link.get("href")
+        if text in wanted and href and text not in links:
+            links[text] = urljoin(base_url, href)
+    return links
+
+
+def find_series_tables(html):
+    """Return [{"name", "table_id", "rows"}] for the series tables on a listing page
+
+    rows counts the rows present before the table is expanded, so it is
+    a lower bound on the series' EDPs.
+    """
+    series = []
+    for row in parse_html(html).iter("div"):
+        if not has_class(row, "resultRow"):
+            continue
+        name = next((e for e in row.iter("strong") if has_class(e, "name")), None)
+        table = next((e for e in row.iter("ul") if has_class(e, "product-table")), None)
+        if name is None or table is None:
+            continue
+        series.append(
+            {
+                "name": element_text(name).split("\n", 1)[0],
+                "table_id": table.get("data-id"),
+                "rows": sum(
+                    1 for li in table.iter("li") if has_class(li, "series-results-row")
+                ),
+            }
+        )
+    return series
+
+
+@dataclass
+class SiteMap:
+    """Listing URL and series tables for each product type"""
+
+    product_types: dict = field(default_factory=dict)
+    discovered_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def url_for(self, product_type):
+        entry = self.product_types.get(product_type)
+        return entry["url"] if entry else None
+
+    def series_for(self, product_type):
+        """Return [{"name", "table_id", "rows"}] for a product type, or [] if unknown"""
+        entry = self.product_types.get(product_type)
+        return entry["series"] if entry else []
+
+    def age(self, now=None):
+        return (now or datetime.now(timezone.utc)) - self.discovered_at
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "discovered_at": self.discovered_at.isoformat(),
+                    "product_types": self.product_types,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a cached site map, or None if there is none"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return cls(
+            product_types=data["product_types"],
+            discovered_at=datetime.fromisoformat(data["discovered_at"]),
+        )
+
+
+def discover_site_map(fetch_html, product_types, base_url):
+    """Resolve listing URLs and series tables for all product types
+
+    fetch_html(url) must return the page's HTML. Product types missing
+    from the homepage menu are reported and left out.
+    """
+    links = find_menu_links(fetch_html(base_url), base_url, product_types)
+    site_map = SiteMap()
+    for name in product_types:
+        url = links.get(name)
+        if url is None:
+            print(f"  ✗ No menu link found for {name}")
+            continue
+        series = find_series_tables(fetch_html(url))
+        site_map.product_types[name] = {"url": url, "series": series}
+        print(f"  {name}: {len(series)} series at {url}")
+    return site_map
+
+
+def session_fetcher(session, timeout=15, throttle=None):
+    """fetch_html over a requests session, under the throttle's listing limit"""
+
+    def get(url):
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_html(url):
+        return call_throttled(throttle, LISTING, get, url)
+
+    return fetch_html
+
+
+def load_or_discover(path, fetch_html, product_types, base_url, max_age=DEFAULT_MAX_AGE):
+    """Return the cached site map at path if fresh, otherwise discover and cache it"""
+    site_map = SiteMap.load(path) if path else None
+    if site_map is not None and site_map.age() <= max_age:
+        print(f"Using cached site map from {site_map.discovered_at:%Y-%m-%d %H:%M} UTC")
+        return site_map
+    print("Discovering product-type listings and series tables...")
+    site_map = discover_site_map(fetch_html, product_types, base_url)
+    if path:
+        site_map.save(path)
+    return site_map
@@ -0,0 +1,359 @@
+"""
+Adaptive concurrency control for every fetch path
+Each endpoint type (listing pages, product-details pages) gets an AIMD
+limit on requests in flight: a success at normal latency adds 1/limit to
+the limit, while a latency spike, a rising error rate or a 429/503 cuts
+it by `backoff`. A Retry-After answer pauses the whole endpoint type
+until it has passed, and the call is retried. Behind the limiter, a
+circuit breaker per endpoint type stops sending requests after repeated
+failures and lets a single probe through once it has cooled down; calls
+arriving while it is open wait for the probe instead of failing.
+
+The per-host TokenBucket caps the request rate; this caps how many
+requests are outstanding, and finds that number from how the site
+responds instead of from a fixed `workers` setting.
+
+Usage:
+    throttle = Throttle()
+    html = throttle.call(PRODUCT_DETAILS, fetch_html, url)
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from metrics import METRICS
+
+
+LISTING = "listing"
+PRODUCT_DETAILS = "product_details"
+ENDPOINT_TYPES = (LISTING, PRODUCT_DETAILS)
+
+# Statuses that mean "slow down" rather than "broken"
+THROTTLE_STATUS_CODES = {429, 503}
+# Client errors that say nothing about the endpoint's health
+HEALTHY_STATUS_CODES = {400, 401, 403, 404, 410}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint type whose circuit is open"""
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"Circuit open for {endpoint}; retrying in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After value (delta-seconds or HTTP-date)"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+def error_status(error):
+    """HTTP status carried by a requests or Firecrawl error, if any"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if status is not None else getattr(error, "status_code", None)
+
+
+def classify(error):
+    """Return (outcome, retry_after) for a failed call
+
+    outcome is "throttled" for 429/503, "ok" for client errors such as a
+    404 (the endpoint answered fine), and "error" for everything else.
+    """
+    status = error_status(error)
+    if status in THROTTLE_STATUS_CODES:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        return "throttled", parse_retry_after(headers.get("Retry-After"))
+    if status in HEALTHY_STATUS_CODES:
+        return "ok", None
+    return "error", None
+
+
+class AdaptiveLimiter:
+    """AIMD limit on calls in flight, driven by latency and error rate
+
+    Latency is tracked as an EWMA; its lowest value so far is the
+    baseline, and an EWMA above `latency_tolerance` times the baseline
+    counts as congestion. Cuts happen at most once per smoothed latency,
+    so a burst of failures from the same window shrinks the limit once.
+    """
+
+    def __init__(
+        self,
+        initial=4,
+        min_limit=1,
+        max_limit=32,
+        backoff=0.5,
+        latency_tolerance=2.0,
+        max_error_rate=0.1,
+        smoothing=0.2,
+        min_samples=5,
+    ):
+        self.limit = float(max(min_limit, min(initial, max_limit)))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.smoothing = smoothing
+        self.min_samples = min_samples
+        self.in_flight = 0
+        self.samples = 0
+        self.latency = None
+        self.baseline = None
+        self.error_rate = 0.0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        """Block until a slot is free and no Retry-After pause is running"""
+        with self.cond:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    break
+                self.cond.wait(timeout=pause if pause > 0 else None)
+            self.in_flight += 1
+
+    def release(self, seconds, outcome="ok", retry_after=None):
+        """Free a slot and adjust the limit from the call's outcome"""
+        with self.cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            self.error_rate += self.smoothing * ((outcome != "ok") - self.error_rate)
+            if outcome == "throttled":
+                self._decrease(now)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            elif outcome == "error":
+                if self.error_rate > self.max_error_rate:
+                    self._decrease(now)
+            else:
+                self._observe_latency(seconds)
+                if self._congested():
+                    self._decrease(now)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self.cond.notify_all()
+
+    def _observe_latency(self, seconds):
+        self.samples += 1
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.smoothing * (seconds - self.latency)
+        if self.samples >= self.min_samples and (
+            self.baseline is None or self.latency < self.baseline
+        ):
+            self.baseline = self.latency
+
+    def _congested(self):
+        return (
+            self.baseline is not None
+            and self.latency > self.baseline * self.latency_tolerance
+        )
+
+    def _decrease(self, now):
+        if now - self.last_decrease < (self.latency or 0.0):
+            return
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self.last_decrease = now
+        self.decreases += 1
+
+
+class CircuitBreaker:
+    """Closed → open after `failure_threshold` consecutive failures → half-open
+    after `reset_timeout` seconds, where one probe call decides which way
+    it goes"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                retry_in = self.opened_at + self.reset_timeout - now
+                if retry_in > 0:
+                    raise CircuitOpenError(self.name, retry_in)
+                self.state = self.HALF_OPEN
+                self.probing = False
+            if self.probing:
+                raise CircuitOpenError(self.name, 0.0)
+            self.probing = True
+
+    def record_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                print(f"  Circuit for {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                print(
+                    f"  ✗ Circuit for {self.name} open after {self.failures} failures; "
+                    f"pausing {self.reset_timeout:.1f}s"
+                )
+
+
+class Throttle:
+    """An AdaptiveLimiter and a CircuitBreaker per endpoint type
+
+    call() retries throttled calls up to `max_retries` times, waiting
+    out Retry-After (or `default_retry_after` when the server gives
+    none, capped at `max_retry_after`) before each retry. While the
+    circuit is open, call() sleeps until it half-opens and goes through
+    as (or after) the probe; only after `max_circuit_wait` seconds of an
+    open circuit does it raise CircuitOpenError.
+    """
+
+    def __init__(
+        self,
+        initial=4,
+        max_limit=32,
+        failure_threshold=5,
+        reset_timeout=30.0,
+        max_retries=3,
+        default_retry_after=1.0,
+        max_retry_after=120.0,
+        max_circuit_wait=300.0,
+        metrics=METRICS,
+    ):
+        self.limiters = {
+            endpoint: AdaptiveLimiter(initial=initial, max_limit=max_limit)
+            for endpoint in ENDPOINT_TYPES
+        }
+        self.breakers = {
+            endpoint: CircuitBreaker(endpoint, failure_threshold, reset_timeout)
+            for endpoint in ENDPOINT_TYPES
+        }
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+        self.max_circuit_wait = max_circuit_wait
+        self.metrics = metrics
+
+    def call(self, endpoint, func, *args, **kwargs):
+        """Run one fetch of the given endpoint type under its limit and breaker"""
+        limiter = self.limiters[endpoint]
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_circuit(endpoint)
+            limiter.acquire()
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                outcome, retry_after = classify(e)
+                if outcome == "throttled":
+                    retry_after = min(
+                        self.max_retry_after,
+                        self.default_retry_after if retry_after is None else retry_after,
+                    )
+                self._finish(endpoint, time.perf_counter() - start, outcome, retry_after)
+                if outcome == "throttled" and attempt < self.max_retries:
+                    print(f"  ✗ {endpoint} throttled ({e}); retrying in {retry_after:.1f}s")
+                    continue
+                raise
+            self._finish(endpoint, time.perf_counter() - start, "ok")
+            return result
+
+    def _wait_for_circuit(self, endpoint, poll=0.05):
+        """Block until the breaker lets a call through; an open circuit is a deferral"""
+        breaker = self.breakers[endpoint]
+        deadline = time.monotonic() + self.max_circuit_wait
+        while True:
+            try:
+                breaker.before_call()
+                return
+            except CircuitOpenError as e:
+                # retry_in is 0 while another call is the half-open probe
+                wait = max(e.retry_in, poll)
+                if time.monotonic() + wait > deadline:
+                    raise
+                self.metrics.inc("circuit_waits_total", endpoint=endpoint)
+                time.sleep(wait)
+
+    def _finish(self, endpoint, seconds, outcome, retry_after=None):
+        limiter = self.limiters[endpoint]
+        breaker = self.breakers[endpoint]
+        limiter.release(seconds, outcome, retry_after)
+        if outcome == "error":
+            breaker.record_failure()
+        else:
+            # A 429 means the endpoint is up, just busy
+            breaker.record_success()
+        self.metrics.inc("fetch_outcomes_total", endpoint=endpoint, outcome=outcome)
+        self.metrics.set_gauge("concurrency_limit", int(limiter.limit), endpoint=endpoint)
+
+    def summary(self):
+        """Return {endpoint: {limit, decreases, latency_s, baseline_s, error_rate, circuit}}"""
+        summary = {}
+        for endpoint in ENDPOINT_TYPES:
+            limiter = self.limiters[endpoint]
+            summary[endpoint] = {
+                "limit": int(limiter.limit),
+                "decreases": limiter.decreases,
+                "latency_s": round(limiter.latency, 3) if limiter.latency is not None else None,
+                "baseline_s": round(limiter.baseline, 3) if limiter.baseline is not None else None,
+                "error_rate": round(limiter.error_rate, 3),
+                "circuit": self.breakers[endpoint].state,
+            }
+        return summary
+
+    def report(self):
+        print("\nAdaptive concurrency:")
+        for endpoint, s in self.summary().items():
+            print(
+                f"  {endpoint:<16} limit={s['limit']:<3} decreases={s['decreases']:<4} "
+                f"latency={s['latency_s']}s baseline={s['baseline_s']}s "
+                f"error_rate={s['error_rate']} circuit={s['circuit']}"
+            )
+
+
+def call_throttled(throttle, endpoint, func, *args, **kwargs):
+    """throttle.call(...) if there is a throttle, else just func(...)"""
+    if throttle is None:
+        return func(*args, **kwargs)
+    return throttle.call(endpoint, func, *args, **kwargs)
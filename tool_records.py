@@ -0,0 +1,83 @@
+"""
+Bulk validation and serialization of Tool records
+Records read back in bulk (JSONL streams, journal rows) are validated as
+one list in a single TypeAdapter call instead of one model_validate per
+tool, and output trees are serialized exactly once, without indentation.
+ProductsWriter writes the same document one series at a time, for trees
+that are never held in memory whole.
+
+There is deliberately no model_construct path: on pydantic 2.x it runs
+in Python and is slower than the compiled validator for Tool.
+"""
+
+from typing import List
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from tool_schemas import Tool
+
+
+TOOL_LIST = TypeAdapter(List[Tool])
+
+
+def validate_tools(records):
+    """Validate a list of tool dicts in one call"""
+    return TOOL_LIST.validate_python(records)
+
+
+def validate_tools_json(json_records):
+    """Validate a list of tool JSON strings in one call"""
+    return TOOL_LIST.validate_json("[" + ",".join(json_records) + "]")
+
+
+def dump_tools_json(tools):
+    """Serialize a list of Tools to one JSON array (bytes)"""
+    return TOOL_LIST.dump_json(tools)
+
+
+def write_products(products, path, indent=None):
+    """Serialize a Products tree once and write it to path; return its size"""
+    payload = products.model_dump_json(indent=indent)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(payload)
+    return len(payload)
+
+
+class ProductsWriter:
+    """Write a Products document to path one series at a time
+
+    Series must arrive grouped by product type; the file matches what
+    write_products writes for the same tree.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+        self.size = self.file.write('{"types":[')
+        self.product_type = None
+        self.first_series = True
+
+    def add_series(self, product_type_name, series):
+        if product_type_name != self.product_type:
+            opener = '{"name":' + to_json(product_type_name).decode() + ',"series":['
+            if self.product_type is not None:
+                opener = "]}," + opener
+            self.size += self.file.write(opener)
+            self.product_type = product_type_name
+            self.first_series = True
+        if not self.first_series:
+            self.size += self.file.write(",")
+        self.size += self.file.write(series.model_dump_json())
+        self.first_series = False
+
+    def close(self):
+        """Finish the document; return its size"""
+        self.size += self.file.write("]}]}" if self.product_type is not None else "]}")
+        self.file.close()
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
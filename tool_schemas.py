@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, HttpUrl
 from typing import Optional, Dict, Any, Literal
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
@@ -122,12 +122,14 @@ class Tool(BaseModel):
     #     description="Length tolerance (e.g., '±0.010')"
     # )
 
-    # # ===== Traceability =====
-    # scrape_timestamp_utc: datetime = Field(
-    #     default_factory=datetime.utcnow,
-    #     description="UTC timestamp when scraped"
-    # )
-    # source_html_hash: str = Field(..., description="SHA256 hash of source HTML")
+    # ===== Traceability =====
+    scrape_timestamp_utc: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="UTC timestamp when scraped",
+    )
+    source_html_hash: Optional[str] = Field(
+        None, description="SHA256 hash of source HTML (page cache key)"
+    )
 
     # # ===== Validation Status =====
     # validation_status: ValidationStatus = Field(
@@ -139,31 +141,30 @@ class Tool(BaseModel):
     #     description="Notes about parsing issues or warnings"
     # )
 
-    # # ===== Tool-specific attributes =====
-    # drill_attributes: Optional[DrillAttributes] = Field(
-    #     default=None,
-    #     description="Drill-specific attributes if applicable"
-    # )
-    # end_mill_attributes: Optional[EndMillAttributes] = Field(
-    #     default=None,
-    #     description="End mill-specific attributes if applicable"
-    # )
-    # reamer_attributes: Optional[ReamerAttributes] = Field(
-    #     default=None,
-    #     description="Reamer-specific attributes if applicable"
-    # )
-    # drill_mill_attributes: Optional[DrillMillAttributes] = Field(
-    #     default=None,
-    #     description="Drill mill-specific attributes if applicable"
-    # )
-    # rougher_attributes: Optional[RougherAttributes] = Field(
-    #     default=None,
-    #     description="Rougher-specific attributes if applicable"
-    # )
-    # burr_attributes: Optional[BurrAttributes] = Field(
-    #     default=None,
-    #     description="Burr/rotary file-specific attributes if applicable"
-    # )
+    # ===== Tool-specific attributes =====
+    drill_attributes: Optional[DrillAttributes] = Field(
+        default=None, description="Drill-specific attributes if applicable"
+    )
+    end_mill_attributes: Optional[EndMillAttributes] = Field(
+        default=None, description="End mill-specific attributes if applicable"
+    )
+    reamer_attributes: Optional[ReamerAttributes] = Field(
+        default=None, description="Reamer-specific attributes if applicable"
+    )
+    drill_mill_attributes: Optional[DrillMillAttributes] = Field(
+        default=None, description="Drill mill-specific attributes if applicable"
+    )
+    rougher_attributes: Optional[RougherAttributes] = Field(
+        default=None, description="Rougher-specific attributes if applicable"
+    )
+    burr_attributes: Optional[BurrAttributes] = Field(
+        default=None,
+        description="Burr/rotary file-specific attributes if applicable",
+    )
+    raw_field_keys: Optional[str] = Field(
+        None,
+        description="Comma-separated list of field names that were present but couldn't be parsed reliably",
+    )
 
     # class Config:
     #     use_enum_values = True